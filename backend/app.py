@@ -1,12 +1,23 @@
 import os
 import traceback
-from flask import Flask, jsonify
+from flask import Flask, jsonify, Response
 from flask_cors import CORS
 from flask_migrate import Migrate
 from config import config
 from models.user import db, bcrypt
 from auth.jwt_auth import jwt
-from routes import auth_bp, user_bp, team_bp, project_bp, checkin_bp, analytics_bp
+from auth.current_user import init_current_user
+from auth.revocation import init_revocations
+from routes import auth_bp, user_bp, team_bp, project_bp, checkin_bp, analytics_bp, batch_bp, system_bp
+from services.rollups import register_rollup_hooks
+from services.cache import init_cache
+from services.passwords import init_password_hasher
+from services.database import configure_engine_options, init_database
+from services.replica import configure_read_replica
+from services.metrics import init_metrics, get_metrics
+from services.query_budget import query_budget, init_query_budgets
+from auth.decorators import admin_required
+from cli import rollups_cli, tokens_cli, init_db_command, seed_command
 
 def create_app(config_name='default'):
     """Application factory pattern"""
@@ -19,9 +30,17 @@ def create_app(config_name='default'):
     app.config.from_object(config[config_name])
     
     # Initialize extensions
+    configure_engine_options(app)
+    configure_read_replica(app)
     db.init_app(app)
+    init_database(app)
+    init_metrics(app)
+    init_query_budgets(app)
     bcrypt.init_app(app)
     jwt.init_app(app)
+    init_current_user(app)
+    init_revocations(app)
+    init_password_hasher(app)
     
     # Setup CORS
     cors_origins = app.config.get('CORS_ORIGINS', ['http://localhost:5173'])
@@ -41,6 +60,18 @@ def create_app(config_name='default'):
     # Initialize migrations
     Migrate(app, db)
     
+    # Keep check-in rollups current on every write
+    register_rollup_hooks()
+    
+    # Analytics response cache
+    init_cache(app)
+    
+    # CLI commands
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(tokens_cli)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_command)
+    
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(user_bp)
@@ -48,6 +79,8 @@ def create_app(config_name='default'):
     app.register_blueprint(project_bp)
     app.register_blueprint(checkin_bp)
     app.register_blueprint(analytics_bp)
+    app.register_blueprint(batch_bp)
+    app.register_blueprint(system_bp)
     
     # Error handlers
     @app.errorhandler(404)
@@ -64,6 +97,7 @@ def create_app(config_name='default'):
     
     # Health check endpoint
     @app.route('/health', methods=['GET'])
+    @query_budget(0)
     def health_check():
         try:
             cors_origins = app.config.get('CORS_ORIGINS', 'Not set')
@@ -81,8 +115,19 @@ def create_app(config_name='default'):
                 'message': f'Health check error: {str(e)}'
             }), 500
     
+    # Prometheus metrics for this worker process
+    @app.route('/metrics', methods=['GET'])
+    @query_budget(1)
+    @admin_required
+    def metrics():
+        registry = get_metrics()
+        if registry is None:
+            return jsonify({'message': 'Metrics are disabled'}), 404
+        return Response(registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
+    
     # Debug endpoint to check database and users
     @app.route('/debug/users', methods=['GET'])
+    @query_budget(1)
     def debug_users():
         try:
             from models.user import User
@@ -107,6 +152,7 @@ def create_app(config_name='default'):
     
     # Root endpoint
     @app.route('/', methods=['GET'])
+    @query_budget(0)
     def root():
         return jsonify({
             'message': 'TeamPulse API',
@@ -123,65 +169,9 @@ def create_app(config_name='default'):
     
     return app
 
-def init_db():
-    """Initialize database with sample data"""
-    from models.user import User
-    from models.team import Team
-    from models.project import Project
-    
-    # Create admin user if none exists
-    admin = User.query.filter_by(role='admin').first()
-    if not admin:
-        admin = User(
-            email='admin@teampulse.com',
-            password='admin123',
-            first_name='Admin',
-            last_name='User',
-            role='admin'
-        )
-        db.session.add(admin)
-        db.session.commit()
-        print("Admin user created: admin@teampulse.com / admin123")
-    
-    # Create sample team if none exists
-    if not Team.query.first():
-        team = Team(
-            name='Development Team',
-            description='Main development team for the company'
-        )
-        db.session.add(team)
-        db.session.commit()
-        print("Sample team created: Development Team")
-    
-    # Create sample employee if none exists
-    employee = User.query.filter_by(role='employee').first()
-    if not employee:
-        employee = User(
-            email='employee@teampulse.com',
-            password='employee123',
-            first_name='John',
-            last_name='Doe',
-            role='employee',
-            team_id=1
-        )
-        db.session.add(employee)
-        db.session.commit()
-        print("Sample employee created: employee@teampulse.com / employee123")
-    
-    # Create sample project if none exists
-    if not Project.query.first():
-        project = Project(
-            title='TeamPulse Development',
-            team_id=1,
-            description='Building the TeamPulse application',
-            status='active',
-            priority='high'
-        )
-        db.session.add(project)
-        db.session.commit()
-        print("Sample project created: TeamPulse Development")
-
 if __name__ == '__main__':
+    from services.sample_data import seed_sample_data
+    
     app = create_app()
     
     with app.app_context():
@@ -189,7 +179,8 @@ if __name__ == '__main__':
         db.create_all()
         
         # Initialize with sample data
-        init_db()
+        for line in seed_sample_data():
+            print(line)
     
     # Run the application
     app.run(
@@ -198,22 +189,11 @@ if __name__ == '__main__':
         debug=app.config.get('DEBUG', False)
     )
 
-# For Render deployment - create app instance
+# For Render deployment - create app instance. Importing this module does no
+# database I/O: tables and sample data are created once per deploy with
+# `flask init-db --seed`, before gunicorn starts its workers.
 app = create_app('production')
 
-# Initialize database tables and sample data for production
-with app.app_context():
-    try:
-        print("Creating database tables...")
-        db.create_all()
-        print("Database tables created successfully")
-        
-        print("Initializing sample data...")
-        init_db()
-        print("Sample data initialized successfully")
-    except Exception as e:
-        print(f"Database initialization error: {str(e)}")
-
 # Add startup logging for debugging
 print("TeamPulse API starting up...")
 print(f"Database URI: {app.config.get('SQLALCHEMY_DATABASE_URI', 'Not set')}")
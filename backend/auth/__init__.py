@@ -1,4 +1,6 @@
 from .jwt_auth import jwt, create_access_token, jwt_required, get_jwt_identity
 from .decorators import admin_required, employee_required
+from .current_user import get_current_user, invalidate_user
 
-__all__ = ['jwt', 'create_access_token', 'jwt_required', 'get_jwt_identity', 'admin_required', 'employee_required'] 
\ No newline at end of file
+__all__ = ['jwt', 'create_access_token', 'jwt_required', 'get_jwt_identity', 'admin_required', 'employee_required',
+           'get_current_user', 'invalidate_user']
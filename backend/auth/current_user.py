@@ -0,0 +1,95 @@
+import time
+import threading
+from flask import current_app, g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.orm import make_transient_to_detached
+
+from models.user import db, User
+
+class UserCache:
+    """Short-TTL, per-process cache of users keyed by id
+    
+    Holds detached copies of the column values; each request merges a copy into
+    its own session without a query. Write routes that change a user call
+    ``invalidate_user``.
+    """
+    
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            return user
+    
+    def set(self, user):
+        copy = User.__mapper__.class_manager.new_instance()
+        for attr in User.__mapper__.column_attrs:
+            setattr(copy, attr.key, getattr(user, attr.key))
+        make_transient_to_detached(copy)
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, copy)
+    
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+def init_current_user(app):
+    """Reset the request-scoped user per request and set up the cross-request cache
+    
+    The cross-request cache is enabled when AUTH_USER_CACHE_TTL (seconds) is set.
+    """
+    ttl = app.config.get('AUTH_USER_CACHE_TTL', 0)
+    app.extensions['user_cache'] = UserCache(ttl) if ttl > 0 else None
+    
+    @app.before_request
+    def reset_current_user():
+        # Batch sub-requests run in the batch's app context and keep its user
+        if not g.get('share_current_user'):
+            g.pop('current_user', None)
+
+def share_current_user(user):
+    """Keep ``user`` as the authenticated user for requests dispatched in this app context"""
+    g.current_user = user
+    g.share_current_user = True
+
+def get_current_user():
+    """Get the authenticated user, loading it at most once per request
+    
+    Requires a verified JWT. The user is stored on ``g`` and, when enabled,
+    served from the cross-request cache without touching the database.
+    """
+    if 'current_user' in g:
+        return g.current_user
+    
+    user_id = get_jwt_identity()
+    cache = current_app.extensions.get('user_cache')
+    
+    cached = cache.get(user_id) if cache else None
+    if cached is not None:
+        user = db.session.merge(cached, load=False)
+    else:
+        user = db.session.get(User, user_id)
+        if user is not None and cache:
+            cache.set(user)
+    
+    g.current_user = user
+    return user
+
+def invalidate_user(user_id):
+    """Drop a user from the request and cross-request caches after it changed"""
+    cache = current_app.extensions.get('user_cache')
+    if cache:
+        cache.invalidate(user_id)
+    
+    current_user = g.get('current_user')
+    if current_user is not None and current_user.id == user_id:
+        g.pop('current_user')
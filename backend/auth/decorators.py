@@ -1,15 +1,27 @@
 from functools import wraps
-from flask import jsonify, request
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from models.user import User
+from flask import jsonify, request, current_app
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from .current_user import get_current_user
+
+def _trust_token_claims():
+    """Claims-only mode: authorize from signed token claims without a user lookup
+    
+    Deactivation and role changes are enforced by revoking the user's tokens.
+    """
+    return current_app.config.get('AUTH_TRUST_TOKEN_CLAIMS', False)
 
 def admin_required(fn):
     """Decorator to require admin role"""
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        
+        if _trust_token_claims():
+            if get_jwt().get('role') != 'admin':
+                return jsonify({'message': 'Admin access required'}), 403
+            return fn(*args, **kwargs)
+        
+        user = get_current_user()
         
         if not user or not user.is_admin():
             return jsonify({'message': 'Admin access required'}), 403
@@ -21,8 +33,12 @@ def employee_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        
+        # Revoked (deactivated) users never get past verify_jwt_in_request
+        if _trust_token_claims():
+            return fn(*args, **kwargs)
+        
+        user = get_current_user()
         
         if not user or not user.is_active:
             return jsonify({'message': 'Valid user access required'}), 403
@@ -34,8 +50,7 @@ def same_user_or_admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
+        current_user = get_current_user()
         
         if not current_user or not current_user.is_active:
             return jsonify({'message': 'Valid user access required'}), 403
@@ -46,8 +61,8 @@ def same_user_or_admin_required(fn):
         
         # Check if user is accessing their own data
         target_user_id = kwargs.get('user_id') or request.args.get('user_id')
-        if target_user_id and int(target_user_id) != current_user_id:
+        if target_user_id and int(target_user_id) != current_user.id:
             return jsonify({'message': 'Access denied'}), 403
         
         return fn(*args, **kwargs)
-    return wrapper 
\ No newline at end of file
+    return wrapper
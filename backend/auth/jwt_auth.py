@@ -1,19 +1,64 @@
-from flask import jsonify, request
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+import uuid
+from datetime import datetime, timedelta
+from flask import jsonify, request, current_app
+from flask_jwt_extended import JWTManager, create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from functools import wraps
 
 jwt = JWTManager()
 
 def create_user_token(user_id, email, role):
     """Create JWT access token with user info"""
+    from .revocation import now_ms
+    
     return create_access_token(
         identity=user_id,
         additional_claims={
             'email': email,
-            'role': role
+            'role': role,
+            'iat_ms': now_ms()
         }
     )
 
+def create_user_refresh_token(user_id, family_id=None):
+    """Create a refresh token and record it; starts a new family unless one is given
+    
+    The caller commits the session.
+    """
+    from models.user import db
+    from models.refresh_token import RefreshToken
+    from .revocation import now_ms
+    
+    jti = str(uuid.uuid4())
+    family_id = family_id or str(uuid.uuid4())
+    db.session.add(RefreshToken(
+        jti=jti,
+        user_id=user_id,
+        family_id=family_id,
+        expires_at=datetime.utcnow() + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+    ))
+    return create_refresh_token(identity=user_id, additional_claims={'jti': jti, 'family': family_id, 'iat_ms': now_ms()})
+
+def prune_refresh_tokens(user_id=None):
+    """Delete refresh token rows that no longer matter; returns how many
+    
+    Expired and revoked tokens are rejected without their row. Used tokens are
+    kept for AUTH_REFRESH_REUSE_DAYS so that replaying one still revokes its
+    family. Only the given user's rows when ``user_id`` is set. The caller commits.
+    """
+    from sqlalchemy import or_
+    from models.refresh_token import RefreshToken
+    
+    now = datetime.utcnow()
+    used_before = now - timedelta(days=current_app.config.get('AUTH_REFRESH_REUSE_DAYS', 7))
+    query = RefreshToken.query.filter(or_(
+        RefreshToken.expires_at < now,
+        RefreshToken.revoked.is_(True),
+        RefreshToken.used_at < used_before
+    ))
+    if user_id is not None:
+        query = query.filter(RefreshToken.user_id == user_id)
+    return query.delete(synchronize_session=False)
+
 @jwt.expired_token_loader
 def expired_token_callback(jwt_header, jwt_payload):
     """Handle expired token"""
@@ -46,6 +91,12 @@ def token_not_fresh_callback(jwt_header, jwt_payload):
         'error': 'fresh_token_required'
     }), 401
 
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    """Reject tokens issued before the user was deactivated or changed role"""
+    from .revocation import is_token_revoked
+    return is_token_revoked(jwt_payload)
+
 @jwt.revoked_token_loader
 def revoked_token_callback(jwt_header, jwt_payload):
     """Handle revoked token"""
@@ -0,0 +1,106 @@
+import time
+import threading
+from flask import current_app
+
+from models.user import db
+from models.token_revocation import TokenRevocation
+from services.replica import primary_reads
+
+# Each sync re-reads this far behind the newest revocation seen, so a row stamped
+# before it but committed after the previous sync is still picked up
+SYNC_OVERLAP_MS = 30000
+
+_clock_lock = threading.Lock()
+_last_ms = 0
+
+def now_ms():
+    """Current Unix time in milliseconds, strictly increasing within the process
+    
+    Revocations and token issue times both use it, so a token created after a
+    revocation in the same worker (e.g. by change-password) always has a later stamp.
+    """
+    global _last_ms
+    with _clock_lock:
+        _last_ms = max(int(time.time() * 1000), _last_ms + 1)
+        return _last_ms
+
+def token_issued_ms(jwt_payload):
+    """Issue time of a token in milliseconds (``iat_ms``, or ``iat`` for older tokens)"""
+    if 'iat_ms' in jwt_payload:
+        return jwt_payload['iat_ms']
+    return jwt_payload.get('iat', 0) * 1000
+
+class RevocationList:
+    """In-memory copy of the token_revocations table
+    
+    Lookups never touch the database. Every ``sync_interval`` seconds the list
+    pulls rows stamped after the newest one it has seen, minus ``SYNC_OVERLAP_MS``,
+    so revocations made by other workers apply within that interval; revocations
+    made by this worker apply immediately.
+    """
+    
+    def __init__(self, sync_interval, max_token_age):
+        self.sync_interval = sync_interval
+        self.max_token_age = max_token_age
+        self._revoked_at = {}
+        self._high_water = None
+        self._next_sync = 0
+        self._lock = threading.Lock()
+    
+    def _sync(self):
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        with self._lock:
+            if now < self._next_sync:
+                return
+            # Tokens older than the longest token lifetime are expired anyway
+            since = int(time.time() * 1000) - self.max_token_age * 1000
+            if self._high_water is not None:
+                since = max(since, self._high_water - SYNC_OVERLAP_MS)
+            # Never from a lagging replica: the high-water mark would skip late rows
+            with primary_reads():
+                rows = db.session.query(TokenRevocation.user_id, TokenRevocation.revoked_at) \
+                    .filter(TokenRevocation.revoked_at >= since).all()
+            for user_id, revoked_at in rows:
+                if revoked_at > self._revoked_at.get(user_id, 0):
+                    self._revoked_at[user_id] = revoked_at
+                self._high_water = max(self._high_water or 0, revoked_at)
+            self._next_sync = now + self.sync_interval
+    
+    def is_revoked(self, user_id, issued_ms):
+        self._sync()
+        revoked_at = self._revoked_at.get(user_id)
+        return revoked_at is not None and issued_ms <= revoked_at
+    
+    def revoke(self, user_id):
+        """Revoke every token issued to the user so far (the caller commits)"""
+        revoked_at = now_ms()
+        db.session.merge(TokenRevocation(user_id=user_id, revoked_at=revoked_at))
+        with self._lock:
+            self._revoked_at[user_id] = revoked_at
+
+def init_revocations(app):
+    """Set up the app's token revocation list"""
+    # Refresh tokens are revoked too, so keep entries for the longest token lifetime
+    max_token_age = int(max(
+        app.config['JWT_ACCESS_TOKEN_EXPIRES'],
+        app.config.get('JWT_REFRESH_TOKEN_EXPIRES') or app.config['JWT_ACCESS_TOKEN_EXPIRES']
+    ).total_seconds())
+    app.extensions['token_revocations'] = RevocationList(
+        sync_interval=app.config.get('AUTH_REVOCATION_SYNC_SECONDS', 5),
+        max_token_age=max_token_age
+    )
+
+def is_token_revoked(jwt_payload):
+    """Check a decoded token against the revocation list"""
+    revocations = current_app.extensions.get('token_revocations')
+    if revocations is None:
+        return False
+    return revocations.is_revoked(int(jwt_payload['sub']), token_issued_ms(jwt_payload))
+
+def revoke_user_tokens(user_id):
+    """Revoke all current tokens of a user, e.g. after deactivation or a role change"""
+    revocations = current_app.extensions.get('token_revocations')
+    if revocations is not None:
+        revocations.revoke(user_id)
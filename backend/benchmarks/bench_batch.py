@@ -0,0 +1,71 @@
+"""Benchmark the admin dashboard fan-out as separate requests vs one /api/batch call
+
+Runs against a SQLite file (so concurrent sub-requests get their own connections)
+with an optional sleep injected before every SQL statement to mimic network latency
+to the database. The response cache is disabled so every run does the real work.
+
+Usage: python benchmarks/bench_batch.py [injected ms per statement]
+"""
+import os
+import sys
+import time
+import tempfile
+import statistics
+
+from common import create_file_bench_app, seed, auth_headers, QueryCounter, InjectedLatency, print_table
+
+DASHBOARD_REQUESTS = [
+    {'path': '/api/analytics/dashboard'},
+    {'path': '/api/analytics/teams'},
+    {'path': '/api/analytics/projects'},
+    {'path': '/api/analytics/trends'},
+    {'path': '/api/checkins/weekly-summary'},
+    {'path': '/api/teams/'},
+    {'path': '/api/projects/', 'args': {'per_page': 20}},
+    {'path': '/api/users/', 'args': {'per_page': 20}},
+]
+
+
+def timed(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(latency_ms):
+    from models.user import db
+
+    app = create_file_bench_app(os.path.join(tempfile.gettempdir(), 'teampulse_bench_batch.db'))
+    seed(teams=10, users_per_team=20, projects_per_team=3, days=60)
+    app.extensions.pop('response_cache', None)
+    client = app.test_client()
+    headers = auth_headers(app)
+
+    def separate():
+        for sub_request in DASHBOARD_REQUESTS:
+            client.get(sub_request['path'], query_string=sub_request.get('args'), headers=headers)
+
+    def batch():
+        response = client.post('/api/batch', json={'requests': DASHBOARD_REQUESTS}, headers=headers)
+        assert all(item['status'] == 200 for item in response.get_json()['responses'])
+
+    rows = []
+    with InjectedLatency(db.engine, latency_ms):
+        for label, fn, workers in (('separate requests', separate, None),
+                                   ('batch, sequential', batch, 1),
+                                   ('batch, concurrent', batch, 4)):
+            if workers is not None:
+                app.config['BATCH_MAX_WORKERS'] = workers
+            db.session.remove()
+            with QueryCounter(db.engine) as counter:
+                fn()
+            rows.append((label, len(DASHBOARD_REQUESTS), counter.count, latency_ms, f'{timed(fn):.1f}'))
+
+    print_table(('mode', 'sub-requests', 'sql statements', 'injected ms', 'median ms'), rows)
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 2)
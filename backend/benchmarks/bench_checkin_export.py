@@ -0,0 +1,37 @@
+"""Benchmark GET /api/checkins/export: throughput and peak memory while streaming
+
+Usage: python benchmarks/bench_checkin_export.py [users...]
+Each user has one check-in per day for a year, so 3000 users is ~1.1M rows.
+"""
+import sys
+import time
+import tracemalloc
+
+from common import create_bench_app, seed, auth_headers, print_table
+
+
+def main(user_counts):
+    rows = []
+    for users in user_counts:
+        app = create_bench_app()
+        sizes = seed(teams=max(users // 50, 1), users_per_team=50, projects_per_team=2, days=365, checkin_rate=1.0)
+        client = app.test_client()
+        headers = auth_headers(app)
+        for export_format, gzip in (('csv', 'false'), ('ndjson', 'false'), ('csv', 'true')):
+            tracemalloc.start()
+            started = time.perf_counter()
+            response = client.get(f'/api/checkins/export?format={export_format}&gzip={gzip}', headers=headers)
+            size = sum(len(chunk) for chunk in response.response)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rows.append((
+                sizes['checkins'], export_format, gzip, f'{size / 1e6:.1f}',
+                f'{elapsed:.1f}', f'{sizes["checkins"] / elapsed:,.0f}', f'{peak / 1e6:.1f}'
+            ))
+
+    print_table(('checkins', 'format', 'gzip', 'MB', 'seconds', 'rows/s', 'peak MB'), rows)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100, 500])
@@ -0,0 +1,68 @@
+"""Benchmark bulk check-in ingestion against adding check-ins one ORM object at a time
+
+Backfills ``days`` of history for every seeded user, first through the ORM with a
+commit per check-in (what a naive import script does), then through
+POST /api/checkins/bulk as a fresh insert and as an upsert over the same rows.
+Verifies the rollups match the raw check-ins afterwards.
+
+Usage: python benchmarks/bench_checkin_ingest.py [users] [days]
+"""
+import sys
+import time
+import random
+from datetime import date, timedelta
+
+from common import create_bench_app, seed, auth_headers, QueryCounter, print_table
+
+
+def main(user_count, days):
+    from models.user import db, User
+    from models.checkin import CheckIn
+    from services.rollups import find_rollup_drift
+
+    app = create_bench_app()
+    seed(teams=user_count // 10 + 1, users_per_team=10, projects_per_team=2, days=0)
+    client = app.test_client()
+    headers = auth_headers(app)
+    rng = random.Random(7)
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id).limit(user_count)]
+    today = date.today()
+
+    def history(first_day, last_day):
+        return [{
+            'user_id': user_id,
+            'check_in_date': (today - timedelta(days=day)).isoformat(),
+            'mood_rating': rng.randint(1, 5),
+            'work_load_rating': rng.randint(1, 5),
+            'stress_level': rng.randint(1, 5)
+        } for user_id in user_ids for day in range(first_day, last_day)]
+
+    results = []
+
+    # Older half of the history through the ORM, newer half through the endpoint
+    orm_rows = history(days, 2 * days)
+    started = time.perf_counter()
+    with QueryCounter(db.engine) as counter:
+        for row in orm_rows:
+            db.session.add(CheckIn(**{**row, 'check_in_date': date.fromisoformat(row['check_in_date'])}))
+            db.session.commit()
+    elapsed = time.perf_counter() - started
+    results.append(('ORM, commit per row', len(orm_rows), counter.count, f'{elapsed:.2f}', f'{len(orm_rows) / elapsed:.0f}'))
+
+    bulk_rows = history(0, days)
+    for label, path in (('bulk insert', '/api/checkins/bulk'), ('bulk upsert', '/api/checkins/bulk?on_conflict=update')):
+        started = time.perf_counter()
+        with QueryCounter(db.engine) as counter:
+            response = client.post(path, json={'checkins': bulk_rows}, headers=headers)
+        elapsed = time.perf_counter() - started
+        body = response.get_json()
+        written = body['inserted'] + body['updated']
+        results.append((label, written, counter.count, f'{elapsed:.2f}', f'{len(bulk_rows) / elapsed:.0f}'))
+
+    print_table(('method', 'check-ins written', 'sql statements', 'seconds', 'rows/s'), results)
+    print('rollup drift rows:', len(find_rollup_drift()))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 30)
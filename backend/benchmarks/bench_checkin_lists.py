@@ -0,0 +1,34 @@
+"""SQL statements per request for the check-in list endpoints as page size grows
+
+Usage: python benchmarks/bench_checkin_lists.py [per_page values...]
+"""
+import sys
+
+from common import create_bench_app, seed, auth_headers, measure, print_table
+
+
+def main(page_sizes):
+    app = create_bench_app()
+    sizes = seed(teams=10, users_per_team=20, projects_per_team=3, days=30)
+    client = app.test_client()
+    headers = auth_headers(app)
+
+    rows = []
+    for per_page in page_sizes:
+        for path in (
+            f'/api/checkins/?per_page={per_page}',
+            f'/api/checkins/?per_page={per_page}&team_id=1',
+            f'/api/checkins/?per_page={per_page}&cursor=',
+        ):
+            status, statements, latency = measure(client, path, headers=headers)
+            rows.append((per_page, path, status, statements, f'{latency:.1f}'))
+
+    status, statements, latency = measure(client, '/api/checkins/weekly-summary', headers=headers)
+    rows.append(('-', '/api/checkins/weekly-summary', status, statements, f'{latency:.1f}'))
+
+    print(f"{sizes['checkins']} check-ins")
+    print_table(('per_page', 'path', 'status', 'sql statements', 'median ms'), rows)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100, 500])
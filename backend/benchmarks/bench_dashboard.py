@@ -0,0 +1,68 @@
+"""Benchmark the dashboard overview: one query per figure vs the single combined statement
+
+Each SQL statement gets an injected sleep to mimic the round trip to a managed
+database, so the per-statement count dominates latency the way it does in
+production. "separate queries" replays the six queries the endpoints used to run
+one after another; the endpoint rows go through the real routes with the response
+cache disabled.
+
+Usage: python benchmarks/bench_dashboard.py [injected ms per statement ...]
+"""
+import sys
+import time
+import statistics
+from datetime import date, timedelta
+
+from common import create_bench_app, seed, auth_headers, measure, InjectedLatency, QueryCounter, print_table
+
+
+def separate_queries():
+    """The dashboard overview as six sequential queries"""
+    from models.user import User
+    from models.team import Team
+    from models.project import Project
+    from models.checkin_rollup import CheckInDailyRollup
+
+    end_date = date.today()
+    User.query.filter_by(is_active=True).count()
+    Team.query.count()
+    Project.query.count()
+    Project.query.filter_by(status='active').count()
+    CheckInDailyRollup.aggregate_query(start_date=end_date - timedelta(days=30), end_date=end_date).one()
+    CheckInDailyRollup.aggregate_query(start_date=end_date - timedelta(days=7), end_date=end_date).one()
+
+
+def main(latencies):
+    from models.user import db
+    from routes.analytics_routes import _dashboard_overview
+
+    app = create_bench_app()
+    seed(teams=20, users_per_team=20, projects_per_team=3, days=180)
+    app.extensions.pop('response_cache', None)
+    client = app.test_client()
+    headers = auth_headers(app)
+    end_date = date.today()
+
+    def combined_query():
+        _dashboard_overview(end_date - timedelta(days=30), end_date, end_date - timedelta(days=7))
+
+    rows = []
+    for latency in latencies:
+        with InjectedLatency(db.engine, latency):
+            for label, fn in (('separate queries', separate_queries), ('combined statement', combined_query)):
+                timings = []
+                for _ in range(5):
+                    with QueryCounter(db.engine) as counter:
+                        started = time.perf_counter()
+                        fn()
+                        timings.append((time.perf_counter() - started) * 1000)
+                rows.append((label, latency, counter.count, f'{statistics.median(timings):.1f}'))
+            for path in ('/api/analytics/dashboard', '/api/analytics/dashboard-basic'):
+                status, statements, latency_ms = measure(client, path, headers=headers)
+                rows.append((f'GET {path}', latency, statements, f'{latency_ms:.1f}'))
+
+    print_table(('case', 'injected ms', 'sql statements', 'median ms'), rows)
+
+
+if __name__ == '__main__':
+    main([float(value) for value in sys.argv[1:]] or [0, 5, 20])
@@ -0,0 +1,77 @@
+"""Benchmark a login burst with and without bcrypt admission control
+
+Fires a burst of concurrent logins while another thread keeps requesting the
+analytics dashboard, once with an effectively unbounded hashing pool and once
+with the configured bounds. Reports login outcomes and dashboard latency.
+
+Usage: python benchmarks/bench_login_burst.py [logins] [workers] [queue limit]
+"""
+import io
+import sys
+import time
+import threading
+import statistics
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from common import create_bench_app, seed, auth_headers, print_table
+
+
+def burst(app, emails, headers):
+    """Run the login burst; return (login statuses, login ms, dashboard ms)"""
+    done = threading.Event()
+    dashboard_ms = []
+
+    def poll_dashboard():
+        client = app.test_client()
+        while not done.is_set():
+            started = time.perf_counter()
+            client.get('/api/analytics/dashboard', headers=headers)
+            dashboard_ms.append((time.perf_counter() - started) * 1000)
+
+    def login(email):
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post('/api/auth/login', json={'email': email, 'password': 'password123'})
+        return response.status_code, (time.perf_counter() - started) * 1000
+
+    poller = threading.Thread(target=poll_dashboard)
+    poller.start()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=len(emails)) as pool:
+        results = list(pool.map(login, emails))
+    done.set()
+    poller.join()
+    return [status for status, _ in results], [ms for _, ms in results], dashboard_ms
+
+
+def main(logins, workers, queue_limit):
+    from models.user import User
+    from services.passwords import PasswordHasher
+
+    app = create_bench_app()
+    seed(teams=logins // 10 + 1, users_per_team=10, projects_per_team=1, days=30)
+    headers = auth_headers(app)
+    # Measure the dashboard queries themselves, not cache hits
+    app.extensions.pop('response_cache', None)
+    emails = [user.email for user in User.query.filter_by(role='employee', is_active=True).limit(logins)]
+
+    rows = []
+    for label, pool_workers, pool_queue in (('unbounded', logins, logins), ('bounded', workers, queue_limit)):
+        app.extensions['password_hasher'] = PasswordHasher(workers=pool_workers, queue_limit=pool_queue, wait_timeout=60)
+        statuses, login_ms, dashboard_ms = burst(app, emails, headers)
+        rows.append((
+            label, pool_workers, pool_queue, statuses.count(200), statuses.count(503),
+            len(statuses) - statuses.count(200) - statuses.count(503),
+            f'{statistics.median(login_ms):.0f}', f'{max(login_ms):.0f}',
+            len(dashboard_ms), f'{statistics.median(dashboard_ms):.1f}' if dashboard_ms else '-'
+        ))
+
+    print_table(('pool', 'workers', 'queue', 'logins ok', 'shed 503', 'other',
+                 'login p50 ms', 'login max ms',
+                 'dashboard requests', 'dashboard p50 ms'), rows)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 2,
+         int(sys.argv[3]) if len(sys.argv) > 3 else 6)
@@ -0,0 +1,54 @@
+"""Benchmark the cost of per-request metrics
+
+Serves the same requests with METRICS_ENABLED off and on and reports median
+latency, then prints the Server-Timing header and a sample of /metrics.
+
+Usage: python benchmarks/bench_metrics_overhead.py [requests per endpoint]
+"""
+import sys
+import time
+import statistics
+
+from common import create_bench_app, seed, auth_headers, print_table
+from config import config
+
+PATHS = ('/health', '/api/teams', '/api/analytics/dashboard', '/api/checkins/')
+
+
+def build(enabled):
+    config['testing'].METRICS_ENABLED = enabled
+    app = create_bench_app()
+    seed(teams=10, users_per_team=10, projects_per_team=2, days=60)
+    app.extensions.pop('response_cache', None)
+    return app, app.test_client(), auth_headers(app)
+
+
+def main(requests):
+    setups = {enabled: build(enabled) for enabled in (False, True)}
+    samples = {(enabled, path): [] for enabled in setups for path in PATHS}
+
+    # Alternate between the two apps in small rounds so drift affects both equally
+    for _ in range(max(requests // 20, 1)):
+        for enabled, (app, client, headers) in setups.items():
+            for path in PATHS:
+                for _ in range(20):
+                    started = time.perf_counter()
+                    client.get(path, headers=headers)
+                    samples[(enabled, path)].append((time.perf_counter() - started) * 1000)
+
+    rows = []
+    for path in PATHS:
+        off = statistics.median(samples[(False, path)])
+        on = statistics.median(samples[(True, path)])
+        rows.append((path, f'{off:.3f}', f'{on:.3f}', f'{on - off:+.3f}'))
+    print_table(('path', 'metrics off ms', 'metrics on ms', 'overhead ms'), rows)
+
+    app, client, headers = setups[True]
+    response = client.get('/api/analytics/dashboard', headers=headers)
+    print(f"\nServer-Timing: {response.headers.get('Server-Timing')}\n")
+    body = client.get('/metrics', headers=headers).get_data(as_text=True)
+    print('\n'.join(line for line in body.splitlines() if 'dashboard' in line and '_bucket' not in line))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
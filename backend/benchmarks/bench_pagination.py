@@ -0,0 +1,44 @@
+"""Benchmark offset vs cursor pagination of GET /api/checkins at page 1 and a deep page
+
+Usage: python benchmarks/bench_pagination.py [deep page]
+"""
+import sys
+
+from common import create_bench_app, seed, auth_headers, measure, print_table
+
+
+def main(deep_page):
+    from models.checkin import CheckIn
+    from services.pagination import encode_cursor
+
+    per_page = 20
+    app = create_bench_app()
+    # ~100k check-ins: 400 users x 365 days x 0.7
+    sizes = seed(teams=20, users_per_team=20, projects_per_team=2, days=365, checkin_rate=0.7)
+    client = app.test_client()
+    headers = auth_headers(app)
+
+    # Cursor pointing at the last row of the page before the deep page
+    last = CheckIn.query.order_by(CheckIn.check_in_date.desc(), CheckIn.id.desc()) \
+        .offset((deep_page - 1) * per_page - 1).first()
+    deep_cursor = encode_cursor([last.check_in_date, last.id])
+
+    cases = [
+        ('offset', 1, f'/api/checkins/?per_page={per_page}&page=1'),
+        ('offset', deep_page, f'/api/checkins/?per_page={per_page}&page={deep_page}'),
+        ('offset, no total', 1, f'/api/checkins/?per_page={per_page}&page=1&include_total=false'),
+        ('offset, no total', deep_page, f'/api/checkins/?per_page={per_page}&page={deep_page}&include_total=false'),
+        ('cursor', 1, f'/api/checkins/?per_page={per_page}&cursor='),
+        ('cursor', deep_page, f'/api/checkins/?per_page={per_page}&cursor={deep_cursor}'),
+    ]
+
+    rows = []
+    for mode, page, path in cases:
+        status, statements, latency = measure(client, path, headers=headers)
+        rows.append((sizes['checkins'], mode, page, status, statements, f'{latency:.1f}'))
+
+    print_table(('checkins', 'mode', 'page', 'status', 'sql statements', 'median ms'), rows)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
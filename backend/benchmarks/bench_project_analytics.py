@@ -0,0 +1,25 @@
+"""Benchmark GET /api/analytics/projects as the number of projects grows
+
+Usage: python benchmarks/bench_project_analytics.py [team counts...]
+"""
+import sys
+
+from common import create_bench_app, seed, auth_headers, measure, print_table
+
+
+def main(team_counts):
+    rows = []
+    for teams in team_counts:
+        app = create_bench_app()
+        sizes = seed(teams=teams, users_per_team=10, projects_per_team=10, days=30)
+        client = app.test_client()
+        headers = auth_headers(app)
+        for path in ('/api/analytics/projects', '/api/analytics/projects?status=active&sort_by=priority&order=desc'):
+            status, statements, latency = measure(client, path, headers=headers)
+            rows.append((sizes['projects'], sizes['checkins'], path, status, statements, f'{latency:.1f}'))
+
+    print_table(('projects', 'checkins', 'path', 'status', 'sql statements', 'median ms'), rows)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10, 50, 200])
@@ -0,0 +1,42 @@
+"""Benchmark staffing a project one user per request vs the bulk assign endpoint
+
+Usage: python benchmarks/bench_project_assignment.py [users]
+"""
+import sys
+import time
+
+from common import create_bench_app, seed, auth_headers, QueryCounter, print_table
+
+
+def main(users):
+    from models.user import db, User
+
+    app = create_bench_app()
+    seed(teams=users // 10 + 1, users_per_team=10, projects_per_team=1, days=0)
+    client = app.test_client()
+    headers = auth_headers(app)
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id).limit(users)]
+
+    # Fresh projects so neither method starts with existing assignments
+    project_ids = [client.post('/api/projects/', json={'title': f'Staffing {i}', 'team_id': 1},
+                               headers=headers).get_json()['project']['id'] for i in range(2)]
+
+    rows = []
+    started = time.perf_counter()
+    with QueryCounter(db.engine) as counter:
+        for user_id in user_ids:
+            client.post(f'/api/projects/{project_ids[0]}/assign/{user_id}', headers=headers)
+    elapsed = time.perf_counter() - started
+    rows.append(('one request per user', len(user_ids), len(user_ids), counter.count, f'{elapsed * 1000:.0f}'))
+
+    started = time.perf_counter()
+    with QueryCounter(db.engine) as counter:
+        response = client.post(f'/api/projects/{project_ids[1]}/assign', json={'user_ids': user_ids}, headers=headers)
+    elapsed = time.perf_counter() - started
+    rows.append(('bulk assign', len(response.get_json()['assigned']), 1, counter.count, f'{elapsed * 1000:.0f}'))
+
+    print_table(('method', 'users assigned', 'requests', 'sql statements', 'total ms'), rows)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,99 @@
+"""Benchmark worker startup: importing app.py and serving the first request
+
+Each sample is a fresh interpreter, like a gunicorn worker booting, pointed at a
+SQLite file that already has its schema and sample data. "import + init" replays
+what importing app.py used to do (create_all and the sample-data checks on every
+boot); "import only" is the current import path. Every SQL statement gets an
+injected sleep to mimic a database across a network.
+
+Usage: python benchmarks/bench_startup.py [workers] [injected ms per statement]
+"""
+import os
+import sys
+import json
+import tempfile
+import statistics
+import subprocess
+
+from common import BACKEND_DIR, print_table
+
+WORKER = r'''
+import sys, time, json
+started = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+statements = []
+latency = float(sys.argv[2]) / 1000
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+    time.sleep(latency)
+
+import contextlib, io
+with contextlib.redirect_stdout(io.StringIO()):
+    from app import app
+    imported = time.perf_counter()
+    if sys.argv[1] == 'init':
+        from models.user import db
+        from services.sample_data import seed_sample_data
+        with app.app_context():
+            db.create_all()
+            seed_sample_data()
+initialized = time.perf_counter()
+import_statements = len(statements)
+
+from flask_jwt_extended import create_access_token
+with app.app_context():
+    token = create_access_token(identity='1')
+response = app.test_client().get('/api/teams', headers={'Authorization': f'Bearer {token}'})
+assert response.status_code == 200, response.status_code
+first_request = time.perf_counter()
+
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'init_ms': (initialized - imported) * 1000,
+    'ready_ms': (first_request - started) * 1000,
+    'import_statements': import_statements
+}))
+'''
+
+
+def boot(mode, latency, database_url):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    output = subprocess.run(
+        [sys.executable, '-c', WORKER, mode, str(latency)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(workers, latency):
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite:///{os.path.join(directory, 'startup.db')}"
+        subprocess.run(
+            [sys.executable, '-m', 'flask', '--app', 'app', 'init-db', '--seed'],
+            cwd=BACKEND_DIR, env=dict(os.environ, DATABASE_URL=database_url),
+            capture_output=True, check=True
+        )
+
+        rows = []
+        for label, mode in (('import + init', 'init'), ('import only', 'import')):
+            samples = [boot(mode, latency, database_url) for _ in range(workers)]
+            rows.append((
+                label,
+                samples[0]['import_statements'],
+                f"{statistics.median(s['import_ms'] for s in samples):.0f}",
+                f"{statistics.median(s['init_ms'] for s in samples):.1f}",
+                f"{statistics.median(s['ready_ms'] for s in samples):.0f}",
+                f"{sum(s['ready_ms'] for s in samples):.0f}"
+            ))
+
+    print(f'{workers} worker boots, {latency:g} ms injected per SQL statement')
+    print_table(('startup', 'sql at boot', 'module import ms', 'db init ms', 'first request ms', f'{workers} workers total ms'), rows)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 4, float(args[1]) if len(args) > 1 else 5)
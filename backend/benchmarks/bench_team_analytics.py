@@ -0,0 +1,25 @@
+"""Benchmark GET /api/analytics/teams as the number of teams grows
+
+Usage: python benchmarks/bench_team_analytics.py [team counts...]
+"""
+import sys
+
+from common import create_bench_app, seed, auth_headers, measure, print_table
+
+
+def main(team_counts):
+    rows = []
+    for teams in team_counts:
+        app = create_bench_app()
+        sizes = seed(teams=teams, users_per_team=8, projects_per_team=2, days=90)
+        client = app.test_client()
+        status, statements, latency = measure(
+            client, '/api/analytics/teams?days=90', headers=auth_headers(app)
+        )
+        rows.append((teams, sizes['users'], sizes['checkins'], status, statements, f'{latency:.1f}'))
+
+    print_table(('teams', 'users', 'checkins', 'status', 'sql statements', 'median ms'), rows)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10, 50, 200, 500])
@@ -0,0 +1,32 @@
+"""SQL statements, latency and peak memory of GET /api/teams and GET /api/projects
+
+Usage: python benchmarks/bench_team_listing.py [teams] [users per team]
+"""
+import sys
+import tracemalloc
+
+from common import create_bench_app, seed, auth_headers, measure, print_table
+
+
+def main(teams, users_per_team):
+    app = create_bench_app()
+    sizes = seed(teams=teams, users_per_team=users_per_team, projects_per_team=4, days=0)
+    client = app.test_client()
+    headers = auth_headers(app)
+
+    rows = []
+    for path in ('/api/teams/', '/api/projects/?per_page=100'):
+        status, statements, latency = measure(client, path, headers=headers)
+        tracemalloc.start()
+        client.get(path, headers=headers)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rows.append((path, status, statements, f'{latency:.1f}', f'{peak / 1e6:.1f}'))
+
+    print(f"{sizes['teams']} teams, {sizes['users']} users, {sizes['projects']} projects")
+    print_table(('path', 'status', 'sql statements', 'median ms', 'peak MB'), rows)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 500, args[1] if len(args) > 1 else 40)
@@ -0,0 +1,63 @@
+"""Benchmark a reorg: moving users between teams one request at a time vs in bulk
+
+Moves ``users`` people into another team with POST /api/teams/<id>/members/<user_id>
+per user, then moves them back with a single POST /api/teams/memberships, and checks
+the check-in rollups against the raw check-ins after each step.
+
+Usage: python benchmarks/bench_team_reorg.py [users] [days]
+"""
+import sys
+import time
+
+from common import create_bench_app, seed, auth_headers, QueryCounter, print_table
+
+
+def main(users, days):
+    from models.user import db, User
+    from services.rollups import find_rollup_drift
+
+    app = create_bench_app()
+    seed(teams=users // 10 + 2, users_per_team=10, projects_per_team=1, days=days)
+    client = app.test_client()
+    headers = auth_headers(app)
+    # Everyone outside the last team moves into it
+    target_team = users // 10 + 2
+    moving = db.session.query(User.id, User.team_id).filter(User.team_id != target_team) \
+        .order_by(User.id).limit(users).all()
+
+    rows = []
+    started = time.perf_counter()
+    with QueryCounter(db.engine) as counter:
+        for user_id, _ in moving:
+            client.post(f'/api/teams/{target_team}/members/{user_id}', headers=headers)
+    elapsed = time.perf_counter() - started
+    rows.append(('one request per user', len(moving), counter.count, f'{elapsed * 1000:.0f}',
+                 len(find_rollup_drift())))
+
+    # Back to their original teams: one bulk call per original team
+    by_team = {}
+    for user_id, team_id in moving:
+        by_team.setdefault(team_id, []).append(user_id)
+    started = time.perf_counter()
+    with QueryCounter(db.engine) as counter:
+        for team_id, user_ids in by_team.items():
+            client.post('/api/teams/memberships', json={'team_id': team_id, 'user_ids': user_ids}, headers=headers)
+    elapsed = time.perf_counter() - started
+    rows.append((f'bulk ({len(by_team)} calls)', len(moving), counter.count, f'{elapsed * 1000:.0f}',
+                 len(find_rollup_drift())))
+
+    started = time.perf_counter()
+    with QueryCounter(db.engine) as counter:
+        response = client.post('/api/teams/memberships',
+                               json={'team_id': target_team, 'user_ids': [user_id for user_id, _ in moving]},
+                               headers=headers)
+    elapsed = time.perf_counter() - started
+    rows.append(('bulk (1 call)', response.get_json()['moved'], counter.count, f'{elapsed * 1000:.0f}',
+                 len(find_rollup_drift())))
+
+    print_table(('method', 'users moved', 'sql statements', 'total ms', 'rollup drift rows'), rows)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 30)
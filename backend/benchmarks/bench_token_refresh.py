@@ -0,0 +1,61 @@
+"""Benchmark server CPU for keeping sessions alive: hourly re-login vs refresh tokens
+
+Simulates a population of sessions over a working day. Without refresh tokens every
+session logs in again each time its access token expires, paying a bcrypt check per
+hour; with them it logs in once and then calls /api/auth/refresh.
+
+Usage: python benchmarks/bench_token_refresh.py [sessions] [hours]
+"""
+import io
+import sys
+import time
+import contextlib
+
+from common import create_bench_app, seed, print_table
+
+
+def run(client, emails, hours, use_refresh):
+    """Return (requests, CPU seconds, failures) for one simulated day"""
+    refresh_tokens = {}
+    requests = failures = 0
+    started = time.process_time()
+    # login() prints progress; keep it out of the timing and the output
+    with contextlib.redirect_stdout(io.StringIO()):
+        for hour in range(hours):
+            for session, email in enumerate(emails):
+                if use_refresh and hour > 0:
+                    response = client.post('/api/auth/refresh', headers={
+                        'Authorization': f'Bearer {refresh_tokens[session]}'
+                    })
+                else:
+                    response = client.post('/api/auth/login', json={
+                        'email': email, 'password': 'password123'
+                    })
+                requests += 1
+                if response.status_code != 200:
+                    failures += 1
+                    continue
+                refresh_tokens[session] = response.get_json()['refresh_token']
+    return requests, time.process_time() - started, failures
+
+
+def main(sessions, hours):
+    from models.user import User
+
+    app = create_bench_app()
+    seed(teams=sessions // 10 + 1, users_per_team=10, projects_per_team=1, days=1)
+    client = app.test_client()
+    emails = [user.email for user in User.query.filter_by(role='employee', is_active=True).limit(sessions)]
+
+    rows = []
+    for label, use_refresh in (('re-login every hour', False), ('login + refresh', True)):
+        requests, cpu, failures = run(client, emails, hours, use_refresh)
+        rows.append((label, sessions, hours, requests, failures, f'{cpu:.2f}',
+                     f'{cpu / requests * 1000:.1f}'))
+
+    print_table(('strategy', 'sessions', 'hours', 'requests', 'failures', 'cpu s', 'cpu ms/request'), rows)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 8)
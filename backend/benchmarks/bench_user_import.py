@@ -0,0 +1,54 @@
+"""Benchmark onboarding users one register call at a time vs the bulk import endpoint
+
+Uses a low bcrypt cost by default so the comparison finishes quickly; pass a higher
+cost to see hashing dominate (and the process pool matter on multi-core machines).
+
+Usage: python benchmarks/bench_user_import.py [users] [bcrypt rounds]
+"""
+import sys
+import time
+
+from common import create_bench_app, seed, auth_headers, QueryCounter, print_table
+
+
+def main(users, rounds):
+    from models.user import db, User
+
+    app = create_bench_app()
+    app.config['BCRYPT_LOG_ROUNDS'] = rounds
+    app.extensions['password_hasher'].rounds = rounds
+    seed(teams=5, users_per_team=1, projects_per_team=0, days=0)
+    client = app.test_client()
+    headers = auth_headers(app)
+
+    def rows(prefix):
+        return [{
+            'email': f'{prefix}{i}@example.com', 'password': 'password123',
+            'first_name': 'New', 'last_name': str(i), 'team': f'Team {i % 5 + 1}'
+        } for i in range(users)]
+
+    results = []
+
+    started = time.perf_counter()
+    with QueryCounter(db.engine) as counter:
+        for row in rows('register'):
+            team_id = int(row.pop('team').split()[-1])
+            client.post('/api/auth/register', json={**row, 'team_id': team_id}, headers=headers)
+    elapsed = time.perf_counter() - started
+    results.append(('register per user', users, counter.count, f'{elapsed:.2f}', f'{users / elapsed:.0f}'))
+
+    started = time.perf_counter()
+    with QueryCounter(db.engine) as counter:
+        response = client.post('/api/users/import', json={'users': rows('import')}, headers=headers)
+    elapsed = time.perf_counter() - started
+    body = response.get_json()
+    results.append(('bulk import', body['imported'], counter.count, f'{elapsed:.2f}', f'{users / elapsed:.0f}'))
+
+    assert User.query.count() == 6 + 2 * users
+    print_table(('method', 'users created', 'sql statements', 'seconds', 'users/s'), results)
+    print('import phases:', {k: v for k, v in body['stats'].items() if k.endswith('_ms')})
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 4)
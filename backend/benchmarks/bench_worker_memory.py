@@ -0,0 +1,126 @@
+"""Benchmark gunicorn worker memory with and without preloading the app
+
+Starts gunicorn (with gunicorn.conf.py) on a seeded SQLite file for each worker count,
+once with GUNICORN_PRELOAD off and once on, sends some authenticated requests so every
+worker has served traffic, then reads /proc/<pid>/smaps_rollup for the master and each
+worker. RSS counts shared pages in every process; USS (private pages) is what a worker
+really adds; PSS splits shared pages between the processes that map them, so the
+total PSS is the instance's real footprint. Linux only.
+
+Usage: python benchmarks/bench_worker_memory.py [worker counts ...]
+"""
+import io
+import os
+import sys
+import time
+import socket
+import contextlib
+import tempfile
+import subprocess
+import urllib.request
+
+from common import BACKEND_DIR, print_table
+
+JWT_SECRET = 'bench-worker-memory'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def memory_kb(pid):
+    """RSS, PSS and USS of a process in kB"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return values['Rss'], values['Pss'], values['Private_Clean'] + values['Private_Dirty']
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as handle:
+        return [int(child) for child in handle.read().split()]
+
+
+def access_token():
+    os.environ['JWT_SECRET_KEY'] = JWT_SECRET
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    app = create_app('testing')
+    with app.app_context():
+        return create_access_token(identity='1')
+
+
+def run(workers, preload, env, token):
+    port = free_port()
+    env = dict(env, GUNICORN_PRELOAD=str(preload), WEB_CONCURRENCY=str(workers))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-b', f'127.0.0.1:{port}', 'app:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.time() + 60
+        while len(children(server.pid)) < workers or not _up(port):
+            if time.time() > deadline:
+                raise RuntimeError('gunicorn did not start')
+            time.sleep(0.2)
+
+        request = urllib.request.Request(
+            f'http://127.0.0.1:{port}/api/analytics/dashboard', headers={'Authorization': f'Bearer {token}'}
+        )
+        for _ in range(30 * workers):
+            urllib.request.urlopen(request).read()
+        time.sleep(0.5)
+
+        master = memory_kb(server.pid)
+        worker_memory = [memory_kb(pid) for pid in children(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+
+    count = len(worker_memory)
+    return (
+        workers,
+        'preload' if preload else 'per worker',
+        f'{sum(m[0] for m in worker_memory) / count / 1024:.1f}',
+        f'{sum(m[2] for m in worker_memory) / count / 1024:.1f}',
+        f'{(master[1] + sum(m[1] for m in worker_memory)) / 1024:.1f}'
+    )
+
+
+def _up(port):
+    try:
+        urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1).read()
+        return True
+    except OSError:
+        return False
+
+
+def main(worker_counts):
+    token = access_token()
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ, JWT_SECRET_KEY=JWT_SECRET,
+            DATABASE_URL=f"sqlite:///{os.path.join(directory, 'memory.db')}"
+        )
+        subprocess.run(
+            [sys.executable, '-m', 'flask', '--app', 'app', 'init-db', '--seed'],
+            cwd=BACKEND_DIR, env=env, capture_output=True, check=True
+        )
+
+        rows = []
+        for workers in worker_counts:
+            for preload in (False, True):
+                rows.append(run(workers, preload, env, token))
+
+    print_table(('workers', 'mode', 'RSS/worker MB', 'USS/worker MB', 'total PSS MB'), rows)
+
+
+if __name__ == '__main__':
+    main([int(value) for value in sys.argv[1:]] or [1, 2, 4, 8])
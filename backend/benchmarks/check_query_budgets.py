@@ -0,0 +1,240 @@
+"""Check every route's SQL statement count against its declared query budget
+
+Seeds a small and a large database, sends the same request to every route on
+both and counts the statements each request runs. A route fails if it has no
+``@query_budget``, runs more statements than its budget, or runs more statements
+on the large database than on the small one (an N+1: the count follows the data).
+A route missing from CASES fails too, so new routes must be added here.
+
+Usage: python benchmarks/check_query_budgets.py [--verbose]
+"""
+import io
+import sys
+import contextlib
+from datetime import date, timedelta
+
+from common import create_bench_app, seed, auth_headers, QueryCounter, print_table
+from config import config
+
+# The small database fits on one page of every listing, so a per-row query on a
+# paginated route still shows up as growth
+SIZES = {
+    'small': dict(teams=2, users_per_team=2, projects_per_team=1, days=3),
+    'large': dict(teams=12, users_per_team=12, projects_per_team=4, days=60)
+}
+
+TODAY = date.today()
+
+
+def _dates(count):
+    return [(TODAY - timedelta(days=400 + offset)).isoformat() for offset in range(count)]
+
+
+# (method, path, role, body); paths and bodies are formatted with the fixture ids.
+# Order matters: later cases use what earlier ones created and clean it up again.
+CASES = [
+    ('GET', '/', None, None),
+    ('GET', '/health', None, None),
+    ('GET', '/debug/users', None, None),
+    ('GET', '/metrics', 'admin', None),
+    ('GET', '/api/system/db-pool', 'admin', None),
+    ('POST', '/api/auth/login', None, {'email': 'admin@teampulse.com', 'password': 'password123'}),
+    ('POST', '/api/auth/refresh', 'refresh', None),
+    ('GET', '/api/auth/me', 'employee', None),
+    ('GET', '/api/auth/password-hasher', 'admin', None),
+    ('POST', '/api/auth/register', 'admin',
+     {'email': 'budget.register@example.com', 'password': 'password123', 'first_name': 'Budget', 'last_name': 'Register'}),
+    ('PUT', '/api/auth/change-password', 'scratch',
+     {'current_password': 'password123', 'new_password': 'password456'}),
+    ('GET', '/api/analytics/dashboard-basic', 'employee', None),
+    ('GET', '/api/analytics/dashboard', 'admin', None),
+    ('GET', '/api/analytics/teams', 'admin', None),
+    ('GET', '/api/analytics/projects', 'admin', None),
+    ('GET', '/api/analytics/trends', 'admin', None),
+    ('GET', '/api/analytics/cache', 'admin', None),
+    ('GET', '/api/users/', 'admin', None),
+    ('GET', '/api/users/{employee}', 'admin', None),
+    ('GET', '/api/users/profile', 'employee', None),
+    ('PUT', '/api/users/profile', 'employee', {'first_name': 'Budget'}),
+    ('PUT', '/api/users/{scratch}', 'admin', {'last_name': 'Scratch'}),
+    ('POST', '/api/users/import', 'admin', {'users': [
+        {'email': f'budget.import{n}@example.com', 'password': 'password123', 'first_name': 'Import', 'last_name': str(n)}
+        for n in range(3)
+    ]}),
+    ('GET', '/api/teams/', 'admin', None),
+    ('GET', '/api/teams/{team}', 'admin', None),
+    ('GET', '/api/teams/{team}/members', 'admin', None),
+    ('POST', '/api/teams/', 'admin', {'name': 'Budget Team'}),
+    ('PUT', '/api/teams/{new_team}', 'admin', {'description': 'Checked'}),
+    ('POST', '/api/teams/{new_team}/members/{scratch}', 'admin', None),
+    ('DELETE', '/api/teams/{new_team}/members/{scratch}', 'admin', None),
+    ('POST', '/api/teams/memberships', 'admin', {'team_id': '{new_team}', 'user_ids': ['{scratch}']}),
+    ('GET', '/api/projects/', 'admin', None),
+    ('GET', '/api/projects/{project}', 'admin', None),
+    ('GET', '/api/projects/{project}/assigned-users', 'admin', None),
+    ('POST', '/api/projects/', 'admin', {'title': 'Budget Project', 'team_id': '{team}'}),
+    ('PUT', '/api/projects/{new_project}', 'admin', {'priority': 'high'}),
+    ('POST', '/api/projects/{new_project}/assign/{scratch}', 'admin', None),
+    ('DELETE', '/api/projects/{new_project}/unassign/{scratch}', 'admin', None),
+    ('POST', '/api/projects/{new_project}/assign', 'admin', {'user_ids': ['{scratch}', '{employee}']}),
+    ('POST', '/api/projects/{new_project}/unassign', 'admin', {'user_ids': ['{scratch}', '{employee}']}),
+    ('GET', '/api/checkins/', 'admin', None),
+    ('GET', '/api/checkins/export', 'admin', None),
+    ('GET', '/api/checkins/my-checkins', 'employee', None),
+    ('GET', '/api/checkins/weekly-summary', 'admin', None),
+    ('GET', '/api/checkins/{checkin}', 'admin', None),
+    ('POST', '/api/checkins/', 'scratch', {'mood_rating': 4, 'work_load_rating': 3}),
+    ('PUT', '/api/checkins/{new_checkin}', 'scratch', {'mood_rating': 2}),
+    ('DELETE', '/api/checkins/{new_checkin}', 'admin', None),
+    ('POST', '/api/checkins/bulk', 'admin', [
+        {'user_id': '{scratch}', 'check_in_date': day, 'mood_rating': 3} for day in _dates(3)
+    ]),
+    ('POST', '/api/batch', 'admin', {'requests': [
+        {'method': 'GET', 'path': '/api/teams'},
+        {'method': 'GET', 'path': '/api/analytics/dashboard'}
+    ]}),
+    ('DELETE', '/api/projects/{new_project}', 'admin', None),
+    ('POST', '/api/teams/memberships', 'admin', {'team_id': None, 'user_ids': ['{scratch}']}),
+    ('DELETE', '/api/teams/{new_team}', 'admin', None),
+    ('DELETE', '/api/users/{scratch}', 'admin', None),
+    ('PUT', '/api/users/{scratch}/reactivate', 'admin', None),
+]
+
+
+def _fill(value, ids):
+    """Format fixture ids into strings; a whole-placeholder string becomes an int"""
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in ids:
+            return ids[value[1:-1]]
+        return value.format(**ids)
+    if isinstance(value, list):
+        return [_fill(item, ids) for item in value]
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    return value
+
+
+def run_size(name, sizes):
+    """Return the app, {(method, path): statements} and request failures for one size"""
+    from models.user import db, User
+    from models.checkin import CheckIn
+    from models.project import Project
+    from auth.jwt_auth import create_user_token
+
+    app = create_bench_app()
+    seed(**sizes)
+    client = app.test_client()
+
+    employee = User.query.filter_by(role='employee', is_active=True).filter(User.team_id.isnot(None)).first()
+    scratch = User(email='budget.scratch@example.com', password='password123', first_name='Scratch', last_name='User')
+    db.session.add(scratch)
+    db.session.commit()
+    ids = {
+        'team': employee.team_id,
+        'employee': employee.id,
+        'scratch': scratch.id,
+        'project': Project.query.filter_by(team_id=employee.team_id).first().id,
+        'checkin': CheckIn.query.first().id
+    }
+    headers = {
+        'admin': auth_headers(app),
+        'employee': {'Authorization': f'Bearer {create_user_token(employee.id, employee.email, employee.role)}'},
+        'scratch': {'Authorization': f'Bearer {create_user_token(scratch.id, scratch.email, scratch.role)}'}
+    }
+    db.session.remove()
+
+    # Warm up once per role: the first request of a worker syncs the revocation list
+    for role in ('admin', 'employee', 'scratch'):
+        client.get('/api/auth/me', headers=headers[role])
+
+    counts, failures = {}, []
+    for method, path, role, body in CASES:
+        url = _fill(path, ids)
+        request_headers = headers.get(role, {})
+        with QueryCounter(db.engine) as counter:
+            response = client.open(url, method=method, headers=request_headers, json=_fill(body, ids))
+            response.get_data()
+        if response.status_code >= 400:
+            failures.append(f'{name}: {method} {url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}')
+        # A route listed twice is held to its costlier request
+        counts[(method, path)] = max(counter.count, counts.get((method, path), 0))
+
+        data = response.get_json(silent=True) or {}
+        if path == '/api/auth/login':
+            headers['refresh'] = {'Authorization': f"Bearer {data.get('refresh_token')}"}
+        elif path == '/api/auth/change-password':
+            # Changing the password revokes the tokens issued before it
+            headers['scratch'] = {'Authorization': f"Bearer {data.get('access_token')}"}
+        elif path == '/api/teams/' and method == 'POST':
+            ids['new_team'] = data['team']['id']
+        elif path == '/api/projects/' and method == 'POST':
+            ids['new_project'] = data['project']['id']
+        elif path == '/api/checkins/' and method == 'POST':
+            ids['new_checkin'] = data['checkin']['id']
+
+    return app, counts, failures
+
+
+def main(verbose=False):
+    config['testing'].BCRYPT_LOG_ROUNDS = 4
+    config['testing'].AUTH_REVOCATION_SYNC_SECONDS = 3600
+
+    results, failures = {}, []
+    for name, sizes in SIZES.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            app, counts, size_failures = run_size(name, sizes)
+        results[name] = counts
+        failures.extend(size_failures)
+
+    from services.query_budget import get_query_budget
+
+    covered = {(method, path) for method, path, _, _ in CASES}
+    adapter_rules = {}
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == 'static':
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            adapter_rules[(rule.rule, method)] = rule
+
+    rows = []
+    for (_, method), rule in sorted(adapter_rules.items()):
+        endpoint = rule.endpoint
+        case = next((key for key in covered if key[0] == method and _matches(rule, key[1])), None)
+        if case is None:
+            failures.append(f'{method} {rule.rule} ({endpoint}) has no case in CASES')
+            continue
+        budget = get_query_budget(app, endpoint)
+        small, large = results['small'][case], results['large'][case]
+        problems = []
+        if budget is None:
+            problems.append('no budget')
+        elif max(small, large) > budget:
+            problems.append('over budget')
+        if large > small:
+            problems.append('grows with data')
+        for problem in problems:
+            failures.append(f'{method} {rule.rule}: {problem} (small {small}, large {large}, budget {budget})')
+        if verbose or problems:
+            rows.append((method, rule.rule, small, large, budget, ', '.join(problems) or 'ok'))
+
+    if rows:
+        print_table(('method', 'route', 'small', 'large', 'budget', 'result'), rows)
+    for failure in failures:
+        print(f'FAIL  {failure}')
+    print(f"{len(adapter_rules)} route methods checked, {len(failures)} failures")
+    return not failures
+
+
+def _matches(rule, path):
+    """True if a CASES path template is this rule (placeholders in place of converters)"""
+    parts, template = rule.rule.strip('/').split('/'), path.strip('/').split('/')
+    if len(parts) != len(template):
+        return False
+    return all(
+        (part.startswith('<') and piece.startswith('{')) or part == piece
+        for part, piece in zip(parts, template)
+    )
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main('--verbose' in sys.argv) else 1)
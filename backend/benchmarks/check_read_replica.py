@@ -0,0 +1,127 @@
+"""Check read-replica routing with two SQLite files standing in for primary and replica
+
+Both files start as copies of one seeded database. The replica copy is then
+changed so every answer reveals which database served it: a team and a check-in
+exist only on the replica, and writes go to the primary only, like a replica
+that has not caught up yet. Each check prints PASS or FAIL; the exit status is 1
+if any failed.
+
+Usage: python benchmarks/check_read_replica.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+from common import seed, auth_headers
+from config import config
+
+results = []
+
+
+def check(name, condition):
+    results.append(condition)
+    print(f"{'PASS' if condition else 'FAIL'}  {name}")
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    primary_path = os.path.join(directory, 'primary.db')
+    replica_path = os.path.join(directory, 'replica.db')
+
+    settings = config['testing']
+    settings.SQLALCHEMY_DATABASE_URI = f'sqlite:///{primary_path}'
+    settings.SQLALCHEMY_REPLICA_URI = f'sqlite:///{replica_path}'
+    settings.REPLICA_STICKY_SECONDS = 2
+
+    from app import create_app
+    from models.user import db
+    from models.team import Team
+    from models.user import User
+
+    app = create_app('testing')
+    app.extensions.pop('response_cache', None)
+    with app.app_context():
+        db.create_all()
+        seed(teams=3, users_per_team=3, projects_per_team=1, days=10)
+        # A second admin, to read alongside the admin who writes
+        other_admin = User.query.filter_by(role='employee').first()
+        other_admin.role = 'admin'
+        other_admin_id = other_admin.id
+        db.session.commit()
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+        shutil.copy(primary_path, replica_path)
+
+        replica = db.engines['replica']
+        with replica.begin() as connection:
+            connection.execute(Team.__table__.insert(), {'name': 'Replica Only', 'description': None})
+        admin_headers = auth_headers(app)
+        other_headers = auth_headers(app, other_admin_id)
+
+    client = app.test_client()
+
+    def team_names(headers=admin_headers):
+        response = client.get('/api/teams', headers=headers)
+        return {team['name'] for team in response.get_json()['teams']}
+
+    check('GET listing reads from the replica', 'Replica Only' in team_names())
+
+    response = client.get('/api/analytics/dashboard', headers=admin_headers)
+    check('analytics read from the replica', response.get_json()['overview']['total_teams'] == 4)
+
+    response = client.post('/api/teams', headers=admin_headers, json={'name': 'Written Team'})
+    check('write goes to the primary', response.status_code == 201)
+    with app.app_context():
+        primary_names = {row[0] for row in db.engine.connect().execute(db.text('SELECT name FROM teams'))}
+        replica_names = {row[0] for row in db.engines['replica'].connect().execute(db.text('SELECT name FROM teams'))}
+    check('primary has the new team, replica does not', 'Written Team' in primary_names and 'Written Team' not in replica_names)
+
+    names = team_names()
+    check('writer reads its own write from the primary', 'Written Team' in names and 'Replica Only' not in names)
+    check('other users still read from the replica', 'Replica Only' in team_names(other_headers))
+
+    time.sleep(2.1)
+    check('writer is back on the replica after the sticky window', 'Replica Only' in team_names())
+
+    response = client.post('/api/batch', headers=admin_headers, json={'requests': [
+        {'method': 'GET', 'path': '/api/teams'},
+        {'method': 'POST', 'path': '/api/teams', 'body': {'name': 'Batch Team'}},
+        {'method': 'GET', 'path': '/api/teams'}
+    ]})
+    bodies = [item['body'] for item in response.get_json()['responses']]
+    before = {team['name'] for team in bodies[0]['teams']}
+    after = {team['name'] for team in bodies[2]['teams']}
+    check('batch: read before the write uses the replica', 'Replica Only' in before)
+    check('batch: read after the write sees it on the primary', 'Batch Team' in after)
+
+    # With the response cache on, a replica answer cached after a write must not
+    # reach the writer, nor be stored while the replica may still lag
+    from services.cache import init_cache
+    init_cache(app)
+    time.sleep(2.1)
+
+    def dashboard(headers):
+        response = client.get('/api/analytics/dashboard', headers=headers)
+        return response.get_json()['overview']['total_teams'], response.headers.get('X-Cache')
+
+    client.post('/api/teams', headers=admin_headers, json={'name': 'Cached Team'})
+    with app.app_context():
+        primary_teams = db.engine.connect().execute(db.text('SELECT COUNT(*) FROM teams')).scalar()
+    other_teams, _ = dashboard(other_headers)
+    check('cache: reader after a write computes on the replica', other_teams != primary_teams)
+    check('cache: replica answer is not stored right after a write', dashboard(other_headers)[1] == 'MISS')
+    check('cache: writer bypasses the cache and reads the primary', dashboard(admin_headers) == (primary_teams, None))
+
+    time.sleep(2.1)
+    dashboard(other_headers)
+    check('cache: replica answers are cached again once the window passed', dashboard(other_headers)[1] == 'HIT')
+
+    shutil.rmtree(directory)
+    return all(results)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
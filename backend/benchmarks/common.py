@@ -0,0 +1,202 @@
+"""Shared helpers for the backend benchmark scripts
+
+Run the scripts from the backend directory, e.g. ``python benchmarks/bench_team_analytics.py``.
+They build the app with the testing config (in-memory SQLite), seed synthetic data with
+bulk inserts and report SQL statement counts and latency per request.
+"""
+import os
+import sys
+import time
+import random
+import statistics
+from datetime import date, datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# app.py builds a production app at import time, which needs a database URL
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import event
+
+# Pre-computed bcrypt hash of 'password123' so seeding does not pay for hashing
+PASSWORD_HASH = '$2b$12$UxxHYapbSeGpaP4S4sGRf.4ZwSpltA2BMkqmg/s4Zs39I0nVD9aGe'
+
+
+class QueryCounter:
+    """Count SQL statements executed on an engine while the context is active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return False
+
+
+class InjectedLatency:
+    """Sleep before every SQL statement on an engine, to mimic a database across a network"""
+
+    def __init__(self, engine, milliseconds):
+        self.engine = engine
+        self.seconds = milliseconds / 1000
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        time.sleep(self.seconds)
+
+    def __enter__(self):
+        if self.seconds:
+            event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        if self.seconds:
+            event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return False
+
+
+def create_file_bench_app(path, config_name='testing'):
+    """Like create_bench_app, but on a SQLite file so worker threads get their own connections"""
+    from config import config
+
+    if os.path.exists(path):
+        os.remove(path)
+    config[config_name].SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+    return create_bench_app(config_name)
+
+
+def create_bench_app(config_name='testing'):
+    """Create an app with an empty schema and push its app context"""
+    from app import create_app
+    from models.user import db
+
+    app = create_app(config_name)
+    app.app_context().push()
+    db.create_all()
+    return app
+
+
+def seed(teams=10, users_per_team=10, projects_per_team=3, days=90, checkin_rate=0.7, seed_value=42):
+    """Bulk insert synthetic teams, users, projects, assignments and check-ins"""
+    from models.user import db, User
+    from models.team import Team
+    from models.project import Project, project_assignments
+    from models.checkin import CheckIn
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    today = date.today()
+
+    db.session.execute(Team.__table__.insert(), [
+        {'id': t, 'name': f'Team {t}', 'description': None, 'created_at': now, 'updated_at': now}
+        for t in range(1, teams + 1)
+    ])
+
+    users = [{
+        'id': 1, 'email': 'admin@teampulse.com', 'password_hash': PASSWORD_HASH,
+        'first_name': 'Admin', 'last_name': 'User', 'role': 'admin', 'is_active': True,
+        'team_id': None, 'created_at': now, 'updated_at': now
+    }]
+    for t in range(1, teams + 1):
+        for u in range(users_per_team):
+            user_id = len(users) + 1
+            users.append({
+                'id': user_id, 'email': f'user{user_id}@teampulse.com', 'password_hash': PASSWORD_HASH,
+                'first_name': 'User', 'last_name': str(user_id), 'role': 'employee',
+                'is_active': rng.random() > 0.05, 'team_id': t, 'created_at': now, 'updated_at': now
+            })
+    db.session.execute(User.__table__.insert(), users)
+
+    projects = []
+    for t in range(1, teams + 1):
+        for _ in range(projects_per_team):
+            projects.append({
+                'id': len(projects) + 1, 'title': f'Project {len(projects) + 1}', 'description': None,
+                'status': rng.choice(['active', 'active', 'completed', 'on_hold']),
+                'priority': rng.choice(['low', 'medium', 'high', 'urgent']),
+                'team_id': t, 'start_date': None, 'due_date': None, 'created_at': now, 'updated_at': now
+            })
+    if projects:
+        db.session.execute(Project.__table__.insert(), projects)
+
+    team_projects = {}
+    for project in projects:
+        team_projects.setdefault(project['team_id'], []).append(project['id'])
+
+    assignments = []
+    checkins = []
+    for user in users[1:]:
+        own_projects = team_projects.get(user['team_id'], [])
+        for project_id in own_projects:
+            if rng.random() < 0.5:
+                assignments.append({'project_id': project_id, 'user_id': user['id'], 'assigned_at': now})
+        for day in range(days):
+            if rng.random() < checkin_rate:
+                checkins.append({
+                    'user_id': user['id'],
+                    'project_id': rng.choice(own_projects) if own_projects else None,
+                    'check_in_date': today - timedelta(days=day),
+                    'mood_rating': rng.randint(1, 5),
+                    'comment': None,
+                    'work_load_rating': rng.randint(1, 5),
+                    'stress_level': rng.randint(1, 5),
+                    'created_at': now,
+                    'updated_at': now
+                })
+    if assignments:
+        db.session.execute(project_assignments.insert(), assignments)
+    for start in range(0, len(checkins), 10000):
+        db.session.execute(CheckIn.__table__.insert(), checkins[start:start + 10000])
+
+    # Bulk inserts bypass the ORM hooks, so backfill the rollups in one pass
+    from services.rollups import rebuild_rollups
+    rebuild_rollups()
+
+    db.session.commit()
+    return {'teams': teams, 'users': len(users), 'projects': len(projects), 'checkins': len(checkins)}
+
+
+def auth_headers(app, user_id=1):
+    """Authorization header for a seeded user"""
+    from models.user import User
+    from auth.jwt_auth import create_user_token
+
+    user = User.query.get(user_id)
+    return {'Authorization': f'Bearer {create_user_token(user.id, user.email, user.role)}'}
+
+
+def measure(client, path, headers=None, repeat=5, method='GET'):
+    """Return (status, statements per request, median latency in ms) for a request"""
+    from models.user import db
+
+    timings = []
+    statements = 0
+    status = None
+    for _ in range(repeat):
+        db.session.remove()
+        with QueryCounter(db.engine) as counter:
+            started = time.perf_counter()
+            response = client.open(path, method=method, headers=headers)
+            timings.append((time.perf_counter() - started) * 1000)
+        statements = counter.count
+        status = response.status_code
+    return status, statements, statistics.median(timings)
+
+
+def print_table(headers, rows):
+    """Print rows as a fixed-width table"""
+    widths = [max(len(str(h)), *(len(str(row[i])) for row in rows)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in rows:
+        print('  '.join(str(value).ljust(w) for value, w in zip(row, widths)))
@@ -0,0 +1,70 @@
+"""Check that the check-in filters use their supporting indexes
+
+Prints the query plan of each filter query and exits non-zero if an expected
+index is not used. Uses the in-memory SQLite database by default; pass a
+database URL to check another database (e.g. Postgres with production data):
+
+    python benchmarks/explain_indexes.py [postgresql://...]
+"""
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import select, create_engine, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from common import create_bench_app, seed
+
+
+def build_queries():
+    from models.user import User
+    from models.checkin import CheckIn
+    from models.team import Team
+
+    start, end = date.today() - timedelta(days=30), date.today()
+    return [
+        ('check-ins in a date range', 'ix_checkins_check_in_date',
+         select(CheckIn.id).where(CheckIn.check_in_date >= start, CheckIn.check_in_date <= end)),
+        ('check-ins of a project in a date range', 'ix_checkins_project_id_check_in_date',
+         select(CheckIn.id).where(CheckIn.project_id == 1, CheckIn.check_in_date >= start)),
+        ("a user's check-in for a day", 'uq_checkins_user_id_check_in_date',
+         select(CheckIn.id).where(CheckIn.user_id == 2, CheckIn.check_in_date == end)),
+        ('members of a team', 'ix_users_team_id',
+         select(User.id).where(User.team_id == 1)),
+        ('team member counts', 'ix_users_team_id',
+         select(Team.id, Team.member_count)),
+    ]
+
+
+def explain(connection, statement):
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+        return [row[0] for row in connection.execute(text(f'EXPLAIN {sql}'))]
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+
+def main(database_url=None):
+    create_bench_app()
+    if database_url:
+        connection = create_engine(database_url).connect()
+    else:
+        from models.user import db
+        seed(teams=20, users_per_team=20, projects_per_team=3, days=60)
+        connection = db.session.connection()
+        connection.execute(text('ANALYZE'))
+
+    failures = 0
+    for description, index, statement in build_queries():
+        plan = explain(connection, statement)
+        uses_index = any(index in line for line in plan)
+        failures += not uses_index
+        print(f"{'ok  ' if uses_index else 'FAIL'} {description} -> {index}")
+        for line in plan:
+            print(f'       {line}')
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
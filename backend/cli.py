@@ -0,0 +1,110 @@
+import os
+import click
+from datetime import datetime
+from flask.cli import AppGroup
+
+from models.user import db
+
+rollups_cli = AppGroup('rollups', help='Maintain the check-in daily rollup table.')
+tokens_cli = AppGroup('tokens', help='Maintain the refresh token table.')
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+def _parse_date(ctx, param, value):
+    """Click callback parsing an optional YYYY-MM-DD option"""
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise click.BadParameter('Dates must be in YYYY-MM-DD format')
+
+def _bump_data_version():
+    """Invalidate cached analytics after rollups were rewritten"""
+    from services.cache import get_response_cache
+    
+    cache = get_response_cache()
+    if cache is not None:
+        cache.bump()
+
+@rollups_cli.command('rebuild')
+@click.option('--start', callback=_parse_date, help='First date to rebuild (YYYY-MM-DD)')
+@click.option('--end', callback=_parse_date, help='Last date to rebuild (YYYY-MM-DD)')
+def rebuild_rollups_command(start, end):
+    """Backfill or rebuild rollups from raw check-ins."""
+    from services.rollups import rebuild_rollups
+    
+    rows = rebuild_rollups(start, end)
+    db.session.commit()
+    _bump_data_version()
+    click.echo(f'Rebuilt {rows} rollup rows')
+
+@rollups_cli.command('check')
+@click.option('--start', callback=_parse_date, help='First date to check (YYYY-MM-DD)')
+@click.option('--end', callback=_parse_date, help='Last date to check (YYYY-MM-DD)')
+@click.option('--fix', is_flag=True, help='Rebuild the dates that have drifted')
+def check_rollups_command(start, end, fix):
+    """Compare rollups with raw check-ins and report drift."""
+    from services.rollups import find_rollup_drift, rebuild_rollups
+    
+    drift = find_rollup_drift(start, end)
+    if not drift:
+        click.echo('Rollups are consistent with check-ins')
+        return
+    
+    for entry in drift:
+        click.echo(
+            f"{entry['date']} team={entry['team_id']} project={entry['project_id']}: "
+            f"expected {entry['expected']}, found {entry['actual']}"
+        )
+    click.echo(f'{len(drift)} rollup rows out of date')
+    
+    if fix:
+        for day in sorted({entry['date'] for entry in drift}):
+            day = datetime.strptime(day, '%Y-%m-%d').date()
+            rebuild_rollups(day, day)
+        db.session.commit()
+        _bump_data_version()
+        click.echo('Rebuilt drifted dates')
+    else:
+        raise SystemExit(1)
+
+@tokens_cli.command('prune')
+def prune_tokens_command():
+    """Delete expired, revoked and long-used refresh tokens of all users."""
+    from auth.jwt_auth import prune_refresh_tokens
+    
+    deleted = prune_refresh_tokens()
+    db.session.commit()
+    click.echo(f'Deleted {deleted} refresh tokens')
+
+@click.command('init-db')
+@click.option('--seed', is_flag=True, help='Also create the sample admin, team, employee and project')
+def init_db_command(seed):
+    """Create missing tables and apply migrations (run once per deploy, before starting workers)."""
+    from flask_migrate import upgrade
+    
+    db.create_all()
+    click.echo('Database tables created')
+    
+    # create_all never alters existing tables; the migrations add what they lack
+    # (e.g. the unique check-in index the upserts need) and skip what exists
+    upgrade(directory=MIGRATIONS_DIR)
+    click.echo('Migrations applied')
+    
+    if seed:
+        _seed()
+
+@click.command('seed')
+def seed_command():
+    """Create sample data in an empty database."""
+    _seed()
+
+def _seed():
+    from services.sample_data import seed_sample_data
+    
+    created = seed_sample_data()
+    for line in created:
+        click.echo(line)
+    if not created:
+        click.echo('Sample data already present')
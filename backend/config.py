@@ -13,6 +13,70 @@ class Config:
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 1)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES', 30)))
+    
+    # Seconds to cache the authenticated user across requests (0 disables)
+    AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 0))
+    
+    # Authorize admin/employee routes from token claims only, no user lookup
+    AUTH_TRUST_TOKEN_CLAIMS = os.environ.get('AUTH_TRUST_TOKEN_CLAIMS', 'False').lower() == 'true'
+    # How often each worker pulls token revocations made by other workers
+    AUTH_REVOCATION_SYNC_SECONDS = int(os.environ.get('AUTH_REVOCATION_SYNC_SECONDS', 5))
+    # Days a used refresh token is kept so replaying it still revokes its family
+    AUTH_REFRESH_REUSE_DAYS = int(os.environ.get('AUTH_REFRESH_REUSE_DAYS', 7))
+    
+    # bcrypt cost for new hashes; existing hashes are upgraded on login
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    # Concurrent bcrypt operations per process, and how many more may wait
+    BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', 2))
+    BCRYPT_QUEUE_LIMIT = int(os.environ.get('BCRYPT_QUEUE_LIMIT', 8))
+    BCRYPT_WAIT_TIMEOUT = float(os.environ.get('BCRYPT_WAIT_TIMEOUT', 5))
+    
+    # Bulk user import: password hashing processes per worker (0 = one per CPU), rows per insert batch
+    BULK_IMPORT_HASH_PROCESSES = int(os.environ.get('BULK_IMPORT_HASH_PROCESSES', 2))
+    BULK_IMPORT_BATCH_SIZE = int(os.environ.get('BULK_IMPORT_BATCH_SIZE', 500))
+    BULK_IMPORT_MAX_ROWS = int(os.environ.get('BULK_IMPORT_MAX_ROWS', 10000))
+    
+    # Bulk project assign/unassign and team moves: user ids per request
+    BULK_MAX_IDS = int(os.environ.get('BULK_MAX_IDS', 1000))
+    
+    # Bulk check-in ingestion: rows per transaction, rows per request
+    CHECKIN_INGEST_CHUNK_SIZE = int(os.environ.get('CHECKIN_INGEST_CHUNK_SIZE', 1000))
+    CHECKIN_INGEST_MAX_ROWS = int(os.environ.get('CHECKIN_INGEST_MAX_ROWS', 50000))
+    
+    # Largest per_page a list endpoint returns
+    PAGINATION_MAX_PER_PAGE = int(os.environ.get('PAGINATION_MAX_PER_PAGE', 100))
+    
+    # /api/batch: sub-requests per call, threads for concurrent read-only sub-requests
+    BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+    BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 4))
+    
+    # Connection pool per worker process; pre-ping replaces connections dropped while idle
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    # Per-statement timeouts in ms, PostgreSQL only (0 disables); analytics get the longer one
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    DB_ANALYTICS_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_ANALYTICS_STATEMENT_TIMEOUT_MS', 0))
+    
+    # Optional read replica for analytics and listings; a user's own writes are read
+    # back from the primary for REPLICA_STICKY_SECONDS
+    SQLALCHEMY_REPLICA_URI = os.environ.get('DATABASE_REPLICA_URL')
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    
+    # Per-request latency/SQL metrics on /metrics (admin) and a Server-Timing header
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', 'True').lower() == 'true'
+    # Log requests that run more SQL statements than their route's @query_budget
+    QUERY_BUDGET_WARN = os.environ.get('QUERY_BUDGET_WARN', 'False').lower() == 'true'
+    
+    # Response cache for analytics ('memory' per process, 'shared' via Redis)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 60))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 512))
     
     # CORS Configuration
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5173').split(',')
@@ -28,16 +92,22 @@ class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///teampulse_dev.db'
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 2))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 3))
+    QUERY_BUDGET_WARN = os.environ.get('QUERY_BUDGET_WARN', 'True').lower() == 'true'
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))
+    DB_ANALYTICS_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_ANALYTICS_STATEMENT_TIMEOUT_MS', 60000))
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_REPLICA_URI = None
 
 config = {
     'development': DevelopmentConfig,
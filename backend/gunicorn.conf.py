@@ -0,0 +1,54 @@
+"""Gunicorn settings, picked up automatically by ``gunicorn app:app`` from this directory
+
+With GUNICORN_PRELOAD on (the default), the app is imported and created once in the
+master and workers are forked from it, so the interpreter, Flask, SQLAlchemy, the
+blueprints and the model metadata are shared copy-on-write instead of rebuilt per
+worker. Worker count and bind address keep gunicorn's defaults (WEB_CONCURRENCY, PORT).
+Workers are threaded (gthread, GUNICORN_THREADS each): a sync worker serves one request
+at a time, so a slow bcrypt hash or analytics query would block the whole worker
+and the bounded bcrypt pool in services.passwords would never see concurrent callers.
+With more than one worker and CACHE_BACKEND=memory, the response cache and read replica
+routing are switched off in each worker: neither cache invalidation nor the replica's
+read-your-writes window can be shared across processes without CACHE_BACKEND=shared.
+"""
+import gc
+import os
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+if preload_app:
+    # Keep the collector from touching (and so copying) pages while the app loads
+    gc.disable()
+
+
+def when_ready(server):
+    """Move everything the master has built into the permanent generation before forking"""
+    if preload_app:
+        gc.freeze()
+        gc.enable()
+
+
+def post_fork(server, worker):
+    """Give each worker its own connection pools instead of the master's"""
+    if not preload_app:
+        return
+    
+    from app import app
+    from models.user import db
+    
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves any connections the master holds to the master
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Refuse per-process cache and replica state when there are several workers"""
+    from app import app
+    from services.cache import check_cache_workers
+    from services.replica import check_replica_workers
+    
+    check_cache_workers(app, worker.cfg.workers)
+    check_replica_workers(app, worker.cfg.workers)
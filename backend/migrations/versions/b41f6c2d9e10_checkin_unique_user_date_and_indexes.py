@@ -0,0 +1,60 @@
+"""Unique check-in per user per day, plus analytics indexes
+
+Removes duplicate (user_id, check_in_date) check-ins, keeping the earliest,
+then adds the unique index create_checkin relies on and the supporting
+indexes for date range, project and team filters. Indexes that already exist
+(databases created with db.create_all()) are skipped. The number of removed
+duplicates is logged; run ``flask rollups rebuild`` afterwards if any were.
+
+Revision ID: b41f6c2d9e10
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41f6c2d9e10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('uq_checkins_user_id_check_in_date', 'checkins', ['user_id', 'check_in_date'], True),
+    ('ix_checkins_check_in_date', 'checkins', ['check_in_date'], False),
+    ('ix_checkins_project_id_check_in_date', 'checkins', ['project_id', 'check_in_date'], False),
+    ('ix_users_team_id', 'users', ['team_id'], False),
+]
+
+
+def _existing_indexes(table):
+    inspector = sa.inspect(op.get_bind())
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    removed = op.get_bind().execute(sa.text(
+        'DELETE FROM checkins WHERE id NOT IN '
+        '(SELECT MIN(id) FROM checkins GROUP BY user_id, check_in_date)'
+    )).rowcount
+    if removed:
+        logger.warning(
+            'Removed %d duplicate check-ins (same user and date), keeping the earliest of each; '
+            'run "flask rollups rebuild" to update the rollups', removed
+        )
+
+    for name, table, columns, unique in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    for name, table, columns, unique in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,36 @@
+"""Token revocations table
+
+Stores, per user, the time (Unix milliseconds) up to which issued tokens are
+rejected. Skipped if the table already exists (databases created with
+db.create_all()).
+
+Revision ID: c7d2e9a41b35
+Revises: b41f6c2d9e10
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d2e9a41b35'
+down_revision = 'b41f6c2d9e10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('token_revocations'):
+        return
+    op.create_table(
+        'token_revocations',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('revoked_at', sa.BigInteger(), nullable=False),
+    )
+    op.create_index('ix_token_revocations_revoked_at', 'token_revocations', ['revoked_at'])
+
+
+def downgrade():
+    op.drop_index('ix_token_revocations_revoked_at', table_name='token_revocations')
+    op.drop_table('token_revocations')
@@ -0,0 +1,67 @@
+"""Check-in daily rollups table, backfilled from existing check-ins
+
+Creates checkin_daily_rollups unless it exists (databases created with
+db.create_all()), then fills it from raw check-ins if it is empty, with the same
+aggregates as ``flask rollups rebuild``. Analytics read only this table, so
+without the backfill they would report no check-ins for existing data.
+
+Revision ID: e5b1c9d72f48
+Revises: d3a8f5c21e67
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b1c9d72f48'
+down_revision = 'd3a8f5c21e67'
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+INSERT INTO checkin_daily_rollups (
+    rollup_date, team_id, project_id, checkin_count, mood_sum,
+    workload_sum, workload_count, stress_sum, stress_count, updated_at
+)
+SELECT
+    checkins.check_in_date,
+    COALESCE(users.team_id, 0),
+    COALESCE(checkins.project_id, 0),
+    COUNT(checkins.id),
+    COALESCE(SUM(checkins.mood_rating), 0),
+    COALESCE(SUM(checkins.work_load_rating), 0),
+    COUNT(checkins.work_load_rating),
+    COALESCE(SUM(checkins.stress_level), 0),
+    COUNT(checkins.stress_level),
+    CURRENT_TIMESTAMP
+FROM checkins JOIN users ON checkins.user_id = users.id
+GROUP BY checkins.check_in_date, COALESCE(users.team_id, 0), COALESCE(checkins.project_id, 0)
+"""
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('checkin_daily_rollups'):
+        op.create_table(
+            'checkin_daily_rollups',
+            sa.Column('rollup_date', sa.Date(), primary_key=True),
+            sa.Column('team_id', sa.Integer(), primary_key=True),
+            sa.Column('project_id', sa.Integer(), primary_key=True),
+            sa.Column('checkin_count', sa.Integer(), nullable=False),
+            sa.Column('mood_sum', sa.Integer(), nullable=False),
+            sa.Column('workload_sum', sa.Integer(), nullable=False),
+            sa.Column('workload_count', sa.Integer(), nullable=False),
+            sa.Column('stress_sum', sa.Integer(), nullable=False),
+            sa.Column('stress_count', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+        )
+
+    # Rollups already maintained by the app are left alone
+    if bind.execute(sa.text('SELECT COUNT(*) FROM checkin_daily_rollups')).scalar() == 0:
+        op.execute(BACKFILL)
+
+
+def downgrade():
+    op.drop_table('checkin_daily_rollups')
@@ -2,5 +2,8 @@ from .user import User
 from .team import Team
 from .project import Project
 from .checkin import CheckIn
+from .checkin_rollup import CheckInDailyRollup
+from .token_revocation import TokenRevocation
+from .refresh_token import RefreshToken
 
-__all__ = ['User', 'Team', 'Project', 'CheckIn'] 
\ No newline at end of file
+__all__ = ['User', 'Team', 'Project', 'CheckIn', 'CheckInDailyRollup', 'TokenRevocation', 'RefreshToken'] 
\ No newline at end of file
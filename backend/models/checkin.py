@@ -1,11 +1,17 @@
 from datetime import datetime, date
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, joinedload
 
 from .user import db
 
 class CheckIn(db.Model):
     """CheckIn model for tracking employee morale and weekly updates"""
     __tablename__ = 'checkins'
+    __table_args__ = (
+        # One check-in per user per day; create_checkin relies on it for its upsert
+        db.Index('uq_checkins_user_id_check_in_date', 'user_id', 'check_in_date', unique=True),
+        db.Index('ix_checkins_check_in_date', 'check_in_date'),
+        db.Index('ix_checkins_project_id_check_in_date', 'project_id', 'check_in_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -32,6 +38,20 @@ class CheckIn(db.Model):
         self.stress_level = stress_level
         self.check_in_date = check_in_date or date.today()
     
+    @classmethod
+    def to_dict_options(cls):
+        """Loader options that fetch what to_dict() needs in the same query
+        
+        Listing queries should apply these so serializing a page of check-ins
+        does not lazy load each user and project separately.
+        """
+        from .user import User
+        from .project import Project
+        return (
+            joinedload(cls.user).load_only(User.first_name, User.last_name),
+            joinedload(cls.project).load_only(Project.title)
+        )
+    
     def to_dict(self):
         """Convert check-in to dictionary"""
         return {
@@ -89,24 +109,19 @@ class CheckIn(db.Model):
     @classmethod
     def get_weekly_average_mood(cls, team_id=None, project_id=None, start_date=None, end_date=None):
         """Get average mood rating for a period"""
-        from .user import User
-        query = cls.query
+        from .checkin_rollup import CheckInDailyRollup
+        query = CheckInDailyRollup.aggregate_query(start_date=start_date, end_date=end_date)
         
         if team_id:
-            query = query.join(User).filter(User.team_id == team_id)
+            query = query.filter(CheckInDailyRollup.team_id == team_id)
         if project_id:
-            query = query.filter(cls.project_id == project_id)
-        if start_date:
-            query = query.filter(cls.check_in_date >= start_date)
-        if end_date:
-            query = query.filter(cls.check_in_date <= end_date)
+            query = query.filter(CheckInDailyRollup.project_id == project_id)
         
-        checkins = query.all()
-        if not checkins:
+        avg_mood = query.one().avg_mood
+        if avg_mood is None:
             return 0
         
-        total_mood = sum(checkin.mood_rating for checkin in checkins)
-        return round(total_mood / len(checkins), 2)
+        return round(avg_mood, 2)
     
     def __repr__(self):
         return f'<CheckIn {self.user_id} - {self.check_in_date} - Mood: {self.mood_rating}>' 
\ No newline at end of file
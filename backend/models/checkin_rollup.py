@@ -0,0 +1,64 @@
+from datetime import datetime
+from sqlalchemy import func, cast, Float
+
+from .user import db
+
+class CheckInDailyRollup(db.Model):
+    """Per-day check-in sums and counts by team and project
+    
+    Kept current by ``services.rollups`` inside the same transaction as check-in
+    writes, so analytics can read O(days x teams) rows instead of raw check-ins.
+    ``team_id`` and ``project_id`` use 0 for "no team" / "no project" so the
+    composite primary key can be upserted on every database.
+    """
+    __tablename__ = 'checkin_daily_rollups'
+    
+    rollup_date = db.Column(db.Date, primary_key=True)
+    team_id = db.Column(db.Integer, primary_key=True, default=0)
+    project_id = db.Column(db.Integer, primary_key=True, default=0)
+    checkin_count = db.Column(db.Integer, nullable=False, default=0)
+    mood_sum = db.Column(db.Integer, nullable=False, default=0)
+    workload_sum = db.Column(db.Integer, nullable=False, default=0)
+    workload_count = db.Column(db.Integer, nullable=False, default=0)
+    stress_sum = db.Column(db.Integer, nullable=False, default=0)
+    stress_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    @staticmethod
+    def _ratio(total, count):
+        """SUM(total) / SUM(count) as a float, NULL when there is nothing to average"""
+        return cast(func.sum(total), Float) / func.nullif(func.sum(count), 0)
+    
+    @classmethod
+    def aggregate_query(cls, group_column=None, start_date=None, end_date=None):
+        """Build a query of check-in count and mood/workload/stress averages
+        
+        ``group_column`` is one of ``rollup_date``, ``team_id`` or ``project_id``;
+        rows for the "no team" / "no project" bucket are skipped. Without a group
+        column the query returns a single overall row.
+        """
+        columns = [
+            func.coalesce(func.sum(cls.checkin_count), 0).label('checkin_count'),
+            cls._ratio(cls.mood_sum, cls.checkin_count).label('avg_mood'),
+            cls._ratio(cls.workload_sum, cls.workload_count).label('avg_workload'),
+            cls._ratio(cls.stress_sum, cls.stress_count).label('avg_stress')
+        ]
+        if group_column is not None:
+            columns.insert(0, group_column.label('group_id'))
+        
+        query = db.session.query(*columns)
+        
+        if start_date:
+            query = query.filter(cls.rollup_date >= start_date)
+        if end_date:
+            query = query.filter(cls.rollup_date <= end_date)
+        
+        if group_column is not None:
+            if group_column is not cls.rollup_date:
+                query = query.filter(group_column != 0)
+            query = query.group_by(group_column).having(func.sum(cls.checkin_count) > 0)
+        
+        return query
+    
+    def __repr__(self):
+        return f'<CheckInDailyRollup {self.rollup_date} team={self.team_id} project={self.project_id}>'
@@ -1,5 +1,6 @@
 from datetime import datetime
-from sqlalchemy.orm import relationship
+from sqlalchemy import select, func
+from sqlalchemy.orm import relationship, column_property, undefer, joinedload
 
 from .user import db
 
@@ -31,6 +32,16 @@ class Project(db.Model):
     # Many-to-many relationship with users
     assigned_users = relationship('User', secondary=project_assignments, back_populates='assigned_projects')
     
+    # Assignment count as a correlated subquery, so listings don't load every assignee.
+    # Deferred: listing queries opt in with undefer().
+    assigned_users_count = column_property(
+        select(func.count(project_assignments.c.user_id))
+        .where(project_assignments.c.project_id == id)
+        .correlate_except(project_assignments)
+        .scalar_subquery(),
+        deferred=True
+    )
+    
     # Project check-ins (aggregated from team members)
     checkins = relationship('CheckIn', back_populates='project', cascade='all, delete-orphan')
     
@@ -44,8 +55,12 @@ class Project(db.Model):
         self.start_date = start_date
         self.due_date = due_date
     
-    def to_dict(self):
-        """Convert project to dictionary"""
+    def to_dict(self, team_name=None, assigned_users_count=None):
+        """Convert project to dictionary
+        
+        Callers that already have the team name and assignment count (e.g. from a
+        joined aggregate query) can pass them in to avoid extra loads.
+        """
         return {
             'id': self.id,
             'title': self.title,
@@ -53,14 +68,25 @@ class Project(db.Model):
             'status': self.status,
             'priority': self.priority,
             'team_id': self.team_id,
-            'team_name': self.team.name if self.team else None,
+            'team_name': team_name if team_name is not None else (self.team.name if self.team else None),
             'start_date': self.start_date.isoformat() if self.start_date else None,
             'due_date': self.due_date.isoformat() if self.due_date else None,
-            'assigned_users_count': len(self.assigned_users),
+            'assigned_users_count': (
+                assigned_users_count if assigned_users_count is not None else self.assigned_users_count
+            ),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
+    @classmethod
+    def to_dict_options(cls):
+        """Loader options that fetch what to_dict() needs in the same query"""
+        from .team import Team
+        return (
+            undefer(cls.assigned_users_count),
+            joinedload(cls.team).load_only(Team.name)
+        )
+    
     def to_dict_with_users(self):
         """Convert project to dictionary with assigned user details"""
         project_dict = self.to_dict()
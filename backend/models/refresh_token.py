@@ -0,0 +1,21 @@
+from datetime import datetime
+from .user import db
+
+class RefreshToken(db.Model):
+    """Issued refresh token, tracked for rotation and reuse detection
+    
+    Every refresh replaces the presented token with a new one in the same family.
+    Presenting a token that was already used revokes the whole family.
+    """
+    __tablename__ = 'refresh_tokens'
+    
+    jti = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    family_id = db.Column(db.String(36), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    used_at = db.Column(db.DateTime, nullable=True)
+    revoked = db.Column(db.Boolean, default=False, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<RefreshToken {self.jti} user={self.user_id}>'
@@ -1,7 +1,9 @@
 from datetime import datetime
-from sqlalchemy.orm import relationship
+from sqlalchemy import select, func
+from sqlalchemy.orm import relationship, column_property, undefer
 
-from .user import db
+from .user import db, User
+from .project import Project
 
 class Team(db.Model):
     """Team model for organizing users and projects"""
@@ -17,22 +19,42 @@ class Team(db.Model):
     members = relationship('User', back_populates='team', cascade='all, delete-orphan')
     projects = relationship('Project', back_populates='team', cascade='all, delete-orphan')
     
+    # Counts as correlated subqueries, so listings don't load the collections.
+    # Deferred: listing queries opt in with undefer().
+    member_count = column_property(
+        select(func.count(User.id)).where(User.team_id == id).correlate_except(User).scalar_subquery(),
+        deferred=True
+    )
+    project_count = column_property(
+        select(func.count(Project.id)).where(Project.team_id == id).correlate_except(Project).scalar_subquery(),
+        deferred=True
+    )
+    
     def __init__(self, name, description=None):
         self.name = name
         self.description = description
     
-    def to_dict(self):
-        """Convert team to dictionary"""
+    def to_dict(self, member_count=None, project_count=None):
+        """Convert team to dictionary
+        
+        Callers that already have the counts (e.g. from a grouped query) can pass
+        them in instead of loading the count columns.
+        """
         return {
             'id': self.id,
             'name': self.name,
             'description': self.description,
-            'member_count': len(self.members),
-            'project_count': len(self.projects),
+            'member_count': member_count if member_count is not None else self.member_count,
+            'project_count': project_count if project_count is not None else self.project_count,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
+    @classmethod
+    def to_dict_options(cls):
+        """Loader options that fetch what to_dict() needs in the same query"""
+        return (undefer(cls.member_count), undefer(cls.project_count))
+    
     def to_dict_with_members(self):
         """Convert team to dictionary with member details"""
         team_dict = self.to_dict()
@@ -0,0 +1,15 @@
+from .user import db
+
+class TokenRevocation(db.Model):
+    """Per-user token revocation: tokens issued up to ``revoked_at`` are rejected
+    
+    Written when a user is deactivated or changes role; every worker keeps an
+    in-memory copy (see ``auth.revocation``) so checking a token needs no query.
+    """
+    __tablename__ = 'token_revocations'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    revoked_at = db.Column(db.BigInteger, nullable=False, index=True)  # Unix time in ms, compared with the token's iat_ms
+    
+    def __repr__(self):
+        return f'<TokenRevocation {self.user_id} at {self.revoked_at}>'
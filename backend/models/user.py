@@ -2,8 +2,9 @@ from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from sqlalchemy.orm import relationship
+from services.replica import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 
 class User(db.Model):
@@ -21,7 +22,7 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
-    team_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=True, index=True)
     team = relationship('Team', back_populates='members')
     
     # User's check-ins
@@ -32,15 +33,40 @@ class User(db.Model):
     
     def __init__(self, email, password, first_name, last_name, role='employee', team_id=None):
         self.email = email.lower()
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.set_password(password)
         self.first_name = first_name
         self.last_name = last_name
         self.role = role
         self.team_id = team_id
     
+    def set_password(self, password):
+        """Hash and store a new password
+        
+        Raises PasswordHasherBusy when the hashing pool is saturated.
+        """
+        from services.passwords import get_password_hasher
+        hasher = get_password_hasher()
+        if hasher is None:
+            self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        else:
+            self.password_hash = hasher.hash(password)
+    
     def check_password(self, password):
-        """Verify password against hash"""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        """Verify password against hash
+        
+        Raises PasswordHasherBusy when the hashing pool is saturated.
+        """
+        from services.passwords import get_password_hasher
+        hasher = get_password_hasher()
+        if hasher is None:
+            return bcrypt.check_password_hash(self.password_hash, password)
+        return hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """True if the stored hash uses a different bcrypt cost than configured"""
+        from services.passwords import get_password_hasher
+        hasher = get_password_hasher()
+        return hasher is not None and hasher.needs_rehash(self.password_hash)
     
     def to_dict(self):
         """Convert user to dictionary"""
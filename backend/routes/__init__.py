@@ -4,5 +4,7 @@ from .team_routes import team_bp
 from .project_routes import project_bp
 from .checkin_routes import checkin_bp
 from .analytics_routes import analytics_bp
+from .batch_routes import batch_bp
+from .system_routes import system_bp
 
-__all__ = ['auth_bp', 'user_bp', 'team_bp', 'project_bp', 'checkin_bp', 'analytics_bp'] 
\ No newline at end of file
+__all__ = ['auth_bp', 'user_bp', 'team_bp', 'project_bp', 'checkin_bp', 'analytics_bp', 'batch_bp', 'system_bp'] 
\ No newline at end of file
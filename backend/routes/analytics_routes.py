@@ -1,61 +1,107 @@
-from flask import Blueprint, request, jsonify
-from models.checkin import CheckIn
-from models.user import User
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from models.checkin_rollup import CheckInDailyRollup
+from models.user import User, db
 from models.team import Team
-from models.project import Project
+from models.project import Project, project_assignments
 from auth.decorators import admin_required
-from datetime import datetime, date, timedelta
-from sqlalchemy import func, and_
+from services.cache import cached_response, get_response_cache
+from services.database import use_statement_timeout
+from services.query_budget import query_budget
+from datetime import date, timedelta
+from sqlalchemy import func, case, select, true
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
 
+@analytics_bp.before_request
+def _analytics_statement_timeout():
+    """Aggregations over long ranges get a longer statement budget than other routes"""
+    timeout_ms = current_app.config.get('DB_ANALYTICS_STATEMENT_TIMEOUT_MS')
+    if timeout_ms:
+        use_statement_timeout(timeout_ms)
+
+def _rounded_average(value):
+    """Round a SQL AVG() result the same way the Python averages were rounded"""
+    return round(float(value), 2) if value is not None else 0
+
+def _checkin_aggregates(group_column, start_date, end_date):
+    """Get check-in count and mood/workload/stress averages grouped by a rollup column"""
+    rows = CheckInDailyRollup.aggregate_query(group_column, start_date, end_date).all()
+    
+    return {
+        row.group_id: {
+            'checkin_count': row.checkin_count,
+            'averages': {
+                'mood': _rounded_average(row.avg_mood),
+                'workload': _rounded_average(row.avg_workload),
+                'stress': _rounded_average(row.avg_stress)
+            }
+        }
+        for row in rows
+    }
+
+_EMPTY_CHECKIN_STATS = {
+    'checkin_count': 0,
+    'averages': {'mood': 0, 'workload': 0, 'stress': 0}
+}
+
+def _count(model, *criteria):
+    query = select(func.count()).select_from(model)
+    if criteria:
+        query = query.where(*criteria)
+    return query.scalar_subquery()
+
+def _dashboard_overview(start_date, end_date, recent_start):
+    """Dashboard counts and check-in window stats in one round trip
+    
+    The counts are scalar subqueries and the two check-in windows single-row
+    rollup aggregates, so the database evaluates them together.
+    """
+    window = CheckInDailyRollup.aggregate_query(start_date=start_date, end_date=end_date).subquery()
+    recent = CheckInDailyRollup.aggregate_query(start_date=recent_start, end_date=end_date).subquery()
+    
+    return db.session.execute(select(
+        _count(User, User.is_active.is_(True)).label('total_users'),
+        _count(Team).label('total_teams'),
+        _count(Project).label('total_projects'),
+        _count(Project, Project.status == 'active').label('active_projects'),
+        window.c.checkin_count.label('total_checkins'),
+        window.c.avg_mood,
+        window.c.avg_workload,
+        window.c.avg_stress,
+        recent.c.checkin_count.label('recent_checkins')
+    ).select_from(window.join(recent, true()))).one()
+
+# Priorities sort by urgency rather than alphabetically
+_PRIORITY_ORDER = case(
+    {'low': 1, 'medium': 2, 'high': 3, 'urgent': 4},
+    value=Project.priority,
+    else_=0
+)
+
 @analytics_bp.route('/dashboard-basic', methods=['GET'])
+@query_budget(1)
+@jwt_required()
+@cached_response()
 def get_basic_dashboard_data():
     """Get basic dashboard stats (all authenticated users)"""
     try:
-        from flask_jwt_extended import jwt_required, get_jwt_identity
-        
-        jwt_required()
-        user_id = get_jwt_identity()
-        
         # Get date range (default to last 30 days)
         days = request.args.get('days', 30, type=int)
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
-        # Total users
-        total_users = User.query.filter_by(is_active=True).count()
-        
-        # Total teams
-        total_teams = Team.query.count()
-        
-        # Total projects
-        total_projects = Project.query.count()
-        active_projects = Project.query.filter_by(status='active').count()
-        
-        # Check-in statistics
-        checkins = CheckIn.query.filter(
-            CheckIn.check_in_date >= start_date,
-            CheckIn.check_in_date <= end_date
-        ).all()
-        
-        total_checkins = len(checkins)
-        
-        # Recent check-ins (last 7 days)
-        recent_start = end_date - timedelta(days=7)
-        recent_checkins = CheckIn.query.filter(
-            CheckIn.check_in_date >= recent_start,
-            CheckIn.check_in_date <= end_date
-        ).count()
+        # User, team and project counts plus check-ins in the window and the last 7 days
+        overview = _dashboard_overview(start_date, end_date, end_date - timedelta(days=7))
         
         return jsonify({
             'overview': {
-                'total_users': total_users,
-                'total_teams': total_teams,
-                'total_projects': total_projects,
-                'active_projects': active_projects,
-                'total_checkins': total_checkins,
-                'recent_checkins': recent_checkins
+                'total_users': overview.total_users,
+                'total_teams': overview.total_teams,
+                'total_projects': overview.total_projects,
+                'active_projects': overview.active_projects,
+                'total_checkins': overview.total_checkins,
+                'recent_checkins': overview.recent_checkins
             },
             'date_range': {
                 'start': start_date.isoformat(),
@@ -68,7 +114,9 @@ def get_basic_dashboard_data():
         return jsonify({'message': 'Error fetching dashboard data', 'error': str(e)}), 500
 
 @analytics_bp.route('/dashboard', methods=['GET'])
+@query_budget(2)
 @admin_required
+@cached_response()
 def get_dashboard_data():
     """Get dashboard analytics (admin only)"""
     try:
@@ -77,59 +125,22 @@ def get_dashboard_data():
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
-        # Total users
-        total_users = User.query.filter_by(is_active=True).count()
-        
-        # Total teams
-        total_teams = Team.query.count()
-        
-        # Total projects
-        total_projects = Project.query.count()
-        active_projects = Project.query.filter_by(status='active').count()
-        
-        # Check-in statistics
-        checkins = CheckIn.query.filter(
-            CheckIn.check_in_date >= start_date,
-            CheckIn.check_in_date <= end_date
-        ).all()
-        
-        total_checkins = len(checkins)
-        avg_mood = 0
-        avg_workload = 0
-        avg_stress = 0
-        
-        if checkins:
-            total_mood = sum(c.mood_rating for c in checkins)
-            avg_mood = round(total_mood / len(checkins), 2)
-            
-            workload_ratings = [c.work_load_rating for c in checkins if c.work_load_rating]
-            if workload_ratings:
-                avg_workload = round(sum(workload_ratings) / len(workload_ratings), 2)
-            
-            stress_levels = [c.stress_level for c in checkins if c.stress_level]
-            if stress_levels:
-                avg_stress = round(sum(stress_levels) / len(stress_levels), 2)
-        
-        # Recent check-ins (last 7 days)
-        recent_start = end_date - timedelta(days=7)
-        recent_checkins = CheckIn.query.filter(
-            CheckIn.check_in_date >= recent_start,
-            CheckIn.check_in_date <= end_date
-        ).count()
+        # User, team and project counts plus check-in stats in the window and the last 7 days
+        overview = _dashboard_overview(start_date, end_date, end_date - timedelta(days=7))
         
         return jsonify({
             'overview': {
-                'total_users': total_users,
-                'total_teams': total_teams,
-                'total_projects': total_projects,
-                'active_projects': active_projects,
-                'total_checkins': total_checkins,
-                'recent_checkins': recent_checkins
+                'total_users': overview.total_users,
+                'total_teams': overview.total_teams,
+                'total_projects': overview.total_projects,
+                'active_projects': overview.active_projects,
+                'total_checkins': overview.total_checkins,
+                'recent_checkins': overview.recent_checkins
             },
             'averages': {
-                'mood': avg_mood,
-                'workload': avg_workload,
-                'stress': avg_stress
+                'mood': _rounded_average(overview.avg_mood),
+                'workload': _rounded_average(overview.avg_workload),
+                'stress': _rounded_average(overview.avg_stress)
             },
             'date_range': {
                 'start': start_date.isoformat(),
@@ -142,7 +153,9 @@ def get_dashboard_data():
         return jsonify({'message': 'Error fetching dashboard data', 'error': str(e)}), 500
 
 @analytics_bp.route('/teams', methods=['GET'])
+@query_budget(5)
 @admin_required
+@cached_response()
 def get_team_analytics():
     """Get team analytics (admin only)"""
     try:
@@ -151,44 +164,38 @@ def get_team_analytics():
         start_date = end_date - timedelta(days=days)
         
         teams = Team.query.all()
-        team_data = []
         
+        # Member counts (all members for the team summary, active ones for the analytics row)
+        member_counts = {
+            row.team_id: row
+            for row in db.session.query(
+                User.team_id,
+                func.count(User.id).label('total'),
+                func.sum(case((User.is_active, 1), else_=0)).label('active')
+            ).filter(User.team_id.isnot(None)).group_by(User.team_id).all()
+        }
+        
+        # Project counts per team
+        project_counts = dict(
+            db.session.query(Project.team_id, func.count(Project.id)).group_by(Project.team_id).all()
+        )
+        
+        # Check-in counts and averages per team
+        checkin_stats = _checkin_aggregates(CheckInDailyRollup.team_id, start_date, end_date)
+        
+        team_data = []
         for team in teams:
-            # Get team members
-            members = User.query.filter_by(team_id=team.id, is_active=True).all()
-            
-            # Get team check-ins
-            checkins = CheckIn.query.join(User).filter(
-                User.team_id == team.id,
-                CheckIn.check_in_date >= start_date,
-                CheckIn.check_in_date <= end_date
-            ).all()
-            
-            avg_mood = 0
-            avg_workload = 0
-            avg_stress = 0
-            
-            if checkins:
-                total_mood = sum(c.mood_rating for c in checkins)
-                avg_mood = round(total_mood / len(checkins), 2)
-                
-                workload_ratings = [c.work_load_rating for c in checkins if c.work_load_rating]
-                if workload_ratings:
-                    avg_workload = round(sum(workload_ratings) / len(workload_ratings), 2)
-                
-                stress_levels = [c.stress_level for c in checkins if c.stress_level]
-                if stress_levels:
-                    avg_stress = round(sum(stress_levels) / len(stress_levels), 2)
+            members = member_counts.get(team.id)
+            stats = checkin_stats.get(team.id, _EMPTY_CHECKIN_STATS)
             
             team_data.append({
-                'team': team.to_dict(),
-                'member_count': len(members),
-                'checkin_count': len(checkins),
-                'averages': {
-                    'mood': avg_mood,
-                    'workload': avg_workload,
-                    'stress': avg_stress
-                }
+                'team': team.to_dict(
+                    member_count=members.total if members else 0,
+                    project_count=project_counts.get(team.id, 0)
+                ),
+                'member_count': int(members.active or 0) if members else 0,
+                'checkin_count': stats['checkin_count'],
+                'averages': dict(stats['averages'])
             })
         
         return jsonify({
@@ -204,7 +211,9 @@ def get_team_analytics():
         return jsonify({'message': 'Error fetching team analytics', 'error': str(e)}), 500
 
 @analytics_bp.route('/projects', methods=['GET'])
+@query_budget(2)
 @admin_required
+@cached_response()
 def get_project_analytics():
     """Get project analytics (admin only)"""
     try:
@@ -212,41 +221,75 @@ def get_project_analytics():
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
-        projects = Project.query.all()
-        project_data = []
+        team_id = request.args.get('team_id', type=int)
+        status = request.args.get('status')
+        priority = request.args.get('priority')
+        sort_by = request.args.get('sort_by', 'id')
+        order = request.args.get('order', 'asc')
         
-        for project in projects:
-            # Get project check-ins
-            checkins = CheckIn.query.filter(
-                CheckIn.project_id == project.id,
-                CheckIn.check_in_date >= start_date,
-                CheckIn.check_in_date <= end_date
-            ).all()
-            
-            avg_mood = 0
-            avg_workload = 0
-            avg_stress = 0
-            
-            if checkins:
-                total_mood = sum(c.mood_rating for c in checkins)
-                avg_mood = round(total_mood / len(checkins), 2)
-                
-                workload_ratings = [c.work_load_rating for c in checkins if c.work_load_rating]
-                if workload_ratings:
-                    avg_workload = round(sum(workload_ratings) / len(workload_ratings), 2)
-                
-                stress_levels = [c.stress_level for c in checkins if c.stress_level]
-                if stress_levels:
-                    avg_stress = round(sum(stress_levels) / len(stress_levels), 2)
-            
+        # Assigned user counts straight from the association table
+        assignment_counts = db.session.query(
+            project_assignments.c.project_id.label('project_id'),
+            func.count(project_assignments.c.user_id).label('assigned_users_count')
+        ).group_by(project_assignments.c.project_id).subquery()
+        
+        # Check-in counts and averages per project for the date range
+        checkin_stats = CheckInDailyRollup.aggregate_query(
+            CheckInDailyRollup.project_id, start_date, end_date
+        ).subquery()
+        
+        assigned_users_count = func.coalesce(assignment_counts.c.assigned_users_count, 0)
+        checkin_count = func.coalesce(checkin_stats.c.checkin_count, 0)
+        
+        sort_columns = {
+            'id': Project.id,
+            'title': Project.title,
+            'status': Project.status,
+            'priority': _PRIORITY_ORDER,
+            'team': Team.name,
+            'checkin_count': checkin_count,
+            'mood': func.coalesce(checkin_stats.c.avg_mood, 0)
+        }
+        if sort_by not in sort_columns:
+            return jsonify({'message': f"Invalid sort_by. Use one of: {', '.join(sort_columns)}"}), 400
+        if order not in ('asc', 'desc'):
+            return jsonify({'message': 'Invalid order. Use asc or desc'}), 400
+        
+        query = db.session.query(
+            Project,
+            Team.name.label('team_name'),
+            assigned_users_count.label('assigned_users_count'),
+            checkin_count.label('checkin_count'),
+            checkin_stats.c.avg_mood,
+            checkin_stats.c.avg_workload,
+            checkin_stats.c.avg_stress
+        ).outerjoin(Team, Project.team_id == Team.id) \
+            .outerjoin(assignment_counts, assignment_counts.c.project_id == Project.id) \
+            .outerjoin(checkin_stats, checkin_stats.c.group_id == Project.id)
+        
+        if team_id:
+            query = query.filter(Project.team_id == team_id)
+        if status:
+            query = query.filter(Project.status == status)
+        if priority:
+            query = query.filter(Project.priority == priority)
+        
+        sort_column = sort_columns[sort_by]
+        query = query.order_by(sort_column.desc() if order == 'desc' else sort_column.asc(), Project.id)
+        
+        project_data = []
+        for row in query.all():
             project_data.append({
-                'project': project.to_dict(),
-                'assigned_users_count': len(project.assigned_users),
-                'checkin_count': len(checkins),
+                'project': row.Project.to_dict(
+                    team_name=row.team_name,
+                    assigned_users_count=row.assigned_users_count
+                ),
+                'assigned_users_count': row.assigned_users_count,
+                'checkin_count': row.checkin_count,
                 'averages': {
-                    'mood': avg_mood,
-                    'workload': avg_workload,
-                    'stress': avg_stress
+                    'mood': _rounded_average(row.avg_mood),
+                    'workload': _rounded_average(row.avg_workload),
+                    'stress': _rounded_average(row.avg_stress)
                 }
             })
         
@@ -263,7 +306,9 @@ def get_project_analytics():
         return jsonify({'message': 'Error fetching project analytics', 'error': str(e)}), 500
 
 @analytics_bp.route('/trends', methods=['GET'])
+@query_budget(2)
 @admin_required
+@cached_response()
 def get_trends():
     """Get mood trends over time (admin only)"""
     try:
@@ -272,21 +317,14 @@ def get_trends():
         start_date = end_date - timedelta(days=days)
         
         # Get daily averages
-        daily_data = db.session.query(
-            CheckIn.check_in_date,
-            func.avg(CheckIn.mood_rating).label('avg_mood'),
-            func.avg(CheckIn.work_load_rating).label('avg_workload'),
-            func.avg(CheckIn.stress_level).label('avg_stress'),
-            func.count(CheckIn.id).label('checkin_count')
-        ).filter(
-            CheckIn.check_in_date >= start_date,
-            CheckIn.check_in_date <= end_date
-        ).group_by(CheckIn.check_in_date).order_by(CheckIn.check_in_date).all()
+        daily_data = CheckInDailyRollup.aggregate_query(
+            CheckInDailyRollup.rollup_date, start_date, end_date
+        ).order_by(CheckInDailyRollup.rollup_date).all()
         
         trends = []
         for day_data in daily_data:
             trends.append({
-                'date': day_data.check_in_date.isoformat(),
+                'date': day_data.group_id.isoformat(),
                 'avg_mood': float(day_data.avg_mood) if day_data.avg_mood else 0,
                 'avg_workload': float(day_data.avg_workload) if day_data.avg_workload else 0,
                 'avg_stress': float(day_data.avg_stress) if day_data.avg_stress else 0,
@@ -303,4 +341,15 @@ def get_trends():
         }), 200
         
     except Exception as e:
-        return jsonify({'message': 'Error fetching trends', 'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'message': 'Error fetching trends', 'error': str(e)}), 500 
+
+@analytics_bp.route('/cache', methods=['GET'])
+@query_budget(1)
+@admin_required
+def get_cache_stats():
+    """Get analytics response cache hit/miss statistics (admin only)"""
+    cache = get_response_cache()
+    if cache is None:
+        return jsonify({'message': 'Response cache is disabled'}), 404
+    
+    return jsonify({'cache': cache.stats()}), 200
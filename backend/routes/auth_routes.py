@@ -1,28 +1,43 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt
 from werkzeug.security import generate_password_hash
 from models.user import User, db
-from auth.jwt_auth import create_user_token
+from models.refresh_token import RefreshToken
+from auth.jwt_auth import create_user_token, create_user_refresh_token, prune_refresh_tokens
 from auth.decorators import admin_required
+from auth.revocation import revoke_user_tokens
+# Aliased: this module's /me view is itself named get_current_user
+from auth.current_user import get_current_user as get_authenticated_user, invalidate_user
+from services.cache import bumps_data_version
+from services.query_budget import query_budget
+from services.passwords import PasswordHasherBusy, get_password_hasher
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+def _hasher_busy_response():
+    """Fast rejection while the bcrypt pool is saturated"""
+    response = jsonify({
+        'message': 'Server is busy, please retry shortly',
+        'error': 'password_hasher_busy'
+    })
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/login', methods=['POST'])
+@query_budget(5)
 def login():
     """User login endpoint"""
     try:
-        print("Login attempt started")
         data = request.get_json()
-        print(f"Received data: {data}")
         
         if not data or not data.get('email') or not data.get('password'):
             return jsonify({'message': 'Email and password are required'}), 400
         
         email = data['email'].lower()
         password = data['password']
-        print(f"Looking for user with email: {email}")
         
         user = User.query.filter_by(email=email).first()
-        print(f"User found: {user is not None}")
         
         if not user or not user.check_password(password):
             return jsonify({'message': 'Invalid email or password'}), 401
@@ -30,25 +45,88 @@ def login():
         if not user.is_active:
             return jsonify({'message': 'Account is deactivated'}), 401
         
-        print("Creating access token")
+        # Upgrade hashes made with an old bcrypt cost while we have the password
+        if user.password_needs_rehash():
+            user.set_password(password)
+        
         # Create access token
         access_token = create_user_token(user.id, user.email, user.role)
         
-        print("Login successful")
+        # Start a new refresh token family and drop this user's stale ones
+        prune_refresh_tokens(user.id)
+        refresh_token = create_user_refresh_token(user.id)
+        db.session.commit()
+        
         return jsonify({
             'message': 'Login successful',
             'access_token': access_token,
+            'refresh_token': refresh_token,
             'user': user.to_dict()
         }), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return _hasher_busy_response()
     except Exception as e:
-        import traceback
-        print(f"Login error: {str(e)}")
-        print(f"Traceback: {traceback.format_exc()}")
+        current_app.logger.exception('Login error')
         return jsonify({'message': 'Internal server error', 'error': str(e)}), 500
 
+@auth_bp.route('/refresh', methods=['POST'])
+@query_budget(4)
+@jwt_required(refresh=True)
+def refresh():
+    """Exchange a refresh token for a new access token and a rotated refresh token"""
+    try:
+        claims = get_jwt()
+        
+        # Claim the token atomically so concurrent refreshes cannot both succeed
+        claimed = RefreshToken.query.filter(
+            RefreshToken.jti == claims['jti'],
+            RefreshToken.used_at.is_(None),
+            RefreshToken.revoked.is_(False)
+        ).update({'used_at': datetime.utcnow()}, synchronize_session=False)
+        
+        if not claimed:
+            # A used token presented again means it leaked: revoke the whole family
+            stored = db.session.get(RefreshToken, claims['jti'])
+            if stored is not None:
+                RefreshToken.query.filter_by(family_id=stored.family_id) \
+                    .update({'revoked': True}, synchronize_session=False)
+                db.session.commit()
+                if stored.used_at is not None:
+                    return jsonify({
+                        'message': 'Refresh token reuse detected, please log in again',
+                        'error': 'token_reused'
+                    }), 401
+            return jsonify({
+                'message': 'The token has been revoked',
+                'error': 'token_revoked'
+            }), 401
+        
+        user = get_authenticated_user()
+        if not user or not user.is_active:
+            db.session.rollback()
+            return jsonify({'message': 'Account is deactivated'}), 401
+        
+        access_token = create_user_token(user.id, user.email, user.role)
+        refresh_token = create_user_refresh_token(user.id, family_id=claims['family'])
+        # Sessions kept alive by refreshing never pass through login's pruning
+        prune_refresh_tokens(user.id)
+        db.session.commit()
+        
+        return jsonify({
+            'access_token': access_token,
+            'refresh_token': refresh_token
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error refreshing token', 'error': str(e)}), 500
+
 @auth_bp.route('/register', methods=['POST'])
+@query_budget(4)
 @admin_required
+@bumps_data_version
 def register():
     """Register new user (admin only)"""
     data = request.get_json()
@@ -84,19 +162,22 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return _hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Error creating user', 'error': str(e)}), 500
 
 @auth_bp.route('/me', methods=['GET'])
+@query_budget(1)
 def get_current_user():
     """Get current user information"""
-    from flask_jwt_extended import jwt_required, get_jwt_identity
+    from flask_jwt_extended import verify_jwt_in_request
     
     try:
-        jwt_required()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        verify_jwt_in_request()
+        user = get_authenticated_user()
         
         if not user:
             return jsonify({'message': 'User not found'}), 404
@@ -109,14 +190,14 @@ def get_current_user():
         return jsonify({'message': 'Authentication required'}), 401
 
 @auth_bp.route('/change-password', methods=['PUT'])
+@query_budget(7)
 def change_password():
     """Change user password"""
-    from flask_jwt_extended import jwt_required, get_jwt_identity
+    from flask_jwt_extended import verify_jwt_in_request
     
     try:
-        jwt_required()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        verify_jwt_in_request()
+        user = get_authenticated_user()
         
         if not user:
             return jsonify({'message': 'User not found'}), 404
@@ -134,11 +215,37 @@ def change_password():
         if len(new_password) < 6:
             return jsonify({'message': 'New password must be at least 6 characters'}), 400
         
-        # Update password
-        user.password_hash = user.generate_password_hash(new_password).decode('utf-8')
+        # Update password and end every session started with the old one,
+        # including any stolen refresh token
+        user.set_password(new_password)
+        RefreshToken.query.filter_by(user_id=user.id, revoked=False) \
+            .update({'revoked': True}, synchronize_session=False)
+        revoke_user_tokens(user.id)
+        
+        # This client continues in a new session
+        access_token = create_user_token(user.id, user.email, user.role)
+        refresh_token = create_user_refresh_token(user.id)
         db.session.commit()
+        invalidate_user(user.id)
         
-        return jsonify({'message': 'Password changed successfully'}), 200
+        return jsonify({
+            'message': 'Password changed successfully',
+            'access_token': access_token,
+            'refresh_token': refresh_token
+        }), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return _hasher_busy_response()
     except Exception as e:
-        return jsonify({'message': 'Authentication required'}), 401 
\ No newline at end of file
+        return jsonify({'message': 'Authentication required'}), 401 
+
+@auth_bp.route('/password-hasher', methods=['GET'])
+@query_budget(1)
+@admin_required
+def get_password_hasher_stats():
+    """Password hashing pool settings, rejections and latency percentiles (admin only)"""
+    hasher = get_password_hasher()
+    if hasher is None:
+        return jsonify({'message': 'Password hasher is not configured'}), 404
+    return jsonify(hasher.stats()), 200
@@ -0,0 +1,150 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, current_app, g
+from flask_jwt_extended import jwt_required
+from sqlalchemy import inspect
+from werkzeug.test import EnvironBuilder
+from models.user import db
+from auth.current_user import get_current_user, share_current_user
+from services.query_budget import query_budget
+
+batch_bp = Blueprint('batch', __name__, url_prefix='/api/batch')
+
+METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+def _parse_sub_requests(data, max_requests):
+    """Validate the batch body; returns a list of normalized sub-requests"""
+    items = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError('requests must be a non-empty list')
+    if len(items) > max_requests:
+        raise ValueError(f'At most {max_requests} requests per batch')
+    
+    sub_requests = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f'requests[{index}] must be an object')
+        method = str(item.get('method', 'GET')).upper()
+        path = item.get('path')
+        if method not in METHODS:
+            raise ValueError(f'requests[{index}].method must be one of {", ".join(METHODS)}')
+        if not isinstance(path, str) or not path.startswith('/api/') or path.startswith(batch_bp.url_prefix):
+            raise ValueError(f'requests[{index}].path must be an /api/ path other than the batch endpoint')
+        args = item.get('args') or {}
+        if not isinstance(args, dict):
+            raise ValueError(f'requests[{index}].args must be an object')
+        sub_requests.append({
+            'id': item.get('id', index),
+            'method': method,
+            'path': path,
+            'args': args,
+            'body': item.get('body')
+        })
+    return sub_requests
+
+def _environ(sub_request, headers):
+    builder = EnvironBuilder(
+        path=sub_request['path'],
+        method=sub_request['method'],
+        query_string=sub_request['args'],
+        json=sub_request['body'] if sub_request['method'] != 'GET' else None,
+        headers=headers
+    )
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+def _dispatch(app, sub_request, headers):
+    """Run one sub-request through the normal request pipeline in the current app context"""
+    started = time.perf_counter()
+    with app.request_context(_environ(sub_request, headers)):
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:
+            db.session.rollback()
+            response = jsonify({'message': 'Internal server error', 'error': str(e)})
+            response.status_code = 500
+        body = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+    return {
+        'id': sub_request['id'],
+        'status': response.status_code,
+        'body': body,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2)
+    }
+
+def _dispatch_in_own_context(app, sub_request, headers, user):
+    """Run a read-only sub-request on a worker thread with its own app context and session"""
+    with app.app_context():
+        # Attach the already loaded user to this thread's session without a query
+        share_current_user(db.session.merge(user, load=False) if user is not None else None)
+        return _dispatch(app, sub_request, headers)
+
+def _concurrent_reads_supported():
+    # An in-memory SQLite database is a single connection shared by every thread
+    url = db.engine.url
+    return not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'))
+
+@batch_bp.route('', methods=['POST'])
+@query_budget(3)
+@jwt_required()
+def run_batch():
+    """Dispatch several API requests in one round trip
+    
+    Sub-requests share the caller's token, authenticated user and database
+    session. Consecutive GET sub-requests run concurrently; any other method
+    runs on its own, in order, so reads after a write see it.
+    """
+    try:
+        sub_requests = _parse_sub_requests(
+            request.get_json(silent=True), current_app.config.get('BATCH_MAX_REQUESTS', 20)
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    started = time.perf_counter()
+    app = current_app._get_current_object()
+    user = get_current_user()
+    if user is None:
+        return jsonify({'message': 'User not found'}), 404
+    share_current_user(user)
+    headers = {'Authorization': request.headers['Authorization']}
+    max_workers = current_app.config.get('BATCH_MAX_WORKERS', 4)
+    concurrent = max_workers > 1 and _concurrent_reads_supported()
+    
+    # Split into runs: consecutive reads form one group, each write its own
+    groups = []
+    for sub_request in sub_requests:
+        if sub_request['method'] == 'GET' and groups and groups[-1][0]['method'] == 'GET':
+            groups[-1].append(sub_request)
+        else:
+            groups.append([sub_request])
+    
+    try:
+        results = []
+        for group in groups:
+            if concurrent and len(group) > 1:
+                # A write may have expired or dropped the shared user; reload it once here
+                # rather than once per worker thread
+                user = get_current_user()
+                if user is not None and inspect(user).expired_attributes:
+                    db.session.refresh(user)
+                share_current_user(user)
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(group))) as pool:
+                    results.extend(pool.map(
+                        lambda sub_request: _dispatch_in_own_context(app, sub_request, headers, user),
+                        group
+                    ))
+            else:
+                results.extend(_dispatch(app, sub_request, headers) for sub_request in group)
+    finally:
+        # The app context may outlive this request (e.g. in tests); don't leak the user
+        g.pop('share_current_user', None)
+        g.pop('current_user', None)
+        g.pop('db_read_replica', None)
+        g.pop('db_read_primary', None)
+    
+    return jsonify({
+        'responses': results,
+        'total_ms': round((time.perf_counter() - started) * 1000, 2)
+    }), 200
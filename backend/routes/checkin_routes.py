@@ -1,108 +1,253 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.checkin import CheckIn, db
 from models.user import User
 from models.project import Project
 from auth.decorators import admin_required, employee_required, same_user_or_admin_required
-from datetime import datetime, date, timedelta
+from services.cache import bumps_data_version, get_response_cache
+from services.query_budget import query_budget
+from services.pagination import paginate_query, InvalidCursor
+from services.rollups import record_inserted_checkins
+from services.bulk import read_bulk_rows, BulkInputError
+from services.checkin_ingest import ingest_checkins, IngestInterrupted, CONFLICT_MODES
+from sqlalchemy.exc import IntegrityError
+from datetime import date, timedelta
+import csv
+import io
+import json
+import zlib
 
 checkin_bp = Blueprint('checkins', __name__, url_prefix='/api/checkins')
 
+EXPORT_COLUMNS = [
+    'id', 'user_id', 'user_name', 'project_id', 'project_title', 'check_in_date',
+    'mood_rating', 'comment', 'work_load_rating', 'stress_level', 'created_at', 'updated_at'
+]
+
+# Rows fetched per server-side cursor round trip and written per streamed chunk
+EXPORT_BATCH_SIZE = 1000
+
+def _filter_checkins(query, args, users_joined=False):
+    """Apply the admin check-in listing filters from request args to a query"""
+    user_id = args.get('user_id', type=int)
+    team_id = args.get('team_id', type=int)
+    project_id = args.get('project_id', type=int)
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    
+    if user_id:
+        query = query.filter(CheckIn.user_id == user_id)
+    if project_id:
+        query = query.filter(CheckIn.project_id == project_id)
+    if team_id:
+        if not users_joined:
+            query = query.join(User)
+        query = query.filter(User.team_id == team_id)
+    if start_date:
+        query = query.filter(CheckIn.check_in_date >= start_date)
+    if end_date:
+        query = query.filter(CheckIn.check_in_date <= end_date)
+    
+    return query
+
+def _insert_checkin(values):
+    """Insert a check-in unless the user already has one for that date
+    
+    A single INSERT ... ON CONFLICT DO NOTHING on Postgres and SQLite, so
+    concurrent double submits cannot both succeed. Returns the new id, or None
+    on conflict. Rollups are updated on the same connection.
+    """
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(CheckIn.__table__).values(**values).on_conflict_do_nothing(
+            index_elements=['user_id', 'check_in_date']
+        ).returning(CheckIn.__table__.c.id)
+        checkin_id = connection.execute(stmt).scalar()
+        if checkin_id is not None:
+            record_inserted_checkins(connection, [values])
+        return checkin_id
+    
+    # Other databases: let the unique index reject the duplicate
+    checkin = CheckIn(**values)
+    try:
+        with db.session.begin_nested():
+            db.session.add(checkin)
+    except IntegrityError:
+        return None
+    return checkin.id
+
+def _export_rows(query):
+    """Yield export rows as plain dicts, streaming from a server-side cursor"""
+    for row in query.execution_options(stream_results=True).yield_per(EXPORT_BATCH_SIZE):
+        yield {
+            'id': row.id,
+            'user_id': row.user_id,
+            'user_name': f"{row.first_name} {row.last_name}",
+            'project_id': row.project_id,
+            'project_title': row.project_title,
+            'check_in_date': row.check_in_date.isoformat() if row.check_in_date else None,
+            'mood_rating': row.mood_rating,
+            'comment': row.comment,
+            'work_load_rating': row.work_load_rating,
+            'stress_level': row.stress_level,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'updated_at': row.updated_at.isoformat() if row.updated_at else None
+        }
+
+def _csv_chunks(rows):
+    """Encode rows as CSV, one chunk per EXPORT_BATCH_SIZE rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _ndjson_chunks(rows):
+    """Encode rows as newline-delimited JSON, one chunk per EXPORT_BATCH_SIZE rows"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row))
+        if len(lines) == EXPORT_BATCH_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def _gzip_chunks(chunks):
+    """Gzip text chunks on the fly"""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
 @checkin_bp.route('/', methods=['GET'])
+@query_budget(3)
 @admin_required
 def get_checkins():
     """Get all check-ins (admin only)"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        user_id = request.args.get('user_id', type=int)
-        team_id = request.args.get('team_id', type=int)
-        project_id = request.args.get('project_id', type=int)
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        query = CheckIn.query
+        query = _filter_checkins(CheckIn.query.options(*CheckIn.to_dict_options()), request.args)
         
-        if user_id:
-            query = query.filter_by(user_id=user_id)
-        if project_id:
-            query = query.filter_by(project_id=project_id)
-        if team_id:
-            query = query.join(User).filter(User.team_id == team_id)
-        if start_date:
-            query = query.filter(CheckIn.check_in_date >= start_date)
-        if end_date:
-            query = query.filter(CheckIn.check_in_date <= end_date)
-        
-        checkins = query.order_by(CheckIn.check_in_date.desc()).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
+        checkins, pagination = paginate_query(
+            query.order_by(CheckIn.check_in_date.desc()),
+            request.args,
+            key_columns=(CheckIn.check_in_date, CheckIn.id),
+            descending=True
         )
         
         return jsonify({
-            'checkins': [checkin.to_dict() for checkin in checkins.items],
-            'pagination': {
-                'page': checkins.page,
-                'pages': checkins.pages,
-                'per_page': checkins.per_page,
-                'total': checkins.total,
-                'has_next': checkins.has_next,
-                'has_prev': checkins.has_prev
-            }
+            'checkins': [checkin.to_dict() for checkin in checkins],
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': 'Error fetching check-ins', 'error': str(e)}), 500
 
+@checkin_bp.route('/export', methods=['GET'])
+@query_budget(2)
+@admin_required
+def export_checkins():
+    """Stream all matching check-ins as CSV or NDJSON (admin only)"""
+    export_format = request.args.get('format', 'csv').lower()
+    use_gzip = request.args.get('gzip', 'false').lower() == 'true'
+    
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'message': 'Format must be csv or ndjson'}), 400
+    
+    query = db.session.query(
+        CheckIn.id,
+        CheckIn.user_id,
+        User.first_name,
+        User.last_name,
+        CheckIn.project_id,
+        Project.title.label('project_title'),
+        CheckIn.check_in_date,
+        CheckIn.mood_rating,
+        CheckIn.comment,
+        CheckIn.work_load_rating,
+        CheckIn.stress_level,
+        CheckIn.created_at,
+        CheckIn.updated_at
+    ).join(User, CheckIn.user_id == User.id).outerjoin(Project, CheckIn.project_id == Project.id)
+    
+    query = _filter_checkins(query, request.args, users_joined=True)
+    query = query.order_by(CheckIn.check_in_date.desc(), CheckIn.id.desc())
+    
+    rows = _export_rows(query)
+    if export_format == 'csv':
+        chunks = _csv_chunks(rows)
+        mimetype = 'text/csv'
+    else:
+        chunks = _ndjson_chunks(rows)
+        mimetype = 'application/x-ndjson'
+    
+    filename = f'checkins.{export_format}'
+    headers = {'Content-Disposition': f'attachment; filename={filename}'}
+    if use_gzip:
+        chunks = _gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
 @checkin_bp.route('/my-checkins', methods=['GET'])
+@query_budget(2)
+@jwt_required()
 def get_my_checkins():
     """Get current user's check-ins"""
     try:
-        from flask_jwt_extended import jwt_required, get_jwt_identity
-        
-        jwt_required()
         user_id = get_jwt_identity()
         
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        query = CheckIn.query.filter_by(user_id=user_id)
+        query = CheckIn.query.options(*CheckIn.to_dict_options()).filter_by(user_id=user_id)
         
         if start_date:
             query = query.filter(CheckIn.check_in_date >= start_date)
         if end_date:
             query = query.filter(CheckIn.check_in_date <= end_date)
         
-        checkins = query.order_by(CheckIn.check_in_date.desc()).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
+        checkins, pagination = paginate_query(
+            query.order_by(CheckIn.check_in_date.desc()),
+            request.args,
+            key_columns=(CheckIn.check_in_date, CheckIn.id),
+            descending=True
         )
         
         return jsonify({
-            'checkins': [checkin.to_dict() for checkin in checkins.items],
-            'pagination': {
-                'page': checkins.page,
-                'pages': checkins.pages,
-                'per_page': checkins.per_page,
-                'total': checkins.total,
-                'has_next': checkins.has_next,
-                'has_prev': checkins.has_prev
-            }
+            'checkins': [checkin.to_dict() for checkin in checkins],
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': 'Error fetching check-ins', 'error': str(e)}), 500
 
 @checkin_bp.route('/', methods=['POST'])
+@query_budget(4)
+@bumps_data_version
 def create_checkin():
     """Create new check-in"""
     try:
-        from flask_jwt_extended import jwt_required, get_jwt_identity
+        from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
         
-        jwt_required()
+        verify_jwt_in_request()
         user_id = get_jwt_identity()
         
         data = request.get_json()
@@ -114,28 +259,24 @@ def create_checkin():
         if mood_rating < 1 or mood_rating > 5:
             return jsonify({'message': 'Mood rating must be between 1 and 5'}), 400
         
-        # Check if user already has a check-in for today
-        today = date.today()
-        existing_checkin = CheckIn.query.filter_by(
-            user_id=user_id, 
-            check_in_date=today
-        ).first()
-        
-        if existing_checkin:
+        values = {
+            'user_id': user_id,
+            'mood_rating': mood_rating,
+            'project_id': data.get('project_id'),
+            'comment': data.get('comment'),
+            'work_load_rating': data.get('work_load_rating'),
+            'stress_level': data.get('stress_level'),
+            'check_in_date': date.today()
+        }
+        
+        # The unique (user_id, check_in_date) index rejects a second check-in for today
+        checkin_id = _insert_checkin(values)
+        if checkin_id is None:
+            db.session.rollback()
             return jsonify({'message': 'You already have a check-in for today'}), 409
         
-        checkin = CheckIn(
-            user_id=user_id,
-            mood_rating=mood_rating,
-            project_id=data.get('project_id'),
-            comment=data.get('comment'),
-            work_load_rating=data.get('work_load_rating'),
-            stress_level=data.get('stress_level'),
-            check_in_date=today
-        )
-        
-        db.session.add(checkin)
         db.session.commit()
+        checkin = CheckIn.query.options(*CheckIn.to_dict_options()).get(checkin_id)
         
         return jsonify({
             'message': 'Check-in submitted successfully',
@@ -146,7 +287,48 @@ def create_checkin():
         db.session.rollback()
         return jsonify({'message': 'Error creating check-in', 'error': str(e)}), 500
 
+@checkin_bp.route('/bulk', methods=['POST'])
+@query_budget(5)
+@admin_required
+@bumps_data_version
+def ingest_checkins_bulk():
+    """Create or update many check-ins at once (admin only)
+    
+    Each row needs user_id or email, check_in_date and mood_rating; project_id,
+    work_load_rating, stress_level and comment are optional. ``on_conflict``
+    (query arg or JSON field) decides what happens to a user's existing check-in
+    for the same date: ``skip`` (default) or ``update``, which changes only the
+    fields the row includes. If a chunk fails, the 500 response reports what the
+    committed chunks wrote and ``resume_from_row``.
+    """
+    data = request.get_json(silent=True) if request.is_json else None
+    on_conflict = request.args.get('on_conflict') or \
+        (data.get('on_conflict') if isinstance(data, dict) else None) or 'skip'
+    if on_conflict not in CONFLICT_MODES:
+        return jsonify({'message': f'on_conflict must be one of {", ".join(CONFLICT_MODES)}'}), 400
+    
+    try:
+        rows = read_bulk_rows(request, 'checkins', current_app.config.get('CHECKIN_INGEST_MAX_ROWS', 50000))
+    except BulkInputError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    try:
+        result = ingest_checkins(rows, on_conflict=on_conflict)
+        return jsonify(result), 200
+        
+    except IngestInterrupted as e:
+        # Earlier chunks are committed; the error response does not bump the version itself
+        if e.progress['inserted'] or e.progress['updated']:
+            cache = get_response_cache()
+            if cache is not None:
+                cache.bump()
+        return jsonify({'message': 'Error ingesting check-ins', 'error': str(e), **e.progress}), 500
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error ingesting check-ins', 'error': str(e)}), 500
+
 @checkin_bp.route('/<int:checkin_id>', methods=['GET'])
+@query_budget(4)
 @same_user_or_admin_required
 def get_checkin(checkin_id):
     """Get specific check-in"""
@@ -162,7 +344,9 @@ def get_checkin(checkin_id):
         return jsonify({'message': 'Error fetching check-in', 'error': str(e)}), 500
 
 @checkin_bp.route('/<int:checkin_id>', methods=['PUT'])
+@query_budget(8)
 @same_user_or_admin_required
+@bumps_data_version
 def update_checkin(checkin_id):
     """Update check-in (same user or admin)"""
     try:
@@ -209,7 +393,9 @@ def update_checkin(checkin_id):
         return jsonify({'message': 'Error updating check-in', 'error': str(e)}), 500
 
 @checkin_bp.route('/<int:checkin_id>', methods=['DELETE'])
+@query_budget(7)
 @admin_required
+@bumps_data_version
 def delete_checkin(checkin_id):
     """Delete check-in (admin only)"""
     try:
@@ -228,6 +414,7 @@ def delete_checkin(checkin_id):
         return jsonify({'message': 'Error deleting check-in', 'error': str(e)}), 500
 
 @checkin_bp.route('/weekly-summary', methods=['GET'])
+@query_budget(2)
 @admin_required
 def get_weekly_summary():
     """Get weekly check-in summary (admin only)"""
@@ -240,7 +427,7 @@ def get_weekly_summary():
         start_of_week = today - timedelta(days=today.weekday())
         end_of_week = start_of_week + timedelta(days=6)
         
-        query = CheckIn.query.filter(
+        query = CheckIn.query.options(*CheckIn.to_dict_options()).filter(
             CheckIn.check_in_date >= start_of_week,
             CheckIn.check_in_date <= end_of_week
         )
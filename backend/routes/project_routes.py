@@ -1,30 +1,49 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from models.project import Project, db, project_assignments
 from models.user import User
 from models.team import Team
 from auth.decorators import admin_required, employee_required
+from auth.current_user import get_current_user
+from services.cache import bumps_data_version
+from services.query_budget import query_budget
+from services.pagination import paginate_query, InvalidCursor
+from services.bulk import requested_ids, BulkInputError
+from sqlalchemy import select, func, and_
 from datetime import datetime
 
 project_bp = Blueprint('projects', __name__, url_prefix='/api/projects')
 
+def _assignment_count(project_id):
+    return db.session.scalar(
+        select(func.count()).select_from(project_assignments).where(project_assignments.c.project_id == project_id)
+    )
+
+def _insert_assignments(rows):
+    """Insert assignment rows in one statement, ignoring pairs created concurrently"""
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        connection.execute(insert(project_assignments).on_conflict_do_nothing(), rows)
+    else:
+        connection.execute(project_assignments.insert(), rows)
+
 @project_bp.route('/', methods=['GET'])
+@query_budget(3)
 @employee_required
 def get_projects():
     """Get projects (filtered by user role)"""
     try:
-        from flask_jwt_extended import get_jwt_identity
-        from auth.decorators import admin_required
-        
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         team_id = request.args.get('team_id', type=int)
         status = request.args.get('status')
         priority = request.args.get('priority')
         
-        query = Project.query
+        query = Project.query.options(*Project.to_dict_options())
         
         # Filter by team if specified
         if team_id:
@@ -40,30 +59,22 @@ def get_projects():
         
         # If user is not admin, only show projects they're assigned to
         if user and not user.is_admin():
-            query = query.join(project_assignments).filter(project_assignments.c.user_id == user_id)
+            query = query.join(project_assignments).filter(project_assignments.c.user_id == user.id)
         
-        projects = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        projects, pagination = paginate_query(query, request.args, key_columns=(Project.id,))
         
         return jsonify({
-            'projects': [project.to_dict() for project in projects.items],
-            'pagination': {
-                'page': projects.page,
-                'pages': projects.pages,
-                'per_page': projects.per_page,
-                'total': projects.total,
-                'has_next': projects.has_next,
-                'has_prev': projects.has_prev
-            }
+            'projects': [project.to_dict() for project in projects],
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': 'Error fetching projects', 'error': str(e)}), 500
 
 @project_bp.route('/<int:project_id>', methods=['GET'])
+@query_budget(5)
 @employee_required
 def get_project(project_id):
     """Get specific project"""
@@ -81,7 +92,9 @@ def get_project(project_id):
         return jsonify({'message': 'Error fetching project', 'error': str(e)}), 500
 
 @project_bp.route('/', methods=['POST'])
+@query_budget(6)
 @admin_required
+@bumps_data_version
 def create_project():
     """Create new project (admin only)"""
     try:
@@ -118,7 +131,9 @@ def create_project():
         return jsonify({'message': 'Error creating project', 'error': str(e)}), 500
 
 @project_bp.route('/<int:project_id>', methods=['PUT'])
+@query_budget(6)
 @admin_required
+@bumps_data_version
 def update_project(project_id):
     """Update project (admin only)"""
     try:
@@ -160,7 +175,9 @@ def update_project(project_id):
         return jsonify({'message': 'Error updating project', 'error': str(e)}), 500
 
 @project_bp.route('/<int:project_id>', methods=['DELETE'])
+@query_budget(5)
 @admin_required
+@bumps_data_version
 def delete_project(project_id):
     """Delete project (admin only)"""
     try:
@@ -179,7 +196,9 @@ def delete_project(project_id):
         return jsonify({'message': 'Error deleting project', 'error': str(e)}), 500
 
 @project_bp.route('/<int:project_id>/assign/<int:user_id>', methods=['POST'])
+@query_budget(9)
 @admin_required
+@bumps_data_version
 def assign_user_to_project(project_id, user_id):
     """Assign user to project (admin only)"""
     try:
@@ -208,7 +227,9 @@ def assign_user_to_project(project_id, user_id):
         return jsonify({'message': 'Error assigning user to project', 'error': str(e)}), 500
 
 @project_bp.route('/<int:project_id>/unassign/<int:user_id>', methods=['DELETE'])
+@query_budget(9)
 @admin_required
+@bumps_data_version
 def unassign_user_from_project(project_id, user_id):
     """Unassign user from project (admin only)"""
     try:
@@ -236,7 +257,92 @@ def unassign_user_from_project(project_id, user_id):
         db.session.rollback()
         return jsonify({'message': 'Error unassigning user from project', 'error': str(e)}), 500
 
+@project_bp.route('/<int:project_id>/assign', methods=['POST'])
+@query_budget(5)
+@admin_required
+@bumps_data_version
+def assign_users_to_project(project_id):
+    """Assign a list of users to a project in one call (admin only)"""
+    try:
+        user_ids = requested_ids(request.get_json(silent=True), current_app.config.get('BULK_MAX_IDS', 1000))
+    except BulkInputError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    try:
+        if db.session.get(Project, project_id) is None:
+            return jsonify({'message': 'Project not found'}), 404
+        
+        # One query tells which users exist and which are already assigned
+        rows = db.session.execute(
+            select(User.id, project_assignments.c.user_id)
+            .outerjoin(project_assignments, and_(
+                project_assignments.c.user_id == User.id,
+                project_assignments.c.project_id == project_id
+            ))
+            .where(User.id.in_(user_ids))
+        ).all()
+        found = {user_id for user_id, _ in rows}
+        already_assigned = {user_id for user_id, assigned in rows if assigned is not None}
+        to_assign = [user_id for user_id in user_ids if user_id in found and user_id not in already_assigned]
+        
+        if to_assign:
+            now = datetime.utcnow()
+            _insert_assignments([
+                {'project_id': project_id, 'user_id': user_id, 'assigned_at': now} for user_id in to_assign
+            ])
+        db.session.commit()
+        
+        return jsonify({
+            'message': f'{len(to_assign)} user(s) assigned to project',
+            'project_id': project_id,
+            'assigned': to_assign,
+            'already_assigned': [user_id for user_id in user_ids if user_id in already_assigned],
+            'not_found': [user_id for user_id in user_ids if user_id not in found],
+            'assigned_users_count': _assignment_count(project_id)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error assigning users to project', 'error': str(e)}), 500
+
+@project_bp.route('/<int:project_id>/unassign', methods=['POST'])
+@query_budget(5)
+@admin_required
+@bumps_data_version
+def unassign_users_from_project(project_id):
+    """Unassign a list of users from a project in one call (admin only)"""
+    try:
+        user_ids = requested_ids(request.get_json(silent=True), current_app.config.get('BULK_MAX_IDS', 1000))
+    except BulkInputError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    try:
+        if db.session.get(Project, project_id) is None:
+            return jsonify({'message': 'Project not found'}), 404
+        
+        in_project = and_(
+            project_assignments.c.project_id == project_id,
+            project_assignments.c.user_id.in_(user_ids)
+        )
+        assigned = set(db.session.scalars(select(project_assignments.c.user_id).where(in_project)))
+        if assigned:
+            db.session.execute(project_assignments.delete().where(in_project))
+        db.session.commit()
+        
+        return jsonify({
+            'message': f'{len(assigned)} user(s) unassigned from project',
+            'project_id': project_id,
+            'unassigned': [user_id for user_id in user_ids if user_id in assigned],
+            'not_assigned': [user_id for user_id in user_ids if user_id not in assigned],
+            'assigned_users_count': _assignment_count(project_id)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error unassigning users from project', 'error': str(e)}), 500
+
 @project_bp.route('/<int:project_id>/assigned-users', methods=['GET'])
+@query_budget(5)
 @employee_required
 def get_project_assigned_users(project_id):
     """Get users assigned to project"""
@@ -0,0 +1,18 @@
+import os
+from flask import Blueprint, jsonify
+from auth.decorators import admin_required
+from services.database import pool_stats
+from services.query_budget import query_budget
+
+system_bp = Blueprint('system', __name__, url_prefix='/api/system')
+
+@system_bp.route('/db-pool', methods=['GET'])
+@query_budget(1)
+@admin_required
+def get_db_pool_stats():
+    """Connection pool usage and checkout waits for this worker process (admin only)"""
+    try:
+        return jsonify({'pid': os.getpid(), 'engines': pool_stats()}), 200
+        
+    except Exception as e:
+        return jsonify({'message': 'Error fetching pool stats', 'error': str(e)}), 500
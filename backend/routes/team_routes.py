@@ -1,16 +1,23 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
 from models.team import Team, db
 from models.user import User
 from auth.decorators import admin_required
+from auth.current_user import invalidate_user
+from services.cache import bumps_data_version
+from services.query_budget import query_budget
+from services.bulk import requested_ids, BulkInputError
+from services.rollups import record_team_moves
 
 team_bp = Blueprint('teams', __name__, url_prefix='/api/teams')
 
 @team_bp.route('/', methods=['GET'])
+@query_budget(2)
 @admin_required
 def get_teams():
     """Get all teams (admin only)"""
     try:
-        teams = Team.query.all()
+        teams = Team.query.options(*Team.to_dict_options()).all()
         
         return jsonify({
             'teams': [team.to_dict() for team in teams]
@@ -20,6 +27,7 @@ def get_teams():
         return jsonify({'message': 'Error fetching teams', 'error': str(e)}), 500
 
 @team_bp.route('/<int:team_id>', methods=['GET'])
+@query_budget(5)
 @admin_required
 def get_team(team_id):
     """Get specific team with members"""
@@ -37,7 +45,9 @@ def get_team(team_id):
         return jsonify({'message': 'Error fetching team', 'error': str(e)}), 500
 
 @team_bp.route('/', methods=['POST'])
+@query_budget(6)
 @admin_required
+@bumps_data_version
 def create_team():
     """Create new team (admin only)"""
     try:
@@ -69,7 +79,9 @@ def create_team():
         return jsonify({'message': 'Error creating team', 'error': str(e)}), 500
 
 @team_bp.route('/<int:team_id>', methods=['PUT'])
+@query_budget(6)
 @admin_required
+@bumps_data_version
 def update_team(team_id):
     """Update team (admin only)"""
     try:
@@ -102,7 +114,9 @@ def update_team(team_id):
         return jsonify({'message': 'Error updating team', 'error': str(e)}), 500
 
 @team_bp.route('/<int:team_id>', methods=['DELETE'])
+@query_budget(7)
 @admin_required
+@bumps_data_version
 def delete_team(team_id):
     """Delete team (admin only)"""
     try:
@@ -112,11 +126,11 @@ def delete_team(team_id):
             return jsonify({'message': 'Team not found'}), 404
         
         # Check if team has members
-        if team.members:
+        if team.member_count:
             return jsonify({'message': 'Cannot delete team with members. Remove all members first.'}), 400
         
         # Check if team has projects
-        if team.projects:
+        if team.project_count:
             return jsonify({'message': 'Cannot delete team with projects. Remove all projects first.'}), 400
         
         db.session.delete(team)
@@ -129,6 +143,7 @@ def delete_team(team_id):
         return jsonify({'message': 'Error deleting team', 'error': str(e)}), 500
 
 @team_bp.route('/<int:team_id>/members', methods=['GET'])
+@query_budget(5)
 @admin_required
 def get_team_members(team_id):
     """Get team members (admin only)"""
@@ -147,7 +162,9 @@ def get_team_members(team_id):
         return jsonify({'message': 'Error fetching team members', 'error': str(e)}), 500
 
 @team_bp.route('/<int:team_id>/members/<int:user_id>', methods=['POST'])
+@query_budget(8)
 @admin_required
+@bumps_data_version
 def add_team_member(team_id, user_id):
     """Add user to team (admin only)"""
     try:
@@ -165,6 +182,7 @@ def add_team_member(team_id, user_id):
         
         user.team_id = team_id
         db.session.commit()
+        invalidate_user(user_id)
         
         return jsonify({
             'message': 'User added to team successfully',
@@ -176,7 +194,9 @@ def add_team_member(team_id, user_id):
         return jsonify({'message': 'Error adding user to team', 'error': str(e)}), 500
 
 @team_bp.route('/<int:team_id>/members/<int:user_id>', methods=['DELETE'])
+@query_budget(8)
 @admin_required
+@bumps_data_version
 def remove_team_member(team_id, user_id):
     """Remove user from team (admin only)"""
     try:
@@ -194,6 +214,7 @@ def remove_team_member(team_id, user_id):
         
         user.team_id = None
         db.session.commit()
+        invalidate_user(user_id)
         
         return jsonify({
             'message': 'User removed from team successfully',
@@ -202,4 +223,62 @@ def remove_team_member(team_id, user_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'message': 'Error removing user from team', 'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'message': 'Error removing user from team', 'error': str(e)}), 500 
+
+@team_bp.route('/memberships', methods=['POST'])
+@query_budget(7)
+@admin_required
+@bumps_data_version
+def move_team_members():
+    """Move a list of users into a team, or clear their team with team_id null (admin only)"""
+    data = request.get_json(silent=True)
+    try:
+        user_ids = requested_ids(data, current_app.config.get('BULK_MAX_IDS', 1000))
+    except BulkInputError as e:
+        return jsonify({'message': str(e)}), 400
+    if 'team_id' not in data:
+        return jsonify({'message': 'team_id is required (null clears the team)'}), 400
+    team_id = data['team_id']
+    if team_id is not None and (not isinstance(team_id, int) or isinstance(team_id, bool)):
+        return jsonify({'message': 'team_id must be an integer or null'}), 400
+    
+    try:
+        if team_id is not None and db.session.get(Team, team_id) is None:
+            return jsonify({'message': 'Team not found'}), 404
+        
+        current_teams = dict(db.session.execute(
+            db.select(User.id, User.team_id).where(User.id.in_(user_ids))
+        ).all())
+        moving = {user_id: old_team for user_id, old_team in current_teams.items() if old_team != team_id}
+        
+        if moving:
+            # Core UPDATE skips the flush hook, so rollups are moved explicitly
+            connection = db.session.connection()
+            record_team_moves(connection, moving, team_id)
+            connection.execute(
+                User.__table__.update().where(User.__table__.c.id.in_(list(moving)))
+                .values(team_id=team_id, updated_at=datetime.utcnow())
+            )
+        db.session.commit()
+        for user_id in moving:
+            invalidate_user(user_id)
+        
+        results = []
+        for user_id in user_ids:
+            if user_id not in current_teams:
+                results.append({'user_id': user_id, 'status': 'not_found'})
+            elif user_id in moving:
+                results.append({'user_id': user_id, 'status': 'moved', 'previous_team_id': moving[user_id]})
+            else:
+                results.append({'user_id': user_id, 'status': 'unchanged'})
+        
+        return jsonify({
+            'message': f'{len(moving)} user(s) moved',
+            'team_id': team_id,
+            'moved': len(moving),
+            'results': results
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error moving team members', 'error': str(e)}), 500
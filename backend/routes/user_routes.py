@@ -1,16 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from models.user import User, db
 from auth.decorators import admin_required, same_user_or_admin_required
+from services.pagination import paginate_query, InvalidCursor
+from auth.current_user import get_current_user, invalidate_user
+from auth.revocation import revoke_user_tokens
+from services.query_budget import query_budget
+from services.cache import bumps_data_version
+from services.bulk import read_bulk_rows, BulkInputError
+from services.user_import import import_users
 
 user_bp = Blueprint('users', __name__, url_prefix='/api/users')
 
 @user_bp.route('/', methods=['GET'])
+@query_budget(3)
 @admin_required
 def get_users():
     """Get all users (admin only)"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         team_id = request.args.get('team_id', type=int)
         role = request.args.get('role')
         is_active = request.args.get('is_active')
@@ -25,28 +31,43 @@ def get_users():
             is_active_bool = is_active.lower() == 'true'
             query = query.filter_by(is_active=is_active_bool)
         
-        users = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        users, pagination = paginate_query(query, request.args, key_columns=(User.id,))
         
         return jsonify({
-            'users': [user.to_dict() for user in users.items],
-            'pagination': {
-                'page': users.page,
-                'pages': users.pages,
-                'per_page': users.per_page,
-                'total': users.total,
-                'has_next': users.has_next,
-                'has_prev': users.has_prev
-            }
+            'users': [user.to_dict() for user in users],
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': 'Error fetching users', 'error': str(e)}), 500
 
+@user_bp.route('/import', methods=['POST'])
+@query_budget(3)
+@admin_required
+@bumps_data_version
+def import_users_bulk():
+    """Create many users from CSV or JSON (admin only)
+    
+    Columns: email, password, first_name, last_name, optional role, and team (name)
+    or team_id. Existing emails are skipped; invalid rows are reported, not fatal.
+    """
+    try:
+        rows = read_bulk_rows(request, 'users', current_app.config.get('BULK_IMPORT_MAX_ROWS', 10000))
+    except BulkInputError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    try:
+        result = import_users(rows)
+        return jsonify(result), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error importing users', 'error': str(e)}), 500
+
 @user_bp.route('/<int:user_id>', methods=['GET'])
+@query_budget(2)
 @same_user_or_admin_required
 def get_user(user_id):
     """Get specific user"""
@@ -62,7 +83,9 @@ def get_user(user_id):
         return jsonify({'message': 'Error fetching user', 'error': str(e)}), 500
 
 @user_bp.route('/<int:user_id>', methods=['PUT'])
+@query_budget(5)
 @admin_required
+@bumps_data_version
 def update_user(user_id):
     """Update user (admin only)"""
     try:
@@ -72,6 +95,7 @@ def update_user(user_id):
             return jsonify({'message': 'User not found'}), 404
         
         data = request.get_json()
+        previous_role, was_active = user.role, user.is_active
         
         # Update allowed fields
         if 'first_name' in data:
@@ -85,7 +109,13 @@ def update_user(user_id):
         if 'is_active' in data:
             user.is_active = data['is_active']
         
+        # Existing tokens carry the old role and must not outlive a deactivation;
+        # forms that resend the unchanged role must not log the user out
+        if user.role != previous_role or (was_active and not user.is_active):
+            revoke_user_tokens(user_id)
+        
         db.session.commit()
+        invalidate_user(user_id)
         
         return jsonify({
             'message': 'User updated successfully',
@@ -97,7 +127,9 @@ def update_user(user_id):
         return jsonify({'message': 'Error updating user', 'error': str(e)}), 500
 
 @user_bp.route('/<int:user_id>', methods=['DELETE'])
+@query_budget(6)
 @admin_required
+@bumps_data_version
 def delete_user(user_id):
     """Delete user (admin only)"""
     try:
@@ -108,7 +140,9 @@ def delete_user(user_id):
         
         # Soft delete - just deactivate
         user.is_active = False
+        revoke_user_tokens(user_id)
         db.session.commit()
+        invalidate_user(user_id)
         
         return jsonify({'message': 'User deactivated successfully'}), 200
         
@@ -117,7 +151,9 @@ def delete_user(user_id):
         return jsonify({'message': 'Error deactivating user', 'error': str(e)}), 500
 
 @user_bp.route('/<int:user_id>/reactivate', methods=['PUT'])
+@query_budget(5)
 @admin_required
+@bumps_data_version
 def reactivate_user(user_id):
     """Reactivate user (admin only)"""
     try:
@@ -128,6 +164,7 @@ def reactivate_user(user_id):
         
         user.is_active = True
         db.session.commit()
+        invalidate_user(user_id)
         
         return jsonify({
             'message': 'User reactivated successfully',
@@ -139,14 +176,14 @@ def reactivate_user(user_id):
         return jsonify({'message': 'Error reactivating user', 'error': str(e)}), 500
 
 @user_bp.route('/profile', methods=['GET'])
+@query_budget(1)
 def get_profile():
     """Get current user's profile"""
-    from flask_jwt_extended import jwt_required, get_jwt_identity
+    from flask_jwt_extended import verify_jwt_in_request
     
     try:
-        jwt_required()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        verify_jwt_in_request()
+        user = get_current_user()
         
         if not user:
             return jsonify({'message': 'User not found'}), 404
@@ -157,14 +194,15 @@ def get_profile():
         return jsonify({'message': 'Authentication required'}), 401
 
 @user_bp.route('/profile', methods=['PUT'])
+@query_budget(3)
+@bumps_data_version
 def update_profile():
     """Update current user's profile"""
-    from flask_jwt_extended import jwt_required, get_jwt_identity
+    from flask_jwt_extended import verify_jwt_in_request
     
     try:
-        jwt_required()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        verify_jwt_in_request()
+        user = get_current_user()
         
         if not user:
             return jsonify({'message': 'User not found'}), 404
@@ -178,6 +216,7 @@ def update_profile():
             user.last_name = data['last_name']
         
         db.session.commit()
+        invalidate_user(user.id)
         
         return jsonify({
             'message': 'Profile updated successfully',
@@ -0,0 +1,101 @@
+"""Shared input handling for bulk endpoints
+
+Bulk endpoints accept either JSON (a list of objects, or an object with the list
+under a named key) or CSV with a header row, sent as the request body with a
+``text/csv`` content type or as an uploaded ``file`` in a multipart form.
+"""
+import io
+import csv
+import time
+
+
+class BulkInputError(ValueError):
+    """Raised when a bulk request body cannot be read"""
+
+
+def read_bulk_rows(req, key, max_rows):
+    """Return the request's rows as a list of dicts with whitespace-trimmed string values"""
+    upload = req.files.get('file')
+    if upload is not None:
+        text = upload.read().decode('utf-8-sig')
+        if upload.filename and upload.filename.lower().endswith('.json'):
+            rows = _json_rows(text, key)
+        else:
+            rows = _csv_rows(text)
+    elif req.mimetype == 'text/csv':
+        rows = _csv_rows(req.get_data(as_text=True))
+    else:
+        data = req.get_json(silent=True)
+        if data is None:
+            raise BulkInputError('Send JSON, a text/csv body or a CSV/JSON file upload')
+        rows = _list_from_json(data, key)
+
+    if not rows:
+        raise BulkInputError('No rows to import')
+    if len(rows) > max_rows:
+        raise BulkInputError(f'Too many rows: {len(rows)} (maximum {max_rows})')
+    return rows
+
+
+def _json_rows(text, key):
+    import json
+    try:
+        return _list_from_json(json.loads(text), key)
+    except json.JSONDecodeError as e:
+        raise BulkInputError(f'Invalid JSON: {e}')
+
+
+def _list_from_json(data, key):
+    if isinstance(data, dict):
+        data = data.get(key)
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise BulkInputError(f'Expected a list of objects or {{"{key}": [...]}}')
+    return [_clean(row) for row in data]
+
+
+def _csv_rows(text):
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise BulkInputError('CSV input needs a header row')
+    return [_clean(row) for row in reader]
+
+
+def _clean(row):
+    return {
+        str(name).strip(): value.strip() if isinstance(value, str) else value
+        for name, value in row.items() if name is not None
+    }
+
+
+def requested_ids(data, max_ids, key='user_ids'):
+    """Unique integer ids from ``data[key]`` in request order; raises BulkInputError"""
+    ids = (data or {}).get(key) if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not ids:
+        raise BulkInputError(f'{key} must be a non-empty list')
+    if len(ids) > max_ids:
+        raise BulkInputError(f'Too many ids in {key}: {len(ids)} (maximum {max_ids})')
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in ids):
+        raise BulkInputError(f'{key} must contain integers only')
+    return list(dict.fromkeys(ids))
+
+
+class BulkTimer:
+    """Wall-clock time per phase of a bulk operation"""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._mark = self._started
+        self.phases = {}
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.phases[f'{phase}_ms'] = round((now - self._mark) * 1000, 1)
+        self._mark = now
+
+    def stats(self, rows):
+        total = time.perf_counter() - self._started
+        return {
+            **self.phases,
+            'total_ms': round(total * 1000, 1),
+            'rows_per_second': round(rows / total, 1) if total > 0 else None
+        }
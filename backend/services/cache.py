@@ -0,0 +1,281 @@
+"""Versioned response cache for read-heavy endpoints
+
+Cache keys carry a data-version counter that write routes bump, so entries
+cached before a write are never served after it; they simply stop being
+looked up and age out through LRU eviction or their TTL.
+
+Two backends are available, chosen with ``CACHE_BACKEND``:
+
+- ``memory``: per-process LRU with TTL, for single-worker deployments. Under
+  gunicorn with more than one worker it is switched off (``check_cache_workers``),
+  since a write in one worker would not invalidate the other workers' entries
+- ``shared``: any Redis-compatible client (``get``/``set``/``incr``), so all
+  workers share entries and the data version. A Redis client is created from
+  ``CACHE_REDIS_URL`` unless one is passed to ``init_cache``.
+
+With a read replica, a response computed on the replica right after a write may
+predate it. Users still inside their ``REPLICA_STICKY_SECONDS`` window after a
+write bypass the cache, and replica responses are not stored until that long after
+the last bump, so neither the writer nor later readers get a lagging answer from
+the cache.
+"""
+import json
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, request, make_response
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+
+from services.replica import reads_from_replica, sticks_to_primary
+
+DATA_VERSION_KEY = 'data_version'
+# Present for settle_seconds after each bump
+RECENT_BUMP_KEY = 'data_version_recent'
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry TTL"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def size(self):
+        return len(self._entries)
+
+
+class SharedCacheBackend:
+    """Cache stored in a Redis-compatible client shared by all workers"""
+
+    name = 'shared'
+
+    def __init__(self, client, prefix='teampulse:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def incr(self, key):
+        return int(self.client.incr(self.prefix + key))
+
+    def get_counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def size(self):
+        return None
+
+
+class ResponseCache:
+    """Response cache keyed on endpoint, query args, role and data version"""
+
+    def __init__(self, backend, default_ttl=60, settle_seconds=0):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.settle_seconds = settle_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def data_version(self):
+        return self.backend.get_counter(DATA_VERSION_KEY)
+
+    def bump(self):
+        """Invalidate every cached response by moving to a new data version"""
+        version = self.backend.incr(DATA_VERSION_KEY)
+        if self.settle_seconds:
+            self.backend.set(RECENT_BUMP_KEY, version, self.settle_seconds)
+        return version
+
+    def recently_bumped(self):
+        """True within settle_seconds of the last bump (by any worker on a shared backend)"""
+        return bool(self.settle_seconds) and self.backend.get(RECENT_BUMP_KEY) is not None
+
+    def make_key(self, endpoint, args, role):
+        query = urlencode(sorted(args.items(multi=True)))
+        return f'response:v{self.data_version()}:{endpoint}:{role}:{query}'
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, ttl or self.default_ttl)
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'backend': self.backend.name,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0,
+            'entries': self.backend.size(),
+            'data_version': self.data_version()
+        }
+
+
+def shared_cache_client(app):
+    """Redis client for ``CACHE_REDIS_URL``, created once per app"""
+    client = app.extensions.get('cache_client')
+    if client is None:
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('CACHE_BACKEND=shared requires the redis package or an explicit client')
+        client = app.extensions['cache_client'] = redis.Redis.from_url(app.config['CACHE_REDIS_URL'])
+    return client
+
+
+def create_cache_backend(app, client=None, max_entries=None):
+    """Backend chosen by ``CACHE_BACKEND``; also holds the read replica's recent writers"""
+    backend_name = app.config.get('CACHE_BACKEND', 'memory')
+
+    if backend_name == 'shared':
+        return SharedCacheBackend(
+            client if client is not None else shared_cache_client(app),
+            prefix=app.config.get('CACHE_KEY_PREFIX', 'teampulse:')
+        )
+    if backend_name == 'memory':
+        return MemoryCacheBackend(max_entries=max_entries or app.config.get('CACHE_MAX_ENTRIES', 512))
+    raise RuntimeError(f'Unknown CACHE_BACKEND: {backend_name}')
+
+
+def init_cache(app, client=None):
+    """Create the app's response cache from config
+
+    ``client`` overrides the Redis-compatible client used by the shared
+    backend, e.g. a local stand-in.
+    """
+    backend = create_cache_backend(app, client)
+
+    # With a replica, replica answers may lag a write by up to the sticky window
+    settle_seconds = app.config.get('REPLICA_STICKY_SECONDS', 5) if app.extensions.get('read_replica') else 0
+    cache = ResponseCache(backend, default_ttl=app.config.get('CACHE_DEFAULT_TTL', 60), settle_seconds=settle_seconds)
+    app.extensions['response_cache'] = cache
+    return cache
+
+
+def check_cache_workers(app, workers):
+    """Switch off a per-process cache when several worker processes serve the app
+
+    The memory backend keeps the data version per process, so a write handled by one
+    worker would leave stale entries in the others for up to their TTL. Returns True
+    if the cache was switched off.
+    """
+    cache = app.extensions.get('response_cache')
+    if cache is None or cache.backend.name != 'memory' or workers <= 1:
+        return False
+    app.extensions['response_cache'] = None
+    app.logger.warning(
+        'Response cache disabled: CACHE_BACKEND=memory cannot be invalidated across %d workers; '
+        'set CACHE_BACKEND=shared to cache analytics', workers
+    )
+    return True
+
+
+def get_response_cache():
+    """Response cache of the current app, or None when caching is disabled"""
+    return current_app.extensions.get('response_cache')
+
+
+def _current_role():
+    verify_jwt_in_request(optional=True)
+    return get_jwt().get('role', 'anonymous')
+
+
+def cached_response(ttl=None):
+    """Decorator caching successful GET responses of a view
+
+    Apply it below the auth decorators so cached responses are still access-checked.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = get_response_cache()
+            if cache is None or request.method != 'GET':
+                return fn(*args, **kwargs)
+
+            role = _current_role()
+            # A cached entry may come from the replica, from before this user's write
+            if sticks_to_primary():
+                return fn(*args, **kwargs)
+
+            key = cache.make_key(request.endpoint, request.args, role)
+            cached = cache.get(key)
+            if cached is not None:
+                response = current_app.response_class(
+                    cached['body'], status=cached['status'], mimetype=cached['mimetype']
+                )
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200 and not (reads_from_replica() and cache.recently_bumped()):
+                cache.set(key, {
+                    'body': response.get_data(as_text=True),
+                    'status': response.status_code,
+                    'mimetype': response.mimetype
+                }, ttl)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def bumps_data_version(fn):
+    """Decorator for write routes: bump the data version after a successful write"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        response = make_response(fn(*args, **kwargs))
+        if response.status_code < 400:
+            cache = get_response_cache()
+            if cache is not None:
+                cache.bump()
+        return response
+    return wrapper
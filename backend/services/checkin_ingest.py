@@ -0,0 +1,278 @@
+"""Bulk check-in ingestion
+
+Rows are validated column by column up front, users (by id or email) and projects
+are resolved with one set lookup each, and the accepted rows are written chunk by
+chunk: one query for the chunk's existing (user_id, check_in_date) rows, one
+executemany insert for the new ones, one executemany update when upserting, and a
+single rollup upsert, all in the chunk's own transaction. An upsert only changes the
+optional fields a row includes (an empty CSV cell or JSON null clears the field).
+
+If a chunk fails, the chunks before it stay committed; ``IngestInterrupted`` reports
+the totals written so far and the first row that was not written.
+"""
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import select, or_, tuple_, bindparam
+
+from models.user import db, User
+from models.project import Project
+from models.checkin import CheckIn
+from services.bulk import BulkTimer
+from services.rollups import RollupDeltas
+
+CONFLICT_MODES = ('skip', 'update')
+RATINGS = {1, 2, 3, 4, 5}
+RATING_FIELDS = (('mood_rating', True), ('work_load_rating', False), ('stress_level', False))
+VALUE_FIELDS = ('project_id', 'mood_rating', 'work_load_rating', 'stress_level', 'comment')
+
+checkins = CheckIn.__table__
+
+
+class IngestInterrupted(Exception):
+    """Raised when a chunk fails after earlier chunks were committed
+
+    ``progress`` has the totals of the committed chunks and ``resume_from_row``,
+    the first row number that was not written.
+    """
+
+    def __init__(self, error, progress):
+        super().__init__(str(error))
+        self.progress = progress
+
+
+def _to_int(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(value)
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(str(value).strip())
+
+
+def _to_date(value):
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip())
+
+
+def _validate_columns(rows, errors):
+    """Convert and range-check each column in one pass over it; return the valid rows"""
+    count = len(rows)
+    failed = {}
+
+    def fail(index, message):
+        failed.setdefault(index, message)
+
+    parsed = [{} for _ in range(count)]
+
+    for field, required in RATING_FIELDS:
+        for index, row in enumerate(rows):
+            try:
+                value = _to_int(row.get(field))
+            except ValueError:
+                fail(index, f'{field} must be an integer')
+                continue
+            if value is None:
+                if required:
+                    fail(index, f'{field} is required')
+            elif value not in RATINGS:
+                fail(index, f'{field} must be between 1 and 5')
+            parsed[index][field] = value
+
+    today = date.today()
+    for index, row in enumerate(rows):
+        try:
+            check_in_date = _to_date(row.get('check_in_date') or row.get('date'))
+        except (TypeError, ValueError):
+            fail(index, 'check_in_date must be an ISO date (YYYY-MM-DD)')
+            continue
+        if check_in_date > today:
+            fail(index, 'check_in_date cannot be in the future')
+        parsed[index]['check_in_date'] = check_in_date
+
+    for column in ('user_id', 'project_id'):
+        for index, row in enumerate(rows):
+            try:
+                parsed[index][column] = _to_int(row.get(column))
+            except ValueError:
+                fail(index, f'{column} must be an integer')
+
+    for index, row in enumerate(rows):
+        email = row.get('email')
+        parsed[index]['email'] = str(email).lower() if email else None
+        parsed[index]['comment'] = row.get('comment') or None
+        # Fields an upsert may change; mood_rating is required so always present
+        parsed[index]['provided'] = tuple(field for field in VALUE_FIELDS if field in row)
+        if parsed[index].get('user_id') is None and not email:
+            fail(index, 'user_id or email is required')
+
+    for index, message in failed.items():
+        errors.append(_row_error(index + 1, rows[index], message))
+    return [(index + 1, parsed[index]) for index in range(count) if index not in failed]
+
+
+def _row_error(number, row, message):
+    return {'row': number, 'user': row.get('user_id') or row.get('email'), 'error': message}
+
+
+def ingest_checkins(rows, on_conflict='skip'):
+    """Write check-in rows; existing (user, date) check-ins are skipped or updated"""
+    if on_conflict not in CONFLICT_MODES:
+        raise ValueError(f'on_conflict must be one of {", ".join(CONFLICT_MODES)}')
+
+    timer = BulkTimer()
+    errors = []
+    valid = _validate_columns(rows, errors)
+    timer.lap('validate')
+
+    # Set lookups: every referenced user and project in one query each
+    user_ids = {values['user_id'] for _, values in valid if values['user_id'] is not None}
+    emails = {values['email'] for _, values in valid if values['user_id'] is None}
+    users_by_id, users_by_email = {}, {}
+    if user_ids or emails:
+        for user_id, email, team_id in db.session.execute(
+            select(User.id, User.email, User.team_id).where(or_(User.id.in_(user_ids), User.email.in_(emails)))
+        ):
+            users_by_id[user_id] = team_id
+            users_by_email[email] = user_id
+    project_ids = {values['project_id'] for _, values in valid if values['project_id'] is not None}
+    known_projects = set(db.session.scalars(select(Project.id).where(Project.id.in_(project_ids)))) if project_ids else set()
+
+    accepted, numbers, provided = [], [], []
+    seen = set()
+    for number, values in valid:
+        user_id = values['user_id'] if values['user_id'] is not None else users_by_email.get(values['email'])
+        if user_id not in users_by_id:
+            errors.append(_row_error(number, rows[number - 1], 'Unknown user'))
+            continue
+        if values['project_id'] is not None and values['project_id'] not in known_projects:
+            errors.append(_row_error(number, rows[number - 1], f"Unknown project_id: {values['project_id']}"))
+            continue
+        key = (user_id, values['check_in_date'])
+        if key in seen:
+            errors.append(_row_error(number, rows[number - 1], 'Duplicate user and date in batch'))
+            continue
+        seen.add(key)
+        accepted.append({
+            'user_id': user_id,
+            'check_in_date': values['check_in_date'],
+            **{field: values[field] for field in VALUE_FIELDS}
+        })
+        numbers.append(number)
+        provided.append(values['provided'])
+    timer.lap('lookup')
+
+    chunk_size = current_app.config.get('CHECKIN_INGEST_CHUNK_SIZE', 1000)
+    totals = {'inserted': 0, 'updated': 0, 'skipped': 0}
+    for start in range(0, len(accepted), chunk_size):
+        end = start + chunk_size
+        try:
+            chunk_totals = _write_chunk(accepted[start:end], provided[start:end], users_by_id, on_conflict)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            errors.sort(key=lambda error: error['row'])
+            raise IngestInterrupted(e, {
+                'received': len(rows),
+                **totals,
+                'failed': len(errors),
+                'errors': errors,
+                'resume_from_row': numbers[start]
+            })
+        for name, value in chunk_totals.items():
+            totals[name] += value
+    timer.lap('write')
+
+    errors.sort(key=lambda error: error['row'])
+    return {
+        'received': len(rows),
+        **totals,
+        'failed': len(errors),
+        'errors': errors,
+        'stats': timer.stats(len(rows))
+    }
+
+
+def _write_chunk(chunk, provided, user_teams, on_conflict):
+    """Write one chunk and its rollup deltas on the session's connection
+
+    ``provided`` lists, per row, the value fields an update may change.
+    """
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+
+    existing_query = select(
+        checkins.c.user_id, checkins.c.check_in_date, *(checkins.c[field] for field in VALUE_FIELDS)
+    ).where(tuple_(checkins.c.user_id, checkins.c.check_in_date).in_(
+        [(row['user_id'], row['check_in_date']) for row in chunk]
+    ))
+    if on_conflict == 'update':
+        existing_query = existing_query.with_for_update()
+    existing = {(row.user_id, row.check_in_date): row for row in connection.execute(existing_query)}
+
+    new_rows = [row for row in chunk if (row['user_id'], row['check_in_date']) not in existing]
+    deltas = RollupDeltas()
+    totals = {'inserted': 0, 'updated': 0, 'skipped': 0}
+
+    def add_to_rollup(row, sign=1):
+        deltas.add_checkin(
+            row['check_in_date'], user_teams.get(row['user_id']), row['project_id'],
+            row['mood_rating'], row['work_load_rating'], row['stress_level'], sign
+        )
+
+    if new_rows:
+        now = datetime.utcnow()
+        values = [{**row, 'created_at': now, 'updated_at': now} for row in new_rows]
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            # Rows created concurrently since the lookup are skipped, not failed
+            stmt = insert(checkins).on_conflict_do_nothing(
+                index_elements=['user_id', 'check_in_date']
+            ).returning(checkins.c.user_id, checkins.c.check_in_date)
+            inserted = set(map(tuple, connection.execute(stmt, values)))
+        else:
+            connection.execute(checkins.insert(), values)
+            inserted = {(row['user_id'], row['check_in_date']) for row in new_rows}
+        for row in new_rows:
+            if (row['user_id'], row['check_in_date']) in inserted:
+                add_to_rollup(row)
+        totals['inserted'] = len(inserted)
+        totals['skipped'] += len(new_rows) - len(inserted)
+
+    if on_conflict == 'skip':
+        totals['skipped'] += len(existing)
+    elif existing:
+        # One executemany per distinct set of provided fields (usually just one)
+        updates = {}
+        for row, fields in zip(chunk, provided):
+            if (row['user_id'], row['check_in_date']) in existing:
+                updates.setdefault(fields, []).append(row)
+        now = datetime.utcnow()
+        for fields, rows in updates.items():
+            connection.execute(
+                checkins.update().where(
+                    checkins.c.user_id == bindparam('match_user_id'),
+                    checkins.c.check_in_date == bindparam('match_check_in_date')
+                ).values(**{field: bindparam(field) for field in fields}, updated_at=now),
+                [{
+                    'match_user_id': row['user_id'],
+                    'match_check_in_date': row['check_in_date'],
+                    **{field: row[field] for field in fields}
+                } for row in rows]
+            )
+            for row in rows:
+                old = existing[(row['user_id'], row['check_in_date'])]
+                old_values = {'user_id': old.user_id, 'check_in_date': old.check_in_date,
+                              **{field: getattr(old, field) for field in VALUE_FIELDS}}
+                add_to_rollup(old_values, sign=-1)
+                add_to_rollup({**old_values, **{field: row[field] for field in fields}})
+            totals['updated'] += len(rows)
+
+    if deltas:
+        deltas.apply(connection)
+    return totals
@@ -0,0 +1,138 @@
+"""Connection pool settings, statement timeouts and pool statistics
+
+``configure_engine_options`` turns the ``DB_*`` settings into
+``SQLALCHEMY_ENGINE_OPTIONS`` before the engine is created: pool size and overflow
+per worker process, how long a request may wait for a connection, recycling, and a
+pre-ping so connections the server dropped while idle are replaced instead of
+failing the next request. On PostgreSQL every connection also gets
+``DB_STATEMENT_TIMEOUT_MS``; routes that legitimately run longer (analytics) raise it
+for their own transactions with ``use_statement_timeout``.
+
+The pool is a ``QueuePool`` that also records how long checkouts waited, which
+``pool_stats`` reports together with the live checkout and overflow counts.
+"""
+import time
+import threading
+import statistics
+from collections import deque
+
+from flask import g, has_request_context
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from models.user import db
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait times and timeouts"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._wait_ms = deque(maxlen=1024)
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        with self._stats_lock:
+            self.checkouts += 1
+            self._wait_ms.append((time.perf_counter() - started) * 1000)
+        return connection
+
+    def wait_stats(self):
+        with self._stats_lock:
+            samples = sorted(self._wait_ms)
+            checkouts, timeouts = self.checkouts, self.timeouts
+        if samples:
+            wait_ms = {
+                'p50': round(statistics.median(samples), 2),
+                'p95': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+                'max': round(samples[-1], 2)
+            }
+        else:
+            wait_ms = {'p50': None, 'p95': None, 'max': None}
+        return {'checkouts': checkouts, 'timeouts': timeouts, 'wait_ms': wait_ms}
+
+
+def _is_sqlite_memory(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def configure_engine_options(app):
+    """Fill SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings (explicit options win)"""
+    config = app.config
+    if not config.get('SQLALCHEMY_DATABASE_URI'):
+        # Leave Flask-SQLAlchemy to report the missing database URL
+        return
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = {'pool_pre_ping': config.get('DB_POOL_PRE_PING', True)}
+
+    # In-memory SQLite is a single shared connection, there is no pool to size
+    if not _is_sqlite_memory(url):
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=config.get('DB_POOL_SIZE', 5),
+            max_overflow=config.get('DB_MAX_OVERFLOW', 10),
+            pool_timeout=config.get('DB_POOL_TIMEOUT', 10),
+            pool_recycle=config.get('DB_POOL_RECYCLE', 1800)
+        )
+
+    timeout_ms = config.get('DB_STATEMENT_TIMEOUT_MS', 0)
+    if timeout_ms and url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f'-c statement_timeout={int(timeout_ms)}'}
+
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = {**options, **config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+
+
+def init_database(app):
+    """Apply per-request statement timeouts when the session begins a transaction"""
+    if not event.contains(db.session, 'after_begin', _after_begin):
+        event.listen(db.session, 'after_begin', _after_begin)
+
+
+def use_statement_timeout(milliseconds):
+    """Give the current request's transactions a different statement timeout (PostgreSQL)"""
+    g.statement_timeout_ms = int(milliseconds)
+    # The user lookup may already have begun this request's transaction
+    if db.session().in_transaction():
+        _set_local_timeout(db.session.connection(), g.statement_timeout_ms)
+
+
+def _after_begin(session, transaction, connection):
+    if has_request_context() and g.get('statement_timeout_ms') is not None:
+        _set_local_timeout(connection, g.statement_timeout_ms)
+
+
+def _set_local_timeout(connection, timeout_ms):
+    if connection.dialect.name == 'postgresql':
+        # SET LOCAL ends with the transaction, so the pooled connection keeps its default
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {timeout_ms}')
+
+
+def pool_stats():
+    """Live pool usage and checkout waits for each of the current app's engines"""
+    engines = {}
+    for bind_key, engine in db.engines.items():
+        pool = engine.pool
+        stats = {'pool': type(pool).__name__, 'status': pool.status()}
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+                timeout_seconds=pool.timeout()
+            )
+        if isinstance(pool, TimedQueuePool):
+            stats.update(pool.wait_stats())
+        engines[bind_key or 'default'] = stats
+    return engines
@@ -0,0 +1,65 @@
+"""Process pool for hashing many passwords at once (bulk user import)
+
+Each worker process keeps one pool, created on first use and reused by later
+imports. Its processes are started by a forkserver (or spawned where there is none)
+rather than forked from the worker, whose other request threads may hold locks at
+the moment of the fork. This module imports only bcrypt, so starting a pool
+process does not load the app.
+"""
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+_pool = None
+_pool_key = None
+_lock = threading.Lock()
+
+
+def hash_password(args):
+    # Top-level so the process pool can pickle it
+    password, rounds = args
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _start_method():
+    return 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def _get_pool(processes):
+    """This process's pool, replacing one inherited through fork or of another size"""
+    global _pool, _pool_key
+    key = (os.getpid(), processes)
+    with _lock:
+        if _pool_key != key:
+            if _pool is not None and _pool_key[0] == key[0]:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context(_start_method())
+            )
+            _pool_key = key
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool, _pool_key
+    with _lock:
+        if _pool is pool:
+            _pool, _pool_key = None, None
+
+
+def hash_passwords(passwords, rounds, processes):
+    """Hash passwords in order, spread over a pool of ``processes`` processes"""
+    jobs = [(password, rounds) for password in passwords]
+    if processes <= 1 or len(jobs) < 2:
+        return [hash_password(job) for job in jobs]
+    pool = _get_pool(processes)
+    try:
+        return list(pool.map(hash_password, jobs, chunksize=max(1, len(jobs) // (processes * 4))))
+    except BrokenProcessPool:
+        # A pool process died; start a new pool on the next import
+        _discard_pool(pool)
+        raise
@@ -0,0 +1,237 @@
+"""Per-request metrics: latency, SQL statements and time, response size and status
+
+``init_metrics`` times every request and, through cursor events on the app's
+engines, counts the SQL statements it ran and how long they took. Per endpoint
+(the Flask view name) it keeps a latency histogram, a statements-per-request
+histogram, SQL time, a response-size histogram and a request count by status.
+``render_prometheus`` writes them in the Prometheus text format for ``/metrics``,
+and responses carry a ``Server-Timing`` header with the request's own numbers.
+A streamed response (e.g. the check-in export) runs its queries while the body is
+sent, after the headers, so it is recorded when the response closes. Its body bytes
+are counted as they are sent, and its ``Server-Timing`` covers only the work done
+before streaming.
+
+The cost per request is a few clock reads, one dict lookup per SQL statement and
+one short locked update, so it is meant to stay on in production. Metrics are kept
+per worker process; each scrape of ``/metrics`` reports the worker that answered.
+"""
+import os
+import time
+import bisect
+import threading
+
+from flask import request, current_app, has_request_context
+from sqlalchemy import event
+
+from models.user import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Kept in the WSGI environ so batch sub-requests, which share the app context,
+# each get their own numbers
+_ENVIRON_KEY = 'teampulse.request_metrics'
+
+
+class _Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {_number(self.sum)}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class _EndpointMetrics:
+    __slots__ = ('latency', 'statements', 'sql_seconds', 'response_size', 'status')
+
+    def __init__(self):
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.statements = _Histogram(STATEMENT_BUCKETS)
+        self.sql_seconds = 0.0
+        self.response_size = _Histogram(SIZE_BUCKETS)
+        self.status = {}
+
+
+class RequestStats:
+    """Numbers for the request in progress"""
+
+    __slots__ = ('started', 'statements', 'sql_seconds', 'response_bytes', '_cursor_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.response_bytes = 0
+        self._cursor_started = []
+
+
+class MetricsRegistry:
+    """Per-process metrics keyed by (endpoint, method)"""
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, method, status, seconds, statements, sql_seconds, size):
+        with self._lock:
+            metrics = self._endpoints.get((endpoint, method))
+            if metrics is None:
+                metrics = self._endpoints[(endpoint, method)] = _EndpointMetrics()
+            metrics.latency.observe(seconds)
+            metrics.statements.observe(statements)
+            metrics.sql_seconds += sql_seconds
+            metrics.response_size.observe(size)
+            metrics.status[status] = metrics.status.get(status, 0) + 1
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        pid = os.getpid()
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            families = {
+                'requests': [], 'latency': [], 'statements': [], 'sql_seconds': [], 'size': []
+            }
+            for (endpoint, method), metrics in items:
+                labels = f'endpoint="{endpoint}",method="{method}",pid="{pid}"'
+                for status, count in sorted(metrics.status.items()):
+                    families['requests'].append(f'teampulse_http_requests_total{{{labels},status="{status}"}} {count}')
+                families['latency'].extend(metrics.latency.lines('teampulse_http_request_duration_seconds', labels))
+                families['statements'].extend(metrics.statements.lines('teampulse_http_request_sql_statements', labels))
+                families['sql_seconds'].append(
+                    f'teampulse_http_request_sql_seconds_total{{{labels}}} {_number(metrics.sql_seconds)}'
+                )
+                families['size'].extend(metrics.response_size.lines('teampulse_http_response_size_bytes', labels))
+
+        headers = {
+            'requests': ('teampulse_http_requests_total', 'counter', 'Requests by endpoint, method and status'),
+            'latency': ('teampulse_http_request_duration_seconds', 'histogram', 'Request latency'),
+            'statements': ('teampulse_http_request_sql_statements', 'histogram', 'SQL statements per request'),
+            'sql_seconds': ('teampulse_http_request_sql_seconds_total', 'counter', 'Time spent in SQL'),
+            'size': ('teampulse_http_response_size_bytes', 'histogram', 'Response body size')
+        }
+        lines = []
+        for key, (name, kind, description) in headers.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(families[key])
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    return f'{value:.6f}'.rstrip('0').rstrip('.') if isinstance(value, float) else str(value)
+
+
+def current_request_stats():
+    """Stats of the request in progress, or None outside a request or with metrics off"""
+    if not has_request_context():
+        return None
+    return request.environ.get(_ENVIRON_KEY)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request_stats()
+    if stats is not None:
+        stats._cursor_started.append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request_stats()
+    if stats is not None and stats._cursor_started:
+        stats.statements += 1
+        stats.sql_seconds += time.perf_counter() - stats._cursor_started.pop()
+
+
+def _count_body(body, stats):
+    """Pass a streamed body through, counting its bytes; closes the original body"""
+    try:
+        for chunk in body:
+            stats.response_bytes += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            yield chunk
+    finally:
+        close = getattr(body, 'close', None)
+        if close is not None:
+            close()
+
+
+def init_metrics(app):
+    """Instrument requests and the app's engines (call after ``db.init_app``)"""
+    if not app.config.get('METRICS_ENABLED', True):
+        app.extensions['metrics'] = None
+        return
+
+    registry = app.extensions['metrics'] = MetricsRegistry()
+    server_timing = app.config.get('METRICS_SERVER_TIMING', True)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_metrics():
+        request.environ[_ENVIRON_KEY] = RequestStats()
+
+    @app.after_request
+    def record_request_metrics(response):
+        environ = request.environ
+        stats = environ.get(_ENVIRON_KEY)
+        if stats is None:
+            return response
+
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method
+        seconds = time.perf_counter() - stats.started
+        if server_timing:
+            streaming = ' before streaming' if response.is_streamed else ''
+            response.headers.add(
+                'Server-Timing',
+                f'app;dur={seconds * 1000:.1f}, '
+                f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.statements} queries{streaming}"'
+            )
+
+        if response.is_streamed:
+            # The body's queries run after this hook, while it is sent
+            response.response = _count_body(response.response, stats)
+
+            def record_streamed():
+                environ.pop(_ENVIRON_KEY, None)
+                registry.record(
+                    endpoint, method, response.status_code, time.perf_counter() - stats.started,
+                    stats.statements, stats.sql_seconds, stats.response_bytes
+                )
+            response.call_on_close(record_streamed)
+            return response
+
+        environ.pop(_ENVIRON_KEY, None)
+        registry.record(
+            endpoint, method, response.status_code, seconds,
+            stats.statements, stats.sql_seconds, response.content_length or 0
+        )
+        return response
+
+
+def get_metrics():
+    """The current app's metrics registry, or None when disabled"""
+    return current_app.extensions.get('metrics')
@@ -0,0 +1,129 @@
+"""Offset and keyset (cursor) pagination for list endpoints
+
+Offset mode keeps the existing ``page``/``per_page`` behaviour. Passing a
+``cursor`` argument (empty for the first page) switches to keyset mode: rows
+are ordered by a unique key such as ``(check_in_date, id)`` and each page
+starts right after the ``next_cursor`` of the previous one, so deep pages cost
+the same as the first. ``include_total=false`` skips the COUNT(*) query; it
+is the default in cursor mode. ``per_page`` is clamped to 1..``PAGINATION_MAX_PER_PAGE``.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import Date, DateTime, Integer, String, tuple_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor argument cannot be decoded"""
+
+
+def encode_cursor(values):
+    """Encode key values as an opaque, URL-safe cursor"""
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, key_columns):
+    """Decode a cursor back into Python values typed like ``key_columns``"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(payload, list) or len(payload) != len(key_columns):
+            raise ValueError('cursor has the wrong number of values')
+        values = []
+        for column, value in zip(key_columns, payload):
+            if isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(_expect(value, str, column))
+            elif isinstance(column.type, Date):
+                value = date.fromisoformat(_expect(value, str, column))
+            elif isinstance(column.type, Integer):
+                if isinstance(value, bool):
+                    raise TypeError(f'{column.key} must be int')
+                _expect(value, int, column)
+            elif isinstance(column.type, String):
+                _expect(value, str, column)
+            values.append(value)
+        return values
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f'Invalid cursor: {e}')
+
+
+def _expect(value, kind, column):
+    if not isinstance(value, kind):
+        raise TypeError(f'{column.key} must be {kind.__name__}')
+    return value
+
+
+def _wants_total(args, default):
+    value = args.get('include_total')
+    if value is None:
+        return default
+    return value.lower() != 'false'
+
+
+def paginate_query(query, args, key_columns, descending=False):
+    """Paginate ``query`` according to request args
+
+    ``key_columns`` must uniquely order the rows (end with the primary key).
+    Returns ``(items, pagination)`` where ``pagination`` is the response dict.
+    """
+    per_page = args.get('per_page', 20, type=int)
+    per_page = min(max(per_page, 1), current_app.config.get('PAGINATION_MAX_PER_PAGE', 100))
+
+    if 'cursor' in args:
+        return _keyset_page(query, args, key_columns, descending, per_page)
+
+    page = args.get('page', 1, type=int)
+    if _wants_total(args, default=True):
+        result = query.paginate(page=page, per_page=per_page, error_out=False)
+        return result.items, {
+            'page': result.page,
+            'pages': result.pages,
+            'per_page': result.per_page,
+            'total': result.total,
+            'has_next': result.has_next,
+            'has_prev': result.has_prev
+        }
+
+    # Without a total, fetch one extra row to know whether another page exists
+    page = max(page, 1)
+    items = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    return items[:per_page], {
+        'page': page,
+        'pages': None,
+        'per_page': per_page,
+        'total': None,
+        'has_next': len(items) > per_page,
+        'has_prev': page > 1
+    }
+
+
+def _keyset_page(query, args, key_columns, descending, per_page):
+    cursor = args.get('cursor')
+    total = query.order_by(None).count() if _wants_total(args, default=False) else None
+
+    ordering = [column.desc() if descending else column.asc() for column in key_columns]
+    page_query = query.order_by(None).order_by(*ordering)
+
+    if cursor:
+        values = decode_cursor(cursor, key_columns)
+        key = tuple_(*key_columns)
+        page_query = page_query.filter(key < tuple_(*values) if descending else key > tuple_(*values))
+
+    items = page_query.limit(per_page + 1).all()
+    has_next = len(items) > per_page
+    items = items[:per_page]
+
+    next_cursor = None
+    if has_next:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in key_columns])
+
+    return items, {
+        'per_page': per_page,
+        'cursor': cursor or None,
+        'next_cursor': next_cursor,
+        'has_next': has_next,
+        'total': total
+    }
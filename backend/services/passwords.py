@@ -0,0 +1,171 @@
+"""Bounded worker pool for bcrypt hashing and verification
+
+bcrypt is deliberately slow, so a burst of logins run inline would occupy every
+request thread. Here each process runs at most ``BCRYPT_WORKERS`` bcrypt operations
+at once and admits at most ``BCRYPT_QUEUE_LIMIT`` more waiting behind them; anything
+beyond that fails fast with ``PasswordHasherBusy`` so routes can answer 503 instead
+of queueing. bcrypt releases the GIL, so the rest of the app keeps serving while
+hashes run. This only pays off when a process serves several requests at once, i.e.
+under gunicorn's threaded ``gthread`` worker (the default in ``gunicorn.conf.py``);
+a sync worker handles one request at a time and never fills the queue.
+
+``BCRYPT_LOG_ROUNDS`` sets the cost for new hashes; ``needs_rehash`` tells login
+when a stored hash was made with a different cost.
+"""
+import time
+import threading
+import statistics
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from flask import current_app, has_app_context
+
+from models.user import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full or a queued operation waited too long"""
+
+
+class _OperationStats:
+    """Counters and recent latency samples for one kind of operation"""
+
+    def __init__(self, samples=1024):
+        self.completed = 0
+        self.rejected = 0
+        self._wait_ms = deque(maxlen=samples)
+        self._run_ms = deque(maxlen=samples)
+        self._lock = threading.Lock()
+
+    def record(self, wait_ms, run_ms):
+        with self._lock:
+            self.completed += 1
+            self._wait_ms.append(wait_ms)
+            self._run_ms.append(run_ms)
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return {'p50': None, 'p95': None, 'max': None}
+        ordered = sorted(samples)
+        return {
+            'p50': round(statistics.median(ordered), 2),
+            'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            'max': round(ordered[-1], 2)
+        }
+
+    def to_dict(self):
+        with self._lock:
+            completed, rejected = self.completed, self.rejected
+            wait_ms, run_ms = list(self._wait_ms), list(self._run_ms)
+        return {
+            'completed': completed,
+            'rejected': rejected,
+            'queue_wait_ms': self._summary(wait_ms),
+            'run_ms': self._summary(run_ms)
+        }
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool with admission control"""
+
+    def __init__(self, rounds=12, workers=2, queue_limit=8, wait_timeout=5.0):
+        self.rounds = rounds
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.wait_timeout = wait_timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats = {'hash': _OperationStats(), 'verify': _OperationStats()}
+
+    def _get_executor(self):
+        # Created on first use so forked workers each start their own threads
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix='bcrypt'
+                    )
+        return self._executor
+
+    def _run(self, operation, fn, *args):
+        stats = self._stats[operation]
+        if not self._slots.acquire(blocking=False):
+            stats.reject()
+            raise PasswordHasherBusy('Password hashing queue is full')
+
+        submitted = time.perf_counter()
+        timing = {}
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timing['wait_ms'] = (started - submitted) * 1000
+                timing['run_ms'] = (time.perf_counter() - started) * 1000
+
+        try:
+            future = self._get_executor().submit(task)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result = future.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            # Still queued: drop it if it has not started, the caller is gone anyway
+            future.cancel()
+            stats.reject()
+            raise PasswordHasherBusy('Timed out waiting for password hashing')
+        stats.record(timing['wait_ms'], timing['run_ms'])
+        return result
+
+    def hash(self, password):
+        """Return a new bcrypt hash of the password at the configured cost"""
+        return self._run('hash', self._hash, password)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        return self._run('verify', bcrypt.check_password_hash, password_hash, password)
+
+    def _hash(self, password):
+        return bcrypt.generate_password_hash(password, self.rounds).decode('utf-8')
+
+    def needs_rehash(self, password_hash):
+        """True if the stored hash was made with a different cost than configured"""
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self):
+        return {
+            'rounds': self.rounds,
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'operations': {name: stats.to_dict() for name, stats in self._stats.items()}
+        }
+
+
+def init_password_hasher(app):
+    """Create the app's password hasher from BCRYPT_* settings"""
+    app.extensions['password_hasher'] = PasswordHasher(
+        rounds=app.config.get('BCRYPT_LOG_ROUNDS', 12),
+        workers=app.config.get('BCRYPT_WORKERS', 2),
+        queue_limit=app.config.get('BCRYPT_QUEUE_LIMIT', 8),
+        wait_timeout=app.config.get('BCRYPT_WAIT_TIMEOUT', 5.0)
+    )
+
+
+def get_password_hasher():
+    """The current app's password hasher, or None outside an initialized app"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('password_hasher')
@@ -0,0 +1,64 @@
+"""Declared SQL statement budgets per route
+
+Each view declares how many SQL statements one request may run::
+
+    @team_bp.route('/', methods=['GET'])
+    @query_budget(2)
+    @admin_required
+    def get_teams():
+
+Put ``@query_budget`` directly under the route decorator. A budget is a constant:
+a route whose statement count depends on how many rows it returns has an N+1 and
+should be fixed rather than given a bigger number. ``benchmarks/check_query_budgets.py``
+runs every route against two database sizes and fails on a missing budget, a count
+over budget or a count that grows with the data. With ``QUERY_BUDGET_WARN`` (on in
+development) requests over budget are also logged as warnings, using the statement
+counts from ``services.metrics`` (for a streamed response, once the body has
+been sent); the periodic token revocation sync can put a
+request one statement over.
+"""
+from flask import request, current_app
+
+from services.metrics import current_request_stats
+
+
+def query_budget(statements):
+    """Declare the most SQL statements one request to this view may run"""
+    def decorator(view):
+        view.query_budget = statements
+        return view
+    return decorator
+
+
+def get_query_budget(app, endpoint):
+    """The declared budget of an endpoint, or None if it has none"""
+    return getattr(app.view_functions.get(endpoint), 'query_budget', None)
+
+
+def init_query_budgets(app):
+    """Log requests that ran more statements than their route's budget (call after init_metrics)"""
+    if not app.config.get('QUERY_BUDGET_WARN', False) or app.extensions.get('metrics') is None:
+        return
+
+    @app.after_request
+    def warn_over_budget(response):
+        stats = current_request_stats()
+        budget = get_query_budget(current_app, request.endpoint)
+        if stats is None or budget is None:
+            return response
+        
+        logger, method, path = current_app.logger, request.method, request.path
+        
+        def check():
+            if stats.statements > budget:
+                logger.warning(
+                    'Query budget exceeded: %s %s ran %d SQL statements (budget %d)',
+                    method, path, stats.statements, budget
+                )
+        
+        # A streamed body runs its queries after this hook
+        if response.is_streamed:
+            response.call_on_close(check)
+        else:
+            check()
+        return response
@@ -0,0 +1,167 @@
+"""Read-replica routing
+
+When ``SQLALCHEMY_REPLICA_URI`` is set the replica becomes the ``replica`` bind and
+GET requests to the read-only blueprints (analytics and the users, teams, projects
+and check-ins listings) run their queries on it. Everything else uses the primary,
+and so do writes, flushes and ``SELECT ... FOR UPDATE`` inside a read request.
+
+A user whose own write succeeded reads from the primary for the next
+``REPLICA_STICKY_SECONDS``, so they see their change even if the replica lags.
+The window is kept in the cache backend: with ``CACHE_BACKEND=shared`` every worker
+sees it, so the next request may land on any worker. The memory backend only covers
+one process, so ``check_replica_workers`` switches replica reads off when several
+workers use it. Code that must not see replica lag at all wraps its reads in
+``primary_reads()``. The response cache uses ``sticks_to_primary``
+and ``reads_from_replica`` so a cached replica answer cannot undo that guarantee.
+
+This module is imported by ``models.user`` for ``RoutingSession``, so it must not
+import models at module level.
+"""
+from contextlib import contextmanager
+
+from flask import g, request, current_app, has_app_context, has_request_context
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = 'replica'
+READ_REPLICA_BLUEPRINTS = {'analytics', 'users', 'teams', 'projects', 'checkins'}
+READ_METHODS = ('GET', 'HEAD')
+# Users tracked at once by the memory backend; marks expire after the sticky window
+MEMORY_WRITERS_MAX = 65536
+
+
+class RoutingSession(Session):
+    """Session that sends a read-only request's queries to the replica engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _reads_from_replica(clause):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class RecentWriters:
+    """Users who wrote within the last ``seconds``, kept in a cache backend"""
+
+    def __init__(self, backend, seconds):
+        self.backend = backend
+        self.seconds = seconds
+
+    def mark(self, user_id):
+        self.backend.set(f'recent_writer:{user_id}', 1, self.seconds)
+
+    def is_recent(self, user_id):
+        return self.backend.get(f'recent_writer:{user_id}') is not None
+
+
+def _identity():
+    """The verified JWT identity of the current request, if any yet"""
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
+
+
+def _reads_from_replica(clause):
+    if not has_request_context() or not g.get('db_read_replica'):
+        return False
+    writers = current_app.extensions.get('read_replica')
+    if writers is None:
+        return False
+    if isinstance(clause, UpdateBase) or getattr(clause, '_for_update_arg', None) is not None:
+        return False
+
+    sticky = g.get('db_read_primary')
+    if sticky is None:
+        user_id = _identity()
+        if user_id is None:
+            # Not authenticated yet; decide again once the token is verified
+            return True
+        sticky = g.db_read_primary = writers.is_recent(str(user_id))
+    return not sticky
+
+
+def _replica_request():
+    return (
+        has_request_context() and g.get('db_read_replica')
+        and current_app.extensions.get('read_replica') is not None
+    )
+
+
+def reads_from_replica():
+    """True if the current request's reads are served by the replica"""
+    return bool(_replica_request()) and _reads_from_replica(None)
+
+
+def sticks_to_primary():
+    """True if the current request would read from the replica but its user wrote recently"""
+    return bool(_replica_request()) and not _reads_from_replica(None)
+
+
+@contextmanager
+def primary_reads():
+    """Run the enclosed queries on the primary even inside a read-only request"""
+    previous = g.get('db_read_replica') if has_app_context() else None
+    if previous:
+        g.db_read_replica = False
+    try:
+        yield
+    finally:
+        if previous:
+            g.db_read_replica = previous
+
+
+def configure_read_replica(app, client=None):
+    """Add the replica bind and per-request routing (call before ``db.init_app``)
+
+    ``client`` overrides the Redis-compatible client of the shared cache backend.
+    """
+    uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    if not uri:
+        app.extensions['read_replica'] = None
+        return
+
+    from services.cache import create_cache_backend
+
+    app.config['SQLALCHEMY_BINDS'] = {**(app.config.get('SQLALCHEMY_BINDS') or {}), REPLICA_BIND: uri}
+    app.extensions['read_replica'] = RecentWriters(
+        create_cache_backend(app, client, max_entries=MEMORY_WRITERS_MAX),
+        app.config.get('REPLICA_STICKY_SECONDS', 5)
+    )
+
+    @app.before_request
+    def route_reads():
+        # Set on every request: batch sub-requests share one app context
+        g.db_read_replica = request.method in READ_METHODS and request.blueprint in READ_REPLICA_BLUEPRINTS
+        g.pop('db_read_primary', None)
+
+    @app.after_request
+    def remember_writer(response):
+        # A batch's writes are remembered by its own sub-requests
+        writers = current_app.extensions.get('read_replica')
+        if writers is None:
+            return response
+        if request.method not in READ_METHODS and request.blueprint != 'batch' and response.status_code < 400:
+            user_id = _identity()
+            if user_id is not None:
+                writers.mark(str(user_id))
+        return response
+
+
+def check_replica_workers(app, workers):
+    """Switch replica reads off when several worker processes track writers per process
+
+    A user's next read may reach a worker that never saw their write and would
+    serve it from the lagging replica. Returns True if replica reads were switched off.
+    """
+    writers = app.extensions.get('read_replica')
+    if writers is None or writers.backend.name != 'memory' or workers <= 1:
+        return False
+    app.extensions['read_replica'] = None
+    app.logger.warning(
+        'Read replica disabled: CACHE_BACKEND=memory cannot share recent writers across %d workers; '
+        'set CACHE_BACKEND=shared to read from the replica', workers
+    )
+    return True
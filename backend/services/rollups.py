@@ -0,0 +1,338 @@
+"""Maintenance of the checkin_daily_rollups table
+
+Check-in inserts, updates and deletes (including cascaded deletes) and users
+changing team are turned into per-(date, team, project) deltas by a
+``before_flush`` hook. The deltas are applied with an atomic upsert on the
+flush's own connection, so they commit or roll back together with the write.
+Bulk paths that bypass the ORM build a ``RollupDeltas`` themselves and call
+``apply`` once per batch.
+"""
+from collections import defaultdict
+
+from sqlalchemy import event, select, func, and_, delete, tuple_
+from sqlalchemy.orm import attributes
+
+from models.user import db, User
+from models.checkin import CheckIn
+from models.checkin_rollup import CheckInDailyRollup
+
+ROLLUP_FIELDS = ('checkin_count', 'mood_sum', 'workload_sum', 'workload_count', 'stress_sum', 'stress_count')
+
+# Emptied rollup rows removed per DELETE, well under SQLite's bound parameter limit
+DELETE_BATCH_SIZE = 1000
+
+rollups = CheckInDailyRollup.__table__
+checkins = CheckIn.__table__
+users = User.__table__
+
+
+def _rating(value):
+    return int(value) if value is not None else None
+
+
+def checkin_values(mood_rating, work_load_rating, stress_level):
+    """Rollup field values contributed by a single check-in"""
+    mood_rating = _rating(mood_rating)
+    work_load_rating = _rating(work_load_rating)
+    stress_level = _rating(stress_level)
+    return (
+        1,
+        mood_rating or 0,
+        work_load_rating or 0,
+        1 if work_load_rating is not None else 0,
+        stress_level or 0,
+        1 if stress_level is not None else 0
+    )
+
+
+def _aggregate_columns():
+    """Raw check-in aggregates in ROLLUP_FIELDS order"""
+    return (
+        func.count(checkins.c.id),
+        func.coalesce(func.sum(checkins.c.mood_rating), 0),
+        func.coalesce(func.sum(checkins.c.work_load_rating), 0),
+        func.count(checkins.c.work_load_rating),
+        func.coalesce(func.sum(checkins.c.stress_level), 0),
+        func.count(checkins.c.stress_level)
+    )
+
+
+class RollupDeltas:
+    """Accumulated changes to rollup rows, keyed by (date, team_id, project_id)"""
+
+    def __init__(self):
+        self.rows = defaultdict(lambda: [0] * len(ROLLUP_FIELDS))
+
+    def add(self, check_in_date, team_id, project_id, values, sign=1):
+        row = self.rows[(check_in_date, team_id or 0, project_id or 0)]
+        for i, value in enumerate(values):
+            row[i] += sign * value
+
+    def add_checkin(self, check_in_date, team_id, project_id, mood_rating, work_load_rating, stress_level, sign=1):
+        self.add(check_in_date, team_id, project_id, checkin_values(mood_rating, work_load_rating, stress_level), sign)
+
+    def __bool__(self):
+        return any(any(row) for row in self.rows.values())
+
+    def apply(self, connection):
+        """Apply all non-zero deltas on ``connection`` and drop rows that become empty"""
+        params = [
+            dict(zip(('rollup_date', 'team_id', 'project_id'), key), **dict(zip(ROLLUP_FIELDS, row)))
+            for key, row in self.rows.items() if any(row)
+        ]
+        if not params:
+            return
+
+        dialect = connection.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            # executemany of one statement: compiled once however many rows change
+            stmt = insert(rollups)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['rollup_date', 'team_id', 'project_id'],
+                set_={
+                    **{field: rollups.c[field] + stmt.excluded[field] for field in ROLLUP_FIELDS},
+                    'updated_at': func.now()
+                }
+            )
+            connection.execute(stmt, params)
+        else:
+            # Portable fallback: update in place, insert when the row does not exist yet
+            for row in params:
+                key = and_(
+                    rollups.c.rollup_date == row['rollup_date'],
+                    rollups.c.team_id == row['team_id'],
+                    rollups.c.project_id == row['project_id']
+                )
+                result = connection.execute(
+                    rollups.update().where(key).values(
+                        **{field: rollups.c[field] + row[field] for field in ROLLUP_FIELDS}
+                    )
+                )
+                if result.rowcount == 0:
+                    connection.execute(rollups.insert().values(**row))
+
+        emptied = [
+            (row['rollup_date'], row['team_id'], row['project_id'])
+            for row in params if row['checkin_count'] < 0
+        ]
+        key = tuple_(rollups.c.rollup_date, rollups.c.team_id, rollups.c.project_id)
+        for start in range(0, len(emptied), DELETE_BATCH_SIZE):
+            connection.execute(delete(rollups).where(
+                key.in_(emptied[start:start + DELETE_BATCH_SIZE]),
+                rollups.c.checkin_count <= 0
+            ))
+
+
+def record_inserted_checkins(connection, rows):
+    """Add check-ins inserted through Core (bypassing the flush hook) to the rollups
+
+    ``rows`` are dicts with user_id, project_id, check_in_date and the ratings.
+    Looks up the users' teams in one query and applies one upsert.
+    """
+    if not rows:
+        return
+    user_ids = {row['user_id'] for row in rows}
+    teams = dict(connection.execute(select(users.c.id, users.c.team_id).where(users.c.id.in_(user_ids))).all())
+
+    deltas = RollupDeltas()
+    for row in rows:
+        deltas.add_checkin(
+            row['check_in_date'], teams.get(row['user_id']), row.get('project_id'),
+            row['mood_rating'], row.get('work_load_rating'), row.get('stress_level')
+        )
+    deltas.apply(connection)
+
+
+def _add_team_moves(connection, deltas, old_teams, new_teams):
+    """Move existing check-ins of users from their old team to their new one
+
+    ``old_teams`` and ``new_teams`` map user id to team id (None for no team).
+    """
+    rows = connection.execute(
+        select(
+            checkins.c.user_id, checkins.c.check_in_date, checkins.c.project_id, *_aggregate_columns()
+        ).where(checkins.c.user_id.in_(list(new_teams))).group_by(
+            checkins.c.user_id, checkins.c.check_in_date, checkins.c.project_id
+        )
+    )
+    for row in rows:
+        values = tuple(row[3:])
+        old_team = old_teams.get(row.user_id)
+        new_team = new_teams[row.user_id]
+        if (old_team or 0) != (new_team or 0):
+            deltas.add(row.check_in_date, old_team, row.project_id, values, sign=-1)
+            deltas.add(row.check_in_date, new_team, row.project_id, values)
+
+
+def record_team_moves(connection, old_teams, new_team_id):
+    """Update rollups for users moved to ``new_team_id`` through Core (bypassing the flush hook)
+
+    ``old_teams`` maps each moved user id to the team they left. One grouped
+    query and one upsert regardless of how many users moved.
+    """
+    if not old_teams:
+        return
+    deltas = RollupDeltas()
+    _add_team_moves(connection, deltas, old_teams, {user_id: new_team_id for user_id in old_teams})
+    deltas.apply(connection)
+
+
+def _team_change(user):
+    history = attributes.get_history(user, 'team_id')
+    return history.has_changes()
+
+
+def collect_flush_deltas(session):
+    """Compute rollup deltas for the pending changes in ``session``
+
+    Runs before the flush, so the database still holds the pre-flush state:
+    existing check-ins of users changing team are moved from their old team to
+    the new one, then changed and deleted check-ins are subtracted and new
+    values added under each user's post-flush team.
+    """
+    new = [obj for obj in session.new if isinstance(obj, CheckIn)]
+    changed = [
+        obj for obj in session.dirty
+        if isinstance(obj, CheckIn) and obj not in session.deleted and session.is_modified(obj)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, CheckIn) and attributes.instance_state(obj).key]
+    moved = {
+        obj.id: obj for obj in session.dirty
+        if isinstance(obj, User) and obj.id is not None and _team_change(obj)
+    }
+    deltas = RollupDeltas()
+    if not (new or changed or deleted or moved):
+        return deltas
+
+    connection = session.connection()
+
+    # Pre-flush values of changed and deleted check-ins
+    originals = {}
+    persisted_ids = [obj.id for obj in changed + deleted]
+    if persisted_ids:
+        originals = {
+            row.id: row for row in connection.execute(
+                select(
+                    checkins.c.id, checkins.c.user_id, checkins.c.project_id, checkins.c.check_in_date,
+                    checkins.c.mood_rating, checkins.c.work_load_rating, checkins.c.stress_level
+                ).where(checkins.c.id.in_(persisted_ids))
+            )
+        }
+
+    user_ids = set(moved)
+    user_ids.update(obj.user_id for obj in new + changed)
+    user_ids.update(row.user_id for row in originals.values())
+    user_ids.discard(None)
+
+    stored_teams = {}
+    if user_ids:
+        stored_teams = dict(connection.execute(
+            select(users.c.id, users.c.team_id).where(users.c.id.in_(user_ids))
+        ).all())
+
+    identity_map = session.identity_map
+
+    def team_after_flush(user_id):
+        user = identity_map.get(session.identity_key(User, user_id))
+        return user.team_id if user is not None else stored_teams.get(user_id)
+
+    # Move existing check-ins of users whose team changes
+    if moved:
+        _add_team_moves(connection, deltas, stored_teams, {user_id: user.team_id for user_id, user in moved.items()})
+
+    for row in originals.values():
+        deltas.add_checkin(
+            row.check_in_date, team_after_flush(row.user_id), row.project_id,
+            row.mood_rating, row.work_load_rating, row.stress_level, sign=-1
+        )
+
+    for obj in new + changed:
+        deltas.add_checkin(
+            obj.check_in_date, team_after_flush(obj.user_id), obj.project_id,
+            obj.mood_rating, obj.work_load_rating, obj.stress_level
+        )
+
+    return deltas
+
+
+def _before_flush(session, flush_context, instances):
+    with session.no_autoflush:
+        deltas = collect_flush_deltas(session)
+    if deltas:
+        deltas.apply(session.connection())
+
+
+def register_rollup_hooks():
+    """Keep rollups current on every flush of the app's session (idempotent)"""
+    if not event.contains(db.session, 'before_flush', _before_flush):
+        event.listen(db.session, 'before_flush', _before_flush)
+
+
+def _raw_rollup_select(start_date=None, end_date=None):
+    team_id = func.coalesce(users.c.team_id, 0)
+    project_id = func.coalesce(checkins.c.project_id, 0)
+    query = select(
+        checkins.c.check_in_date, team_id, project_id, *_aggregate_columns()
+    ).select_from(checkins.join(users, checkins.c.user_id == users.c.id))
+    if start_date:
+        query = query.where(checkins.c.check_in_date >= start_date)
+    if end_date:
+        query = query.where(checkins.c.check_in_date <= end_date)
+    return query.group_by(checkins.c.check_in_date, team_id, project_id)
+
+
+def _date_range(column, start_date=None, end_date=None):
+    conditions = []
+    if start_date:
+        conditions.append(column >= start_date)
+    if end_date:
+        conditions.append(column <= end_date)
+    return conditions
+
+
+def rebuild_rollups(start_date=None, end_date=None):
+    """Recompute rollup rows from raw check-ins for a date range (all dates by default)
+
+    Returns the number of rollup rows written. The caller commits.
+    """
+    connection = db.session.connection()
+    connection.execute(delete(rollups).where(*_date_range(rollups.c.rollup_date, start_date, end_date)))
+    result = connection.execute(
+        rollups.insert().from_select(
+            ['rollup_date', 'team_id', 'project_id', *ROLLUP_FIELDS],
+            _raw_rollup_select(start_date, end_date)
+        )
+    )
+    return result.rowcount
+
+
+def find_rollup_drift(start_date=None, end_date=None):
+    """Compare rollup rows with raw check-ins and return the keys that disagree"""
+    connection = db.session.connection()
+    expected = {
+        tuple(row[:3]): tuple(row[3:]) for row in connection.execute(_raw_rollup_select(start_date, end_date))
+    }
+    actual = {
+        tuple(row[:3]): tuple(row[3:]) for row in connection.execute(
+            select(
+                rollups.c.rollup_date, rollups.c.team_id, rollups.c.project_id,
+                *(rollups.c[field] for field in ROLLUP_FIELDS)
+            ).where(rollups.c.checkin_count != 0, *_date_range(rollups.c.rollup_date, start_date, end_date))
+        )
+    }
+
+    drift = []
+    for key in sorted(set(expected) | set(actual), key=lambda k: (k[0], k[1], k[2])):
+        if expected.get(key) != actual.get(key):
+            drift.append({
+                'date': key[0].isoformat(),
+                'team_id': key[1],
+                'project_id': key[2],
+                'expected': dict(zip(ROLLUP_FIELDS, expected[key])) if key in expected else None,
+                'actual': dict(zip(ROLLUP_FIELDS, actual[key])) if key in actual else None
+            })
+    return drift
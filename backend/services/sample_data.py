@@ -0,0 +1,62 @@
+"""Sample data for a fresh database
+
+Each record is only created when nothing of its kind exists yet, so seeding is safe
+to repeat. Run it once per deploy with ``flask seed`` (or ``flask init-db --seed``),
+not from every worker at import time.
+"""
+from models.user import db, User
+from models.team import Team
+from models.project import Project
+
+
+def seed_sample_data():
+    """Create the sample admin, team, employee and project; return what was created"""
+    created = []
+    
+    # Create admin user if none exists
+    if not User.query.filter_by(role='admin').first():
+        db.session.add(User(
+            email='admin@teampulse.com',
+            password='admin123',
+            first_name='Admin',
+            last_name='User',
+            role='admin'
+        ))
+        created.append('Admin user created: admin@teampulse.com / admin123')
+    
+    # Create sample team if none exists
+    team = Team.query.first()
+    if not team:
+        team = Team(
+            name='Development Team',
+            description='Main development team for the company'
+        )
+        db.session.add(team)
+        db.session.flush()
+        created.append('Sample team created: Development Team')
+    
+    # Create sample employee if none exists
+    if not User.query.filter_by(role='employee').first():
+        db.session.add(User(
+            email='employee@teampulse.com',
+            password='employee123',
+            first_name='John',
+            last_name='Doe',
+            role='employee',
+            team_id=team.id
+        ))
+        created.append('Sample employee created: employee@teampulse.com / employee123')
+    
+    # Create sample project if none exists
+    if not Project.query.first():
+        db.session.add(Project(
+            title='TeamPulse Development',
+            team_id=team.id,
+            description='Building the TeamPulse application',
+            status='active',
+            priority='high'
+        ))
+        created.append('Sample project created: TeamPulse Development')
+    
+    db.session.commit()
+    return created
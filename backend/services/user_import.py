@@ -0,0 +1,152 @@
+"""Bulk user import
+
+Validates all rows first, resolves existing emails and team names with one query
+each, hashes the passwords across the worker's process pool (``services.hash_pool``)
+and inserts the new users with batched executemany statements, one transaction per
+batch.
+"""
+import os
+
+from flask import current_app
+from sqlalchemy import select, or_
+from sqlalchemy.exc import IntegrityError
+
+from models.user import db, User
+from models.team import Team
+from services.bulk import BulkTimer
+from services.hash_pool import hash_passwords
+
+REQUIRED_FIELDS = ('email', 'password', 'first_name', 'last_name')
+ROLES = ('admin', 'employee')
+
+
+def _row_error(number, email, message):
+    return {'row': number, 'email': email, 'error': message}
+
+
+def _parse_team_id(value):
+    if value in (None, ''):
+        return None
+    return int(str(value))
+
+
+def import_users(rows):
+    """Create users from parsed rows; return counts, per-row errors and timing stats"""
+    config = current_app.config
+    timer = BulkTimer()
+    errors = []
+    candidates = []
+    seen = set()
+    
+    for number, row in enumerate(rows, start=1):
+        email = str(row.get('email') or '').lower()
+        missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+        if missing:
+            errors.append(_row_error(number, email, f"{', '.join(missing)} required"))
+            continue
+        role = row.get('role') or 'employee'
+        if role not in ROLES:
+            errors.append(_row_error(number, email, f'role must be one of {", ".join(ROLES)}'))
+            continue
+        try:
+            team_id = _parse_team_id(row.get('team_id'))
+        except ValueError:
+            errors.append(_row_error(number, email, 'team_id must be an integer'))
+            continue
+        if email in seen:
+            errors.append(_row_error(number, email, 'Duplicate email in import'))
+            continue
+        seen.add(email)
+        candidates.append({'row': number, 'email': email, 'role': role, 'team_id': team_id,
+                           'team': row.get('team') or None, 'source': row})
+    timer.lap('validate')
+    
+    # One query for existing emails, one for teams by name or id
+    existing = set()
+    if candidates:
+        existing = set(db.session.scalars(
+            select(User.email).where(User.email.in_([c['email'] for c in candidates]))
+        ))
+    team_names = {c['team'] for c in candidates if c['team']}
+    team_ids = {c['team_id'] for c in candidates if c['team_id'] is not None}
+    teams_by_name, known_team_ids = {}, set()
+    if team_names or team_ids:
+        for team_id, name in db.session.execute(
+            select(Team.id, Team.name).where(or_(Team.name.in_(team_names), Team.id.in_(team_ids)))
+        ):
+            teams_by_name[name] = team_id
+            known_team_ids.add(team_id)
+    
+    skipped = 0
+    accepted = []
+    for candidate in candidates:
+        if candidate['email'] in existing:
+            skipped += 1
+            errors.append(_row_error(candidate['row'], candidate['email'], 'User with this email already exists'))
+            continue
+        if candidate['team']:
+            if candidate['team'] not in teams_by_name:
+                errors.append(_row_error(candidate['row'], candidate['email'], f"Unknown team: {candidate['team']}"))
+                continue
+            candidate['team_id'] = teams_by_name[candidate['team']]
+        elif candidate['team_id'] is not None and candidate['team_id'] not in known_team_ids:
+            errors.append(_row_error(candidate['row'], candidate['email'], f"Unknown team_id: {candidate['team_id']}"))
+            continue
+        accepted.append(candidate)
+    timer.lap('lookup')
+    
+    processes = config.get('BULK_IMPORT_HASH_PROCESSES') or os.cpu_count() or 1
+    hashes = hash_passwords(
+        [str(c['source']['password']) for c in accepted],
+        config.get('BCRYPT_LOG_ROUNDS', 12),
+        processes
+    )
+    timer.lap('hash')
+    
+    values = [{
+        'email': c['email'],
+        'password_hash': password_hash,
+        'first_name': c['source']['first_name'],
+        'last_name': c['source']['last_name'],
+        'role': c['role'],
+        'team_id': c['team_id']
+    } for c, password_hash in zip(accepted, hashes)]
+    imported = _insert_batches(values, [c['row'] for c in accepted], errors,
+                               config.get('BULK_IMPORT_BATCH_SIZE', 500))
+    timer.lap('insert')
+    
+    errors.sort(key=lambda error: error['row'])
+    return {
+        'received': len(rows),
+        'imported': imported,
+        'skipped': skipped,
+        'failed': len(errors) - skipped,
+        'errors': errors,
+        'stats': timer.stats(len(rows))
+    }
+
+
+def _insert_batches(values, row_numbers, errors, batch_size):
+    """Insert users batch by batch; a batch that conflicts is retried row by row"""
+    table = User.__table__
+    imported = 0
+    for start in range(0, len(values), batch_size):
+        batch = values[start:start + batch_size]
+        try:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            imported += len(batch)
+            continue
+        except IntegrityError:
+            # Typically an email created concurrently since the lookup
+            db.session.rollback()
+        
+        for number, row in zip(row_numbers[start:start + batch_size], batch):
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(table.insert(), row)
+                imported += 1
+            except IntegrityError:
+                errors.append(_row_error(number, row['email'], 'User with this email already exists'))
+        db.session.commit()
+    return imported
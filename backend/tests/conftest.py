@@ -0,0 +1,138 @@
+"""Shared fixtures for the backend tests
+
+Tests build the app with the testing config (in-memory SQLite unless a test points
+it somewhere else) and run from the backend directory: ``python -m pytest``.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# app.py builds a production app at import time, which needs a database URL
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from config import TestingConfig
+
+
+class FakeRedis:
+    """In-process stand-in for the Redis client of the shared cache backend"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.values[key] = (value, time.monotonic() + ex if ex else None)
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        self.values[key] = (value, None)
+        return value
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(monkeypatch):
+    """Cheap bcrypt rounds; the default cost makes every seeded user take ~250 ms"""
+    monkeypatch.setattr(TestingConfig, 'BCRYPT_LOG_ROUNDS', 4)
+
+
+@pytest.fixture
+def app():
+    """Testing app with an empty schema and its app context pushed"""
+    from app import create_app
+    from models.user import db
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def org(app):
+    """An admin plus two teams, each with two employees and one project"""
+    from models.user import User, db
+    from models.team import Team
+    from models.project import Project
+
+    admin = User(email='admin@example.com', password='password123', first_name='Admin', last_name='User', role='admin')
+    teams = [Team(name=f'Team {n}') for n in range(2)]
+    db.session.add(admin)
+    db.session.add_all(teams)
+    db.session.flush()
+    employees = [
+        User(email=f'user{n}@example.com', password='password123', first_name='User', last_name=str(n),
+             team_id=teams[n // 2].id)
+        for n in range(4)
+    ]
+    projects = [Project(title=f'Project {n}', team_id=team.id) for n, team in enumerate(teams)]
+    db.session.add_all(employees + projects)
+    db.session.commit()
+    return SimpleNamespace(admin=admin, teams=teams, employees=employees, projects=projects)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Moves ``time.monotonic`` (cache entry and sticky window expiry) forward on demand"""
+    real_monotonic = time.monotonic
+    offset = [0]
+    monkeypatch.setattr(time, 'monotonic', lambda: real_monotonic() + offset[0])
+
+    def advance(seconds):
+        offset[0] += seconds
+    return SimpleNamespace(advance=advance)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers():
+    """Build an Authorization header for a user"""
+    from auth.jwt_auth import create_user_token
+
+    def headers(user):
+        return {'Authorization': f'Bearer {create_user_token(user.id, user.email, user.role)}'}
+    return headers
+
+
+@pytest.fixture
+def count_statements(app):
+    """Context manager collecting the SQL statements run on the app's engine"""
+    from sqlalchemy import event
+    from models.user import db
+
+    @contextmanager
+    def count():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return count
@@ -0,0 +1,164 @@
+"""Analytics routes agree with the same numbers worked out from the raw check-ins"""
+from datetime import date, timedelta
+
+import pytest
+
+from models.user import db
+from models.checkin import CheckIn
+from models.project import Project, project_assignments
+
+
+def averages(checkins):
+    def average(values):
+        values = [value for value in values if value is not None]
+        return round(sum(values) / len(values), 2) if values else 0
+    return {
+        'mood': average(checkin.mood_rating for checkin in checkins),
+        'workload': average(checkin.work_load_rating for checkin in checkins),
+        'stress': average(checkin.stress_level for checkin in checkins),
+    }
+
+
+@pytest.fixture
+def history(org):
+    """Ten days of check-ins for three employees plus one outside the 30-day window; user3 is inactive"""
+    today = date.today()
+    for n, employee in enumerate(org.employees[:3]):
+        for day in range(10):
+            db.session.add(CheckIn(
+                user_id=employee.id, check_in_date=today - timedelta(days=day), mood_rating=(n + day) % 5 + 1,
+                project_id=org.projects[n // 2].id if day % 3 else None,
+                work_load_rating=(day % 4) + 1 if n != 1 else None, stress_level=(n * day) % 5 + 1,
+            ))
+    db.session.add(CheckIn(user_id=org.employees[0].id, check_in_date=today - timedelta(days=45), mood_rating=1))
+    org.employees[3].is_active = False
+    db.session.commit()
+    return org
+
+
+def checkins_since(days, **criteria):
+    start = date.today() - timedelta(days=days)
+    return [checkin for checkin in CheckIn.query.filter_by(**criteria) if checkin.check_in_date >= start]
+
+
+def test_team_analytics(client, history, auth_headers):
+    response = client.get('/api/analytics/teams', headers=auth_headers(history.admin))
+    assert response.status_code == 200
+    rows = {row['team']['id']: row for row in response.get_json()['teams']}
+
+    assert set(rows) == {team.id for team in history.teams}
+    for team in history.teams:
+        checkins = [checkin for checkin in checkins_since(30) if checkin.user.team_id == team.id]
+        row = rows[team.id]
+        assert row['team']['member_count'] == 2
+        assert row['team']['project_count'] == 1
+        assert row['member_count'] == sum(1 for user in team.members if user.is_active)
+        assert row['checkin_count'] == len(checkins)
+        assert row['averages'] == averages(checkins)
+
+
+def test_team_analytics_window(client, history, auth_headers):
+    response = client.get('/api/analytics/teams?days=3', headers=auth_headers(history.admin))
+    rows = {row['team']['id']: row for row in response.get_json()['teams']}
+
+    team = history.teams[0]
+    checkins = [checkin for checkin in checkins_since(3) if checkin.user.team_id == team.id]
+    assert rows[team.id]['checkin_count'] == len(checkins) == 8
+    assert rows[team.id]['averages'] == averages(checkins)
+    assert response.get_json()['date_range']['days'] == 3
+
+
+def test_team_without_members_or_checkins(client, history, auth_headers):
+    response = client.post('/api/teams/', headers=auth_headers(history.admin), json={'name': 'Empty Team'})
+    team_id = response.get_json()['team']['id']
+
+    rows = {row['team']['id']: row for row in client.get(
+        '/api/analytics/teams', headers=auth_headers(history.admin)).get_json()['teams']}
+    assert rows[team_id]['member_count'] == 0
+    assert rows[team_id]['checkin_count'] == 0
+    assert rows[team_id]['averages'] == {'mood': 0, 'workload': 0, 'stress': 0}
+
+
+@pytest.fixture
+def projects(history):
+    """Assign the employees to their team's project and vary status and priority"""
+    db.session.execute(project_assignments.insert(), [
+        {'project_id': history.projects[n // 2].id, 'user_id': employee.id}
+        for n, employee in enumerate(history.employees[:3])
+    ])
+    history.projects[0].priority, history.projects[1].priority = 'urgent', 'low'
+    history.projects[1].status = 'completed'
+    extra = Project(title='Unassigned', team_id=history.teams[0].id, priority='high')
+    db.session.add(extra)
+    db.session.commit()
+    return history.projects + [extra]
+
+
+def project_rows(client, headers, query=''):
+    response = client.get(f'/api/analytics/projects{query}', headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['projects']
+
+
+def test_project_analytics(client, history, projects, auth_headers):
+    rows = {row['project']['id']: row for row in project_rows(client, auth_headers(history.admin))}
+
+    assert set(rows) == {project.id for project in projects}
+    for project in projects:
+        checkins = checkins_since(30, project_id=project.id)
+        row = rows[project.id]
+        assert row['assigned_users_count'] == row['project']['assigned_users_count'] == len(project.assigned_users)
+        assert row['project']['team_name'] == project.team.name
+        assert row['checkin_count'] == len(checkins)
+        assert row['averages'] == averages(checkins)
+    assert rows[projects[0].id]['assigned_users_count'] == 2
+    assert rows[projects[2].id]['checkin_count'] == 0
+
+
+def test_project_analytics_filters_and_sorting(client, history, projects, auth_headers):
+    headers = auth_headers(history.admin)
+
+    def ids(query):
+        return [row['project']['id'] for row in project_rows(client, headers, query)]
+
+    assert ids(f'?team_id={history.teams[0].id}') == [projects[0].id, projects[2].id]
+    assert ids('?status=completed') == [projects[1].id]
+    assert ids('?priority=high') == [projects[2].id]
+    assert ids('?sort_by=priority') == [projects[1].id, projects[2].id, projects[0].id]
+    assert ids('?sort_by=checkin_count&order=desc')[-1] == projects[2].id
+    assert client.get('/api/analytics/projects?sort_by=budget', headers=headers).status_code == 400
+    assert client.get('/api/analytics/projects?order=sideways', headers=headers).status_code == 400
+
+
+@pytest.mark.parametrize('path, role', [
+    ('/api/analytics/dashboard', 'admin'),
+    ('/api/analytics/dashboard-basic', 'employee'),
+])
+def test_dashboard_overview_in_one_statement(app, client, history, auth_headers, count_statements, path, role):
+    app.extensions['response_cache'] = None
+    revocations = app.extensions['token_revocations']
+    revocations.sync_interval = 3600
+    revocations.is_revoked(0, 0)
+    headers = auth_headers(history.admin if role == 'admin' else history.employees[0])
+    window = checkins_since(30)
+    recent = checkins_since(7)
+
+    db.session.expunge_all()
+    with count_statements() as statements:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    body = response.get_json()
+
+    assert body['overview'] == {
+        'total_users': 4,
+        'total_teams': 2,
+        'total_projects': 2,
+        'active_projects': 2,
+        'total_checkins': len(window),
+        'recent_checkins': len(recent),
+    }
+    assert len(recent) == 24
+    if role == 'admin':
+        assert body['averages'] == averages(window)
+    # Everything in one statement, after the admin check's user lookup
+    assert len(statements) == (2 if role == 'admin' else 1)
@@ -0,0 +1,140 @@
+"""/api/batch runs sub-requests through the normal request pipeline"""
+import threading
+
+import pytest
+
+import routes.batch_routes as batch_routes
+from config import TestingConfig
+from services.metrics import get_metrics
+
+
+def run_batch(client, headers, *sub_requests):
+    response = client.post('/api/batch', headers=headers, json={'requests': list(sub_requests)})
+    assert response.status_code == 200, response.get_json()
+    return {result['id']: result for result in response.get_json()['responses']}
+
+
+@pytest.fixture
+def database_file(tmp_path, monkeypatch):
+    """An on-disk database, so consecutive GETs can run on worker threads"""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "batch.db"}')
+
+
+def test_read_after_write_sees_the_write(client, org, auth_headers):
+    results = run_batch(
+        client, auth_headers(org.admin),
+        {'id': 'create', 'method': 'POST', 'path': '/api/teams/', 'body': {'name': 'Batch Team'}},
+        {'id': 'list', 'path': '/api/teams/'},
+    )
+
+    assert results['create']['status'] == 201
+    assert 'Batch Team' in [team['name'] for team in results['list']['body']['teams']]
+
+
+def test_each_sub_request_is_authorized_as_the_caller(client, org, auth_headers):
+    results = run_batch(
+        client, auth_headers(org.employees[0]),
+        {'id': 'users', 'path': '/api/users/'},
+        {'id': 'mine', 'path': '/api/checkins/my-checkins'},
+        {'id': 'team', 'method': 'POST', 'path': '/api/teams/', 'body': {'name': 'Not Allowed'}},
+    )
+
+    assert results['users']['status'] == 403
+    assert results['mine']['status'] == 200
+    assert results['team']['status'] == 403
+    assert client.post('/api/batch', json={'requests': [{'path': '/api/teams/'}]}).status_code == 401
+
+
+def test_failing_sub_request_does_not_abort_the_others(app, client, org, auth_headers):
+    def broken():
+        raise RuntimeError('boom')
+    app.view_functions['analytics.get_basic_dashboard_data'] = broken
+
+    results = run_batch(
+        client, auth_headers(org.admin),
+        {'id': 'broken', 'path': '/api/analytics/dashboard-basic'},
+        {'id': 'missing', 'path': '/api/teams/9999'},
+        {'id': 'invalid', 'method': 'POST', 'path': '/api/teams/', 'body': {}},
+        {'id': 'create', 'method': 'POST', 'path': '/api/teams/', 'body': {'name': 'After Failures'}},
+        {'id': 'list', 'path': '/api/teams/'},
+    )
+
+    assert results['broken']['status'] == 500
+    assert results['broken']['body']['error'] == 'boom'
+    assert results['missing']['status'] == 404
+    assert results['invalid']['status'] == 400
+    assert results['create']['status'] == 201
+    assert len(results['list']['body']['teams']) == 3
+
+
+def test_invalid_batch_is_rejected(client, org, auth_headers):
+    headers = auth_headers(org.admin)
+    for body in ({}, {'requests': []}, {'requests': [{'path': '/api/batch'}]},
+                 {'requests': [{'method': 'PATCH', 'path': '/api/teams/'}]}):
+        assert client.post('/api/batch', headers=headers, json=body).status_code == 400
+
+
+@pytest.mark.usefixtures('database_file')
+def test_consecutive_reads_run_on_worker_threads(client, org, auth_headers, monkeypatch):
+    threads = []
+    dispatch = batch_routes._dispatch_in_own_context
+
+    def record_thread(*args):
+        threads.append(threading.get_ident())
+        return dispatch(*args)
+    monkeypatch.setattr(batch_routes, '_dispatch_in_own_context', record_thread)
+
+    results = run_batch(
+        client, auth_headers(org.admin),
+        {'id': 'create', 'method': 'POST', 'path': '/api/teams/', 'body': {'name': 'Concurrent Team'}},
+        {'id': 'teams', 'path': '/api/teams/'},
+        {'id': 'users', 'path': '/api/users/'},
+        {'id': 'members', 'path': f'/api/teams/{org.teams[0].id}/members'},
+    )
+
+    assert len(threads) == 3
+    assert threading.get_ident() not in threads
+    assert [result['status'] for result in results.values()] == [201, 200, 200, 200]
+    assert list(results) == ['create', 'teams', 'users', 'members']
+    assert 'Concurrent Team' in [team['name'] for team in results['teams']['body']['teams']]
+    assert len(results['members']['body']['members']) == 2
+
+
+def test_in_memory_database_runs_reads_in_order(client, org, auth_headers, monkeypatch):
+    def fail(*args):
+        raise AssertionError('an in-memory database cannot be shared across threads')
+    monkeypatch.setattr(batch_routes, '_dispatch_in_own_context', fail)
+
+    results = run_batch(
+        client, auth_headers(org.admin),
+        {'id': 'teams', 'path': '/api/teams/'},
+        {'id': 'users', 'path': '/api/users/'},
+    )
+
+    assert [result['status'] for result in results.values()] == [200, 200]
+
+
+def assert_recorded_per_sub_request(client, headers):
+    results = run_batch(
+        client, headers,
+        {'id': 'teams', 'path': '/api/teams/'},
+        {'id': 'users', 'path': '/api/users/'},
+        {'id': 'missing', 'path': '/api/teams/9999'},
+    )
+    assert [result['status'] for result in results.values()] == [200, 200, 404]
+
+    endpoints = get_metrics()._endpoints
+    assert endpoints[('teams.get_teams', 'GET')].status == {200: 1}
+    assert endpoints[('teams.get_teams', 'GET')].statements.sum >= 1
+    assert endpoints[('users.get_users', 'GET')].status == {200: 1}
+    assert endpoints[('teams.get_team', 'GET')].status == {404: 1}
+    assert endpoints[('batch.run_batch', 'POST')].status == {200: 1}
+
+
+def test_each_sub_request_is_recorded_in_metrics(client, org, auth_headers):
+    assert_recorded_per_sub_request(client, auth_headers(org.admin))
+
+
+@pytest.mark.usefixtures('database_file')
+def test_each_threaded_sub_request_is_recorded_in_metrics(client, org, auth_headers):
+    assert_recorded_per_sub_request(client, auth_headers(org.admin))
@@ -0,0 +1,37 @@
+"""Id limits on the bulk assignment and team move endpoints"""
+import pytest
+
+from models.user import User, db
+from models.team import Team
+from models.project import Project
+
+
+@pytest.fixture
+def setup(app):
+    admin = User(email='admin@example.com', password='password123', first_name='Admin', last_name='User', role='admin')
+    team = Team(name='Team')
+    db.session.add_all([admin, team])
+    db.session.flush()
+    project = Project(title='Project', team_id=team.id)
+    users = [User(email=f'user{n}@example.com', password='password123', first_name='User', last_name=str(n))
+             for n in range(4)]
+    db.session.add(project)
+    db.session.add_all(users)
+    db.session.commit()
+    app.config['BULK_MAX_IDS'] = 3
+    return admin, team, project, [user.id for user in users]
+
+
+@pytest.mark.parametrize('path', ['/api/projects/{project}/assign', '/api/projects/{project}/unassign',
+                                  '/api/teams/memberships'])
+def test_too_many_ids_is_rejected(client, setup, auth_headers, path):
+    admin, team, project, user_ids = setup
+    url = path.format(project=project.id)
+    body = {'team_id': team.id}
+
+    response = client.post(url, headers=auth_headers(admin), json={**body, 'user_ids': user_ids})
+    assert response.status_code == 400
+    assert 'maximum 3' in response.get_json()['message']
+
+    response = client.post(url, headers=auth_headers(admin), json={**body, 'user_ids': user_ids[:3]})
+    assert response.status_code == 200, response.get_json()
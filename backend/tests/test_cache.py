@@ -0,0 +1,89 @@
+"""Versioned response cache and its backends"""
+from werkzeug.datastructures import MultiDict
+
+from services.cache import SharedCacheBackend, MemoryCacheBackend, ResponseCache, check_cache_workers
+
+
+def test_memory_cache_is_kept_with_one_worker(app):
+    assert not check_cache_workers(app, 1)
+    assert app.extensions['response_cache'] is not None
+
+
+def test_memory_cache_is_switched_off_with_several_workers(app, caplog):
+    assert check_cache_workers(app, 4)
+    assert app.extensions['response_cache'] is None
+    assert 'CACHE_BACKEND=shared' in caplog.text
+
+
+def test_shared_cache_is_kept_with_several_workers(app, fake_redis):
+    app.extensions['response_cache'] = ResponseCache(SharedCacheBackend(fake_redis))
+    assert not check_cache_workers(app, 4)
+    assert app.extensions['response_cache'] is not None
+
+
+def test_second_request_is_a_hit(client, org, auth_headers):
+    first = client.get('/api/analytics/teams?days=7', headers=auth_headers(org.admin))
+    second = client.get('/api/analytics/teams?days=7', headers=auth_headers(org.admin))
+
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_json() == first.get_json()
+    assert client.get('/api/analytics/teams?days=8', headers=auth_headers(org.admin)).headers['X-Cache'] == 'MISS'
+
+
+def test_write_invalidates_cached_responses(client, org, auth_headers):
+    url = '/api/analytics/dashboard'
+    before = client.get(url, headers=auth_headers(org.admin))
+    assert client.get(url, headers=auth_headers(org.admin)).headers['X-Cache'] == 'HIT'
+
+    response = client.post('/api/checkins/', headers=auth_headers(org.employees[0]), json={'mood_rating': 4})
+    assert response.status_code == 201
+
+    after = client.get(url, headers=auth_headers(org.admin))
+    assert after.headers['X-Cache'] == 'MISS'
+    assert after.get_json()['overview']['total_checkins'] == before.get_json()['overview']['total_checkins'] + 1
+
+
+def test_failed_write_keeps_cached_responses(app, client, org, auth_headers):
+    version = app.extensions['response_cache'].data_version()
+
+    response = client.post('/api/checkins/', headers=auth_headers(org.employees[0]), json={})
+    assert response.status_code == 400
+
+    assert app.extensions['response_cache'].data_version() == version
+
+
+def test_roles_get_separate_entries(client, org, auth_headers):
+    url = '/api/analytics/dashboard-basic'
+    assert client.get(url, headers=auth_headers(org.admin)).headers['X-Cache'] == 'MISS'
+    assert client.get(url, headers=auth_headers(org.employees[0])).headers['X-Cache'] == 'MISS'
+    assert client.get(url, headers=auth_headers(org.employees[1])).headers['X-Cache'] == 'HIT'
+    assert client.get('/api/analytics/dashboard', headers=auth_headers(org.employees[0])).status_code == 403
+
+
+def test_make_key():
+    cache = ResponseCache(MemoryCacheBackend())
+    args = MultiDict([('days', '7'), ('team_id', '2')])
+
+    assert cache.make_key('analytics.teams', args, 'admin') != cache.make_key('analytics.teams', args, 'employee')
+    assert cache.make_key('analytics.teams', args, 'admin') == \
+        cache.make_key('analytics.teams', MultiDict([('team_id', '2'), ('days', '7')]), 'admin')
+
+    key = cache.make_key('analytics.teams', args, 'admin')
+    cache.bump()
+    assert cache.make_key('analytics.teams', args, 'admin') != key
+
+
+def test_memory_backend_evicts_and_expires(clock):
+    backend = MemoryCacheBackend(max_entries=2)
+
+    backend.set('a', 1, ttl=10)
+    backend.set('b', 2, ttl=10)
+    assert backend.get('a') == 1
+    backend.set('c', 3, ttl=10)
+    assert backend.get('b') is None
+    assert backend.get('a') == 1
+
+    clock.advance(11)
+    assert backend.get('a') is None
+    assert backend.get('c') is None
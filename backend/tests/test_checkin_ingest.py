@@ -0,0 +1,150 @@
+"""Bulk check-in ingestion: conflicts, validation, rollups and partial failures"""
+from datetime import date, timedelta
+
+import pytest
+
+from models.user import db
+from models.checkin import CheckIn
+from services.rollups import find_rollup_drift
+
+DAY = (date.today() - timedelta(days=3)).isoformat()
+
+
+@pytest.fixture
+def existing(org):
+    """One stored check-in, with every optional field set, for the first employee"""
+    checkin = CheckIn(user_id=org.employees[0].id, check_in_date=date.fromisoformat(DAY), mood_rating=2,
+                      project_id=org.projects[0].id, comment='Busy week', work_load_rating=4, stress_level=3)
+    db.session.add(checkin)
+    db.session.commit()
+    return checkin
+
+
+def ingest(client, org, auth_headers, rows, on_conflict=None):
+    url = '/api/checkins/bulk' + (f'?on_conflict={on_conflict}' if on_conflict else '')
+    return client.post(url, headers=auth_headers(org.admin), json={'checkins': rows})
+
+
+def stored(user_id):
+    db.session.expire_all()
+    return CheckIn.query.filter_by(user_id=user_id, check_in_date=date.fromisoformat(DAY)).one()
+
+
+def test_skip_keeps_existing_check_ins(client, org, existing, auth_headers):
+    response = ingest(client, org, auth_headers, [
+        {'user_id': org.employees[0].id, 'check_in_date': DAY, 'mood_rating': 5},
+        {'email': org.employees[1].email, 'check_in_date': DAY, 'mood_rating': 4},
+    ])
+    assert response.status_code == 200, response.get_json()
+    result = response.get_json()
+    assert (result['inserted'], result['updated'], result['skipped'], result['failed']) == (1, 0, 1, 0)
+    assert stored(org.employees[0].id).mood_rating == 2
+    assert stored(org.employees[1].id).mood_rating == 4
+    assert find_rollup_drift() == []
+
+
+def test_update_changes_only_the_fields_a_row_includes(client, org, existing, auth_headers):
+    response = ingest(client, org, auth_headers, [
+        {'user_id': org.employees[0].id, 'check_in_date': DAY, 'mood_rating': 5, 'stress_level': None},
+    ], on_conflict='update')
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['updated'] == 1
+
+    checkin = stored(org.employees[0].id)
+    assert checkin.mood_rating == 5
+    assert checkin.stress_level is None
+    assert (checkin.project_id, checkin.comment, checkin.work_load_rating) == (org.projects[0].id, 'Busy week', 4)
+    assert find_rollup_drift() == []
+
+
+def test_update_from_csv_with_mixed_columns(client, org, existing, auth_headers):
+    body = (
+        'user_id,check_in_date,mood_rating,project_id\n'
+        f'{org.employees[0].id},{DAY},3,\n'
+        f'{org.employees[2].id},{DAY},4,{org.projects[1].id}\n'
+    )
+    response = client.post('/api/checkins/bulk?on_conflict=update', headers=auth_headers(org.admin),
+                           data=body, content_type='text/csv')
+    assert response.status_code == 200, response.get_json()
+    assert (response.get_json()['inserted'], response.get_json()['updated']) == (1, 1)
+
+    checkin = stored(org.employees[0].id)
+    assert (checkin.mood_rating, checkin.project_id, checkin.comment) == (3, None, 'Busy week')
+    assert stored(org.employees[2].id).project_id == org.projects[1].id
+    assert find_rollup_drift() == []
+
+
+def test_invalid_rows_are_reported_and_the_rest_written(client, org, auth_headers):
+    future = (date.today() + timedelta(days=1)).isoformat()
+    user_id = org.employees[0].id
+    response = ingest(client, org, auth_headers, [
+        {'user_id': user_id, 'check_in_date': DAY, 'mood_rating': 4},
+        {'user_id': user_id, 'check_in_date': DAY, 'mood_rating': 9},
+        {'user_id': user_id, 'check_in_date': 'yesterday', 'mood_rating': 3},
+        {'user_id': user_id, 'check_in_date': future, 'mood_rating': 3},
+        {'check_in_date': DAY, 'mood_rating': 3},
+        {'email': 'nobody@example.com', 'check_in_date': DAY, 'mood_rating': 3},
+        {'user_id': org.employees[1].id, 'check_in_date': DAY, 'mood_rating': 3, 'project_id': 999},
+        {'user_id': org.employees[1].id, 'check_in_date': DAY, 'mood_rating': 3, 'stress_level': 'high'},
+        {'user_id': user_id, 'check_in_date': DAY, 'mood_rating': 5},
+    ])
+    assert response.status_code == 200, response.get_json()
+    result = response.get_json()
+    assert (result['received'], result['inserted'], result['failed']) == (9, 1, 8)
+    assert {error['row']: error['error'] for error in result['errors']} == {
+        2: 'mood_rating must be between 1 and 5',
+        3: 'check_in_date must be an ISO date (YYYY-MM-DD)',
+        4: 'check_in_date cannot be in the future',
+        5: 'user_id or email is required',
+        6: 'Unknown user',
+        7: 'Unknown project_id: 999',
+        8: 'stress_level must be an integer',
+        9: 'Duplicate user and date in batch',
+    }
+    assert stored(user_id).mood_rating == 4
+
+
+def test_upserts_keep_rollups_consistent(client, org, existing, auth_headers):
+    rows = [
+        {'user_id': employee.id, 'check_in_date': (date.today() - timedelta(days=day)).isoformat(),
+         'mood_rating': (day + n) % 5 + 1, 'project_id': org.projects[n // 2].id if day % 2 else None,
+         'work_load_rating': 3}
+        for n, employee in enumerate(org.employees) for day in range(1, 6)
+    ]
+    assert ingest(client, org, auth_headers, rows).status_code == 200
+    assert find_rollup_drift() == []
+
+    changes = [{'user_id': row['user_id'], 'check_in_date': row['check_in_date'], 'mood_rating': 1,
+                'work_load_rating': None} for row in rows[::3]]
+    response = ingest(client, org, auth_headers, changes, on_conflict='update')
+    assert response.get_json()['updated'] == len(changes)
+    assert find_rollup_drift() == []
+
+
+def test_failed_chunk_reports_what_was_written(app, client, org, auth_headers, monkeypatch):
+    import services.checkin_ingest
+
+    write_chunk = services.checkin_ingest._write_chunk
+    calls = []
+
+    def failing_second_chunk(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError('connection lost')
+        return write_chunk(*args)
+
+    monkeypatch.setattr(services.checkin_ingest, '_write_chunk', failing_second_chunk)
+    app.config['CHECKIN_INGEST_CHUNK_SIZE'] = 2
+    version = app.extensions['response_cache'].data_version()
+
+    rows = [{'user_id': employee.id, 'check_in_date': DAY, 'mood_rating': 3} for employee in org.employees]
+    rows.insert(1, {'user_id': org.employees[0].id, 'check_in_date': DAY, 'mood_rating': 0})
+    response = ingest(client, org, auth_headers, rows)
+
+    assert response.status_code == 500
+    result = response.get_json()
+    assert result['error'] == 'connection lost'
+    assert (result['inserted'], result['failed'], result['resume_from_row']) == (2, 1, 4)
+    assert CheckIn.query.count() == 2
+    assert app.extensions['response_cache'].data_version() == version + 1
+    assert find_rollup_drift() == []
@@ -0,0 +1,73 @@
+"""Check-in listings serialize users and projects without a query per row"""
+from datetime import date, timedelta
+
+import pytest
+
+from models.user import db
+from models.checkin import CheckIn
+
+
+@pytest.fixture
+def checkins(app, org):
+    """Six days of check-ins per employee, every other one on a project"""
+    # Keep the periodic revocation sync out of the counts
+    revocations = app.extensions['token_revocations']
+    revocations.sync_interval = 3600
+    revocations.is_revoked(0, 0)
+    today = date.today()
+    db.session.add_all(
+        CheckIn(user_id=employee.id, check_in_date=today - timedelta(days=day), mood_rating=3,
+                project_id=org.projects[n // 2].id if day % 2 == 0 else None)
+        for n, employee in enumerate(org.employees) for day in range(6)
+    )
+    db.session.commit()
+    return org
+
+
+def expected_names(org):
+    users = {employee.id: f'{employee.first_name} {employee.last_name}' for employee in org.employees}
+    projects = {project.id: project.title for project in org.projects}
+    return users, projects
+
+
+def fetch(client, count_statements, headers, path, **args):
+    db.session.expire_all()
+    with count_statements() as statements:
+        response = client.get(path, headers=headers, query_string=args)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json(), len(statements)
+
+
+@pytest.mark.parametrize('path, role', [
+    ('/api/checkins/', 'admin'),
+    ('/api/checkins/my-checkins', 'employee'),
+])
+@pytest.mark.parametrize('mode', [{}, {'cursor': ''}])
+def test_page_size_does_not_change_the_statement_count(client, count_statements, checkins, auth_headers, path, role, mode):
+    headers = auth_headers(checkins.admin if role == 'admin' else checkins.employees[0])
+    users, projects = expected_names(checkins)
+
+    small, small_count = fetch(client, count_statements, headers, path, per_page=2, **mode)
+    large, large_count = fetch(client, count_statements, headers, path, per_page=50, **mode)
+
+    assert len(small['checkins']) == 2
+    assert len(large['checkins']) > len(small['checkins'])
+    assert large_count == small_count
+    for checkin in large['checkins']:
+        assert checkin['user_name'] == users[checkin['user_id']]
+        assert checkin['project_title'] == projects.get(checkin['project_id'])
+
+
+def test_weekly_summary_serializes_every_checkin(client, count_statements, checkins, auth_headers):
+    headers = auth_headers(checkins.admin)
+    users, projects = expected_names(checkins)
+
+    body, statements = fetch(client, count_statements, headers, '/api/checkins/weekly-summary')
+    week_start = date.today() - timedelta(days=date.today().weekday())
+    in_week = CheckIn.query.filter(CheckIn.check_in_date >= week_start).count()
+
+    assert body['summary']['total_checkins'] == len(body['checkins']) == in_week
+    assert statements <= 2
+    for checkin in body['checkins']:
+        assert checkin['user_name'] == users[checkin['user_id']]
+        assert checkin['project_title'] == projects.get(checkin['project_id'])
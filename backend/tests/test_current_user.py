@@ -0,0 +1,94 @@
+"""The authenticated user is loaded once per request and, optionally, cached across requests"""
+import pytest
+
+from config import TestingConfig
+from models.user import db
+
+
+@pytest.fixture
+def user_cache(monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'AUTH_USER_CACHE_TTL', 60)
+
+
+def fresh_session():
+    """Forget the users the test loaded, as a new request's session would"""
+    db.session.expunge_all()
+
+
+def user_lookups(statements):
+    return [statement for statement in statements if 'FROM users' in statement and 'users.id = ?' in statement]
+
+
+def profile(client, headers):
+    response = client.get('/api/users/profile', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['user']
+
+
+def test_decorator_and_route_share_one_lookup(app, client, org, auth_headers, count_statements):
+    assert app.extensions['user_cache'] is None
+    headers = auth_headers(org.employees[0])
+
+    for _ in range(2):
+        fresh_session()
+        with count_statements() as statements:
+            response = client.get('/api/projects/', headers=headers)
+        assert response.status_code == 200
+        assert len(user_lookups(statements)) == 1
+
+
+@pytest.mark.usefixtures('user_cache')
+def test_cached_user_skips_the_lookup(app, client, org, auth_headers, count_statements):
+    assert app.extensions['user_cache'] is not None
+    headers = auth_headers(org.employees[0])
+    client.get('/api/projects/', headers=headers)
+
+    fresh_session()
+    with count_statements() as statements:
+        response = client.get('/api/projects/', headers=headers)
+    assert response.status_code == 200
+    assert user_lookups(statements) == []
+
+
+@pytest.mark.usefixtures('user_cache')
+def test_cache_expires(client, org, auth_headers, count_statements, clock):
+    headers = auth_headers(org.employees[0])
+    profile(client, headers)
+    clock.advance(61)
+
+    fresh_session()
+    with count_statements() as statements:
+        profile(client, headers)
+    assert len(user_lookups(statements)) == 1
+
+
+@pytest.mark.usefixtures('user_cache')
+def test_user_update_invalidates_the_cache(client, org, auth_headers):
+    employee = org.employees[0]
+    headers = auth_headers(employee)
+    assert profile(client, headers)['first_name'] == 'User'
+
+    response = client.put(f'/api/users/{employee.id}', headers=auth_headers(org.admin), json={'first_name': 'Renamed'})
+    assert response.status_code == 200
+    assert profile(client, headers)['first_name'] == 'Renamed'
+
+
+@pytest.mark.usefixtures('user_cache')
+def test_profile_update_invalidates_the_cache(client, org, auth_headers):
+    headers = auth_headers(org.employees[0])
+    profile(client, headers)
+
+    response = client.put('/api/users/profile', headers=headers, json={'last_name': 'Updated'})
+    assert response.status_code == 200
+    assert profile(client, headers)['last_name'] == 'Updated'
+
+
+@pytest.mark.usefixtures('user_cache')
+def test_team_move_invalidates_the_cache(client, org, auth_headers):
+    employee = org.employees[0]
+    headers = auth_headers(employee)
+    assert profile(client, headers)['team_id'] == org.teams[0].id
+
+    response = client.post(f'/api/teams/{org.teams[1].id}/members/{employee.id}', headers=auth_headers(org.admin))
+    assert response.status_code == 200
+    assert profile(client, headers)['team_id'] == org.teams[1].id
@@ -0,0 +1,121 @@
+"""Engine options from the DB_* settings, analytics statement timeouts and pool stats"""
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+import services.database as database
+from config import TestingConfig
+from models.user import User, db
+from services.database import TimedQueuePool, configure_engine_options
+
+
+def engine_options(uri, **settings):
+    app = Flask(__name__)
+    if uri is not None:
+        app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config.update(settings)
+    configure_engine_options(app)
+    return app.config.get('SQLALCHEMY_ENGINE_OPTIONS')
+
+
+def test_no_database_url_leaves_the_options_alone():
+    assert engine_options(None) is None
+    assert engine_options('') is None
+
+
+def test_postgres_pool_and_statement_timeout():
+    options = engine_options(
+        'postgresql://user@db/teampulse', DB_POOL_SIZE=3, DB_MAX_OVERFLOW=1, DB_POOL_TIMEOUT=2,
+        DB_POOL_RECYCLE=60, DB_STATEMENT_TIMEOUT_MS=15000
+    )
+    assert options == {
+        'pool_pre_ping': True,
+        'poolclass': TimedQueuePool,
+        'pool_size': 3,
+        'max_overflow': 1,
+        'pool_timeout': 2,
+        'pool_recycle': 60,
+        'connect_args': {'options': '-c statement_timeout=15000'},
+    }
+
+
+def test_explicit_options_win():
+    options = engine_options('postgresql://user@db/teampulse', SQLALCHEMY_ENGINE_OPTIONS={'pool_size': 20})
+    assert options['pool_size'] == 20
+    assert 'connect_args' not in options
+
+
+def test_in_memory_sqlite_has_no_pool_to_size():
+    assert engine_options('sqlite://', DB_STATEMENT_TIMEOUT_MS=15000) == {'pool_pre_ping': True}
+
+
+@pytest.fixture
+def timeouts(app, monkeypatch):
+    """Statement timeouts set per connection; SQLite has none, so record them instead"""
+    app.config['DB_ANALYTICS_STATEMENT_TIMEOUT_MS'] = 60000
+    recorded = []
+    monkeypatch.setattr(database, '_set_local_timeout', lambda connection, timeout_ms: recorded.append(timeout_ms))
+    return recorded
+
+
+def test_analytics_routes_get_the_longer_timeout(app, client, org, auth_headers, timeouts):
+    app.extensions['response_cache'] = None
+    headers = auth_headers(org.admin)
+
+    assert client.get('/api/teams/', headers=headers).status_code == 200
+    assert timeouts == []
+
+    for path in ('/api/analytics/teams', '/api/analytics/dashboard'):
+        timeouts.clear()
+        assert client.get(path, headers=headers).status_code == 200
+        assert timeouts == [60000]
+
+
+def test_timeout_applies_to_a_transaction_already_begun(app, timeouts):
+    with app.test_request_context():
+        db.session.execute(text('SELECT 1'))
+        database.use_statement_timeout(5000)
+        assert timeouts == [5000]
+        db.session.rollback()
+
+
+def test_set_local_timeout_is_postgres_only():
+    class Connection:
+        def __init__(self, dialect):
+            self.dialect = type('Dialect', (), {'name': dialect})
+            self.statements = []
+
+        def exec_driver_sql(self, statement):
+            self.statements.append(statement)
+
+    postgres, sqlite = Connection('postgresql'), Connection('sqlite')
+    database._set_local_timeout(postgres, 60000)
+    database._set_local_timeout(sqlite, 60000)
+    assert postgres.statements == ['SET LOCAL statement_timeout = 60000']
+    assert sqlite.statements == []
+
+
+def test_pool_stats(tmp_path, monkeypatch, auth_headers):
+    from app import create_app
+
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'pool.db'}")
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        admin = User(email='admin@example.com', password='password123', first_name='Admin', last_name='User',
+                     role='admin')
+        db.session.add(admin)
+        db.session.commit()
+
+        response = app.test_client().get('/api/system/db-pool', headers=auth_headers(admin))
+        assert response.status_code == 200
+        stats = response.get_json()['engines']['default']
+        assert stats['pool'] == 'TimedQueuePool'
+        assert stats['size'] == TestingConfig.DB_POOL_SIZE
+        assert stats['checkouts'] >= 1
+        assert stats['timeouts'] == 0
+        assert stats['wait_ms']['max'] is not None
+
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
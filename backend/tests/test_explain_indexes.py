@@ -0,0 +1,70 @@
+"""The check-in and team filters use their supporting indexes"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import sqlite
+
+from config import TestingConfig
+from models.user import User, db
+from models.checkin import CheckIn
+from models.team import Team
+
+INDEX_COLUMNS = {
+    'uq_checkins_user_id_check_in_date': ('checkins', ['user_id', 'check_in_date'], True),
+    'ix_checkins_check_in_date': ('checkins', ['check_in_date'], False),
+    'ix_checkins_project_id_check_in_date': ('checkins', ['project_id', 'check_in_date'], False),
+    'ix_users_team_id': ('users', ['team_id'], False),
+}
+
+
+def filter_queries():
+    start, end = date.today() - timedelta(days=30), date.today()
+    return [
+        pytest.param('ix_checkins_check_in_date',
+                     select(CheckIn.id).where(CheckIn.check_in_date >= start, CheckIn.check_in_date <= end),
+                     id='check-ins in a date range'),
+        pytest.param('ix_checkins_project_id_check_in_date',
+                     select(CheckIn.id).where(CheckIn.project_id == 1, CheckIn.check_in_date >= start),
+                     id='check-ins of a project in a date range'),
+        pytest.param('uq_checkins_user_id_check_in_date',
+                     select(CheckIn.id).where(CheckIn.user_id == 2, CheckIn.check_in_date == end),
+                     id="a user's check-in for a day"),
+        pytest.param('ix_users_team_id', select(User.id).where(User.team_id == 1), id='members of a team'),
+        pytest.param('ix_users_team_id', select(Team.id, Team.member_count), id='team member counts'),
+    ]
+
+
+def query_plan(statement):
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+
+@pytest.mark.parametrize('index, statement', filter_queries())
+def test_filter_uses_its_index(app, index, statement):
+    plan = query_plan(statement)
+    assert any(index in line for line in plan), plan
+
+
+def test_migrations_create_the_filter_indexes(tmp_path, monkeypatch):
+    from app import create_app
+
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'indexes.db'}")
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        for name in INDEX_COLUMNS:
+            db.session.execute(text(f'DROP INDEX {name}'))
+        db.session.commit()
+        db.session.remove()
+
+        result = app.test_cli_runner().invoke(args=['init-db'])
+        assert result.exit_code == 0, result.output
+
+        inspector = db.inspect(db.engine)
+        for name, (table, columns, unique) in INDEX_COLUMNS.items():
+            index = next(index for index in inspector.get_indexes(table) if index['name'] == name)
+            assert index['column_names'] == columns
+            assert bool(index['unique']) == unique
+        db.session.remove()
+        db.engine.dispose()
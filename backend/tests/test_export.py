@@ -0,0 +1,83 @@
+"""GET /api/checkins/export streams CSV or NDJSON, optionally gzipped"""
+import csv
+import gzip
+import io
+import json
+from datetime import date, timedelta
+
+import pytest
+
+import routes.checkin_routes as checkin_routes
+from models.user import db
+from models.checkin import CheckIn
+
+
+@pytest.fixture
+def checkins(org, monkeypatch):
+    """Five days of check-ins per employee, streamed in chunks of two rows"""
+    monkeypatch.setattr(checkin_routes, 'EXPORT_BATCH_SIZE', 2)
+    today = date.today()
+    db.session.add_all(
+        CheckIn(user_id=employee.id, check_in_date=today - timedelta(days=day), mood_rating=day + 1,
+                project_id=org.projects[n // 2].id if day % 2 else None, comment=f'day, "{day}"\nnotes')
+        for n, employee in enumerate(org.employees) for day in range(5)
+    )
+    db.session.commit()
+    return CheckIn.query.order_by(CheckIn.check_in_date.desc(), CheckIn.id.desc()).all()
+
+
+def export(client, headers, **args):
+    response = client.get('/api/checkins/export', headers=headers, query_string=args)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.is_streamed
+    return response
+
+
+def test_csv(client, org, checkins, auth_headers):
+    response = export(client, auth_headers(org.admin))
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=checkins.csv'
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [int(row['id']) for row in rows] == [checkin.id for checkin in checkins]
+    assert rows[0]['comment'] == checkins[0].comment
+    assert rows[0]['user_name'] == f'{checkins[0].user.first_name} {checkins[0].user.last_name}'
+    assert {row['project_title'] for row in rows} == {'', 'Project 0', 'Project 1'}
+
+
+def test_ndjson_with_filters(client, org, checkins, auth_headers):
+    start = (date.today() - timedelta(days=1)).isoformat()
+    response = export(client, auth_headers(org.admin), format='ndjson', team_id=org.teams[1].id, start_date=start)
+    assert response.mimetype == 'application/x-ndjson'
+
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    expected = [
+        checkin for checkin in checkins
+        if checkin.user.team_id == org.teams[1].id and checkin.check_in_date.isoformat() >= start
+    ]
+    assert [row['id'] for row in rows] == [checkin.id for checkin in expected]
+    assert len(rows) == 4
+    assert rows[0]['check_in_date'] == checkins[0].check_in_date.isoformat()
+
+
+@pytest.mark.parametrize('export_format', ['csv', 'ndjson'])
+def test_gzip(client, org, checkins, auth_headers, export_format):
+    headers = auth_headers(org.admin)
+    plain = export(client, headers, format=export_format).get_data()
+    response = export(client, headers, format=export_format, gzip='true')
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == plain
+
+
+def test_empty_export_has_only_the_header(client, org, auth_headers):
+    body = export(client, auth_headers(org.admin)).get_data(as_text=True)
+    assert body.splitlines() == [','.join(checkin_routes.EXPORT_COLUMNS)]
+    assert export(client, auth_headers(org.admin), format='ndjson').get_data() == b''
+
+
+def test_rejected_requests(client, org, auth_headers):
+    response = client.get('/api/checkins/export?format=xml', headers=auth_headers(org.admin))
+    assert response.status_code == 400
+    response = client.get('/api/checkins/export', headers=auth_headers(org.employees[0]))
+    assert response.status_code == 403
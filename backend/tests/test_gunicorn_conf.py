@@ -0,0 +1,86 @@
+"""gunicorn.conf.py: preload in the master, fresh pools and checks in each worker"""
+import gc
+import importlib.util
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import app as app_module
+from models.user import db
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+@pytest.fixture
+def load_conf(monkeypatch):
+    """Load gunicorn.conf.py under the given environment, restoring the collector afterwards"""
+    def load(**env):
+        for name in ('GUNICORN_PRELOAD', 'GUNICORN_THREADS', 'GUNICORN_WORKER_CLASS'):
+            monkeypatch.delenv(name, raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        spec = importlib.util.spec_from_file_location('gunicorn_conf', CONF_PATH)
+        conf = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(conf)
+        return conf
+    yield load
+    gc.unfreeze()
+    gc.enable()
+
+
+@pytest.fixture
+def served_app(app, monkeypatch):
+    """Make the hooks' ``from app import app`` find the test app"""
+    monkeypatch.setattr(app_module, 'app', app)
+    return app
+
+
+def worker(workers):
+    return SimpleNamespace(cfg=SimpleNamespace(workers=workers))
+
+
+def test_defaults(load_conf):
+    conf = load_conf()
+    assert conf.preload_app is True
+    assert conf.worker_class == 'gthread'
+    assert conf.threads == 4
+
+
+def test_collector_is_paused_while_loading_and_frozen_before_forking(load_conf):
+    conf = load_conf()
+    assert not gc.isenabled()
+
+    conf.when_ready(server=None)
+    assert gc.isenabled()
+    assert gc.get_freeze_count() > 0
+
+
+def test_post_fork_gives_the_worker_new_pools(load_conf, served_app):
+    conf = load_conf()
+    pools = {engine: engine.pool for engine in db.engines.values()}
+
+    conf.post_fork(server=None, worker=worker(2))
+    assert all(engine.pool is not pool for engine, pool in pools.items())
+
+
+def test_without_preload_nothing_is_shared(load_conf, served_app):
+    conf = load_conf(GUNICORN_PRELOAD='false', GUNICORN_THREADS='8', GUNICORN_WORKER_CLASS='sync')
+    assert conf.preload_app is False
+    assert conf.threads == 8
+    assert conf.worker_class == 'sync'
+    assert gc.isenabled()
+
+    pools = {engine: engine.pool for engine in db.engines.values()}
+    conf.post_fork(server=None, worker=worker(2))
+    assert all(engine.pool is pool for engine, pool in pools.items())
+
+
+def test_post_worker_init_switches_off_per_process_caches(load_conf, served_app):
+    conf = load_conf()
+
+    conf.post_worker_init(worker(1))
+    assert served_app.extensions['response_cache'] is not None
+
+    conf.post_worker_init(worker(3))
+    assert served_app.extensions['response_cache'] is None
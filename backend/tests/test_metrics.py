@@ -0,0 +1,118 @@
+"""Request metrics for buffered and streamed responses and the /metrics output"""
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from config import TestingConfig
+from models.user import User, db
+from models.checkin import CheckIn
+from services.metrics import get_metrics
+
+
+@pytest.fixture
+def admin(app):
+    admin = User(email='admin@example.com', password='password123', first_name='Admin', last_name='User', role='admin')
+    db.session.add(admin)
+    db.session.flush()
+    db.session.add_all([
+        CheckIn(user_id=admin.id, mood_rating=4, check_in_date=date.today() - timedelta(days=n)) for n in range(30)
+    ])
+    db.session.commit()
+    return admin
+
+
+def _endpoint_metrics(endpoint):
+    return get_metrics()._endpoints[(endpoint, 'GET')]
+
+
+def test_streamed_export_is_recorded_on_close(client, admin, auth_headers):
+    response = client.get('/api/checkins/export', headers=auth_headers(admin))
+    assert response.status_code == 200
+    timing = response.headers['Server-Timing']
+    assert 'before streaming' in timing
+    before_streaming = int(timing.split('desc="')[1].split(' ')[0])
+    body = response.get_data()
+    assert ('checkins.export_checkins', 'GET') not in get_metrics()._endpoints
+
+    response.close()
+    metrics = _endpoint_metrics('checkins.export_checkins')
+    assert metrics.response_size.sum == len(body)
+    assert metrics.statements.sum > before_streaming
+    assert metrics.status == {200: 1}
+
+
+def test_buffered_response_is_recorded_in_after_request(client, admin, auth_headers):
+    response = client.get('/api/checkins/', headers=auth_headers(admin))
+    assert response.status_code == 200
+    metrics = _endpoint_metrics('checkins.get_checkins')
+    assert metrics.response_size.sum == len(response.get_data())
+    assert metrics.statements.sum >= 1
+
+
+def _samples(text):
+    """Prometheus text lines as {'name{labels}': value}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_endpoint(client, admin, auth_headers):
+    headers = auth_headers(admin)
+    for _ in range(3):
+        assert client.get('/api/checkins/', headers=headers).status_code == 200
+    assert client.get('/api/teams/9999', headers=headers).status_code == 404
+
+    response = client.get('/metrics', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert '# TYPE teampulse_http_requests_total counter' in text
+    assert '# TYPE teampulse_http_request_duration_seconds histogram' in text
+
+    samples = _samples(text)
+    labels = f'endpoint="checkins.get_checkins",method="GET",pid="{os.getpid()}"'
+    assert samples[f'teampulse_http_requests_total{{{labels},status="200"}}'] == 3
+    assert samples[f'teampulse_http_request_duration_seconds_count{{{labels}}}'] == 3
+    assert samples[f'teampulse_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 3
+    assert samples[f'teampulse_http_request_sql_statements_sum{{{labels}}}'] >= 3
+    assert samples[f'teampulse_http_request_sql_seconds_total{{{labels}}}'] > 0
+    assert samples[f'teampulse_http_response_size_bytes_count{{{labels}}}'] == 3
+
+    buckets = [value for name, value in samples.items()
+               if name.startswith(f'teampulse_http_request_duration_seconds_bucket{{{labels}')]
+    assert buckets == sorted(buckets)
+
+    missing = f'endpoint="teams.get_team",method="GET",pid="{os.getpid()}"'
+    assert samples[f'teampulse_http_requests_total{{{missing},status="404"}}'] == 1
+
+
+def test_metrics_endpoint_is_admin_only(client, admin, auth_headers):
+    employee = User(email='employee@example.com', password='password123', first_name='E', last_name='E')
+    db.session.add(employee)
+    db.session.commit()
+    assert client.get('/metrics', headers=auth_headers(employee)).status_code == 403
+    assert client.get('/metrics').status_code == 401
+
+
+def test_buffered_response_has_server_timing(client, admin, auth_headers):
+    response = client.get('/api/checkins/', headers=auth_headers(admin))
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('app;dur=')
+    assert 'db;dur=' in timing and 'queries"' in timing
+    assert 'before streaming' not in timing
+
+
+@pytest.fixture
+def metrics_disabled(monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'METRICS_ENABLED', False)
+
+
+@pytest.mark.usefixtures('metrics_disabled')
+def test_metrics_can_be_disabled(client, admin, auth_headers):
+    response = client.get('/api/checkins/', headers=auth_headers(admin))
+    assert 'Server-Timing' not in response.headers
+    assert client.get('/metrics', headers=auth_headers(admin)).status_code == 404
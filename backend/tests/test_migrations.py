@@ -0,0 +1,103 @@
+"""``flask init-db`` against a database created before the current migrations"""
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from config import TestingConfig
+
+
+@pytest.fixture
+def existing_app(tmp_path, monkeypatch):
+    """App on a SQLite file whose schema predates the unique check-in index"""
+    from app import create_app
+    from models.user import db
+
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'existing.db'}")
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        db.session.execute(text('DROP INDEX uq_checkins_user_id_check_in_date'))
+        db.session.commit()
+        db.session.remove()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_init_db_adds_unique_index(existing_app):
+    from models.user import db
+
+    result = existing_app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+
+    indexes = {index['name'] for index in db.inspect(db.engine).get_indexes('checkins')}
+    assert 'uq_checkins_user_id_check_in_date' in indexes
+    assert db.session.execute(text('SELECT version_num FROM alembic_version')).scalar()
+
+
+def test_checkin_upserts_on_migrated_schema(existing_app, auth_headers):
+    from models.user import User
+
+    result = existing_app.test_cli_runner().invoke(args=['init-db', '--seed'])
+    assert result.exit_code == 0, result.output
+
+    client = existing_app.test_client()
+    employee = User.query.filter_by(role='employee').first()
+    admin = User.query.filter_by(role='admin').first()
+
+    response = client.post('/api/checkins/', headers=auth_headers(employee), json={'mood_rating': 4})
+    assert response.status_code == 201, response.get_json()
+    response = client.post('/api/checkins/', headers=auth_headers(employee), json={'mood_rating': 2})
+    assert response.status_code == 409, response.get_json()
+
+    rows = [{'user_id': employee.id, 'check_in_date': date.today().isoformat(), 'mood_rating': 5}]
+    response = client.post('/api/checkins/bulk?on_conflict=update', headers=auth_headers(admin), json=rows)
+    assert response.status_code == 200, response.get_json()
+    assert client.get('/api/checkins/my-checkins', headers=auth_headers(employee)).get_json()['checkins'][0]['mood_rating'] == 5
+
+
+def test_init_db_backfills_rollups(existing_app):
+    from models.user import db
+    from services.rollups import find_rollup_drift
+
+    # Check-ins written before the rollup table existed
+    db.session.execute(text(
+        "INSERT INTO users (id, email, password_hash, first_name, last_name, role, is_active, created_at, updated_at) "
+        "VALUES (1, 'old@example.com', 'x', 'Old', 'User', 'employee', 1, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+    ))
+    for day, mood, stress in (('2026-01-05', 4, 2), ('2026-01-06', 2, None)):
+        db.session.execute(text(
+            'INSERT INTO checkins (user_id, check_in_date, mood_rating, stress_level, created_at, updated_at) '
+            'VALUES (1, :day, :mood, :stress, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)'
+        ), {'day': day, 'mood': mood, 'stress': stress})
+    db.session.execute(text('DROP TABLE checkin_daily_rollups'))
+    db.session.commit()
+
+    result = existing_app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+
+    assert db.session.execute(text('SELECT SUM(checkin_count) FROM checkin_daily_rollups')).scalar() == 2
+    assert find_rollup_drift() == []
+
+
+def test_init_db_reports_removed_duplicates(existing_app):
+    from models.user import db
+
+    db.session.execute(text(
+        "INSERT INTO users (id, email, password_hash, first_name, last_name, role, is_active, created_at, updated_at) "
+        "VALUES (1, 'old@example.com', 'x', 'Old', 'User', 'employee', 1, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+    ))
+    for mood in (4, 2, 3):
+        db.session.execute(text(
+            'INSERT INTO checkins (user_id, check_in_date, mood_rating, created_at, updated_at) '
+            "VALUES (1, '2026-01-05', :mood, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ), {'mood': mood})
+    db.session.commit()
+
+    result = existing_app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+
+    assert 'Removed 2 duplicate check-ins' in result.output
+    assert db.session.execute(text('SELECT mood_rating FROM checkins')).scalars().all() == [4]
@@ -0,0 +1,107 @@
+"""Keyset walks, per_page clamping and cursor validation on list endpoints"""
+import base64
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from models.user import User, db
+from models.checkin import CheckIn
+from services.pagination import encode_cursor
+
+
+@pytest.fixture
+def admin(app):
+    admin = User(email='admin@example.com', password='password123', first_name='Admin', last_name='User', role='admin')
+    db.session.add(admin)
+    db.session.add_all([
+        User(email=f'user{n}@example.com', password='password123', first_name='User', last_name=str(n))
+        for n in range(5)
+    ])
+    db.session.commit()
+    return admin
+
+
+def _cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+
+@pytest.mark.parametrize('query', [
+    'per_page=0&cursor=',
+    'per_page=-5&cursor=',
+    'per_page=0&include_total=false',
+    'per_page=-5&include_total=false&page=2',
+    'per_page=-5'
+])
+def test_per_page_is_clamped(client, admin, auth_headers, query):
+    response = client.get(f'/api/users/?{query}', headers=auth_headers(admin))
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['pagination']['per_page'] == 1
+    assert len(body['users']) <= 1
+
+
+def test_per_page_has_a_maximum(app, client, admin, auth_headers):
+    app.config['PAGINATION_MAX_PER_PAGE'] = 2
+    response = client.get('/api/users/?per_page=1000&cursor=', headers=auth_headers(admin))
+    assert response.get_json()['pagination']['per_page'] == 2
+    assert len(response.get_json()['users']) == 2
+
+
+@pytest.mark.parametrize('path, payload', [
+    ('/api/users/', ['1']),
+    ('/api/users/', [True]),
+    ('/api/users/', [{'id': 1}]),
+    ('/api/checkins/', [5, 1]),
+    ('/api/checkins/', ['2026-01-01', 'x'])
+])
+def test_mistyped_cursor_is_rejected(client, admin, auth_headers, path, payload):
+    response = client.get(path, headers=auth_headers(admin), query_string={'cursor': _cursor(payload)})
+    assert response.status_code == 400, response.get_json()
+
+
+def test_cursor_round_trip(client, admin, auth_headers):
+    response = client.get('/api/users/', headers=auth_headers(admin),
+                          query_string={'cursor': encode_cursor([admin.id]), 'per_page': 2})
+    assert response.status_code == 200
+    assert all(user['id'] > admin.id for user in response.get_json()['users'])
+
+
+@pytest.mark.parametrize('path', ['/api/users/', '/api/projects/', '/api/checkins/', '/api/checkins/my-checkins'])
+@pytest.mark.parametrize('cursor', ['not a cursor', 'bm90IGpzb24', _cursor({'id': 1}), _cursor([])])
+def test_undecodable_cursor_is_rejected(client, admin, auth_headers, path, cursor):
+    response = client.get(path, headers=auth_headers(admin), query_string={'cursor': cursor})
+    assert response.status_code == 400, response.get_json()
+    assert 'Invalid cursor' in response.get_json()['message']
+
+
+def test_cursor_walk_matches_offset_pages(client, admin, auth_headers):
+    users = User.query.order_by(User.id).all()
+    today = date.today()
+    # Several check-ins share a date, so the id breaks ties
+    db.session.add_all(
+        CheckIn(user_id=user.id, check_in_date=today - timedelta(days=day // 2), mood_rating=3)
+        for day in range(7) for user in users[day % 2::2]
+    )
+    db.session.commit()
+    headers = auth_headers(admin)
+
+    walked, cursor, pages = [], '', 0
+    while cursor is not None:
+        body = client.get('/api/checkins/', headers=headers,
+                          query_string={'cursor': cursor, 'per_page': 4}).get_json()
+        assert body['pagination']['total'] is None
+        walked.extend(checkin['id'] for checkin in body['checkins'])
+        cursor, pages = body['pagination']['next_cursor'], pages + 1
+
+    offset = client.get('/api/checkins/', headers=headers, query_string={'per_page': 100}).get_json()
+    assert walked == [checkin['id'] for checkin in offset['checkins']]
+    assert len(walked) == offset['pagination']['total'] == CheckIn.query.count()
+    assert pages == -(-len(walked) // 4)
+
+
+def test_cursor_mode_total_is_opt_in(client, admin, auth_headers):
+    body = client.get('/api/users/', headers=auth_headers(admin),
+                      query_string={'cursor': '', 'per_page': 2, 'include_total': 'true'}).get_json()
+    assert body['pagination']['total'] == 6
+    assert body['pagination']['has_next']
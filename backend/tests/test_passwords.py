@@ -0,0 +1,31 @@
+"""Admission control of the bcrypt pool under concurrent callers"""
+import threading
+
+from models.user import bcrypt
+from services.passwords import PasswordHasher, PasswordHasherBusy
+
+
+def test_concurrent_callers_are_admitted_or_rejected(app):
+    hasher = PasswordHasher(rounds=4, workers=1, queue_limit=1, wait_timeout=5)
+    stored = bcrypt.generate_password_hash('secret', 8).decode('utf-8')
+    start = threading.Barrier(16)
+    outcomes = []
+
+    def call():
+        start.wait()
+        try:
+            outcomes.append(hasher.verify(stored, 'secret'))
+        except PasswordHasherBusy:
+            outcomes.append('busy')
+
+    threads = [threading.Thread(target=call) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = hasher.stats()['operations']['verify']
+    assert 'busy' in outcomes
+    assert stats['completed'] == outcomes.count(True)
+    assert stats['rejected'] == outcomes.count('busy')
+    assert stats['completed'] + stats['rejected'] == 16
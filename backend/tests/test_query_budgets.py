@@ -0,0 +1,142 @@
+"""Analytics and listing routes stay within their @query_budget as the data grows"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from config import TestingConfig
+from models.user import User, db
+from models.team import Team
+from models.project import Project, project_assignments
+from models.checkin import CheckIn
+from services.query_budget import get_query_budget
+
+# (path, role); {team} and {project} are the first team and project of the org fixture
+ROUTES = [
+    ('/api/analytics/dashboard-basic', 'employee'),
+    ('/api/analytics/dashboard', 'admin'),
+    ('/api/analytics/teams', 'admin'),
+    ('/api/analytics/projects', 'admin'),
+    ('/api/analytics/trends', 'admin'),
+    ('/api/users/', 'admin'),
+    ('/api/teams/', 'admin'),
+    ('/api/teams/{team}/members', 'admin'),
+    ('/api/projects/', 'admin'),
+    ('/api/projects/{project}/assigned-users', 'admin'),
+    ('/api/checkins/', 'admin'),
+    ('/api/checkins/?paginate=cursor', 'admin'),
+    ('/api/checkins/export', 'admin'),
+    ('/api/checkins/my-checkins', 'employee'),
+    ('/api/checkins/weekly-summary', 'admin'),
+]
+
+
+@pytest.fixture(autouse=True)
+def warn_over_budget(monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'QUERY_BUDGET_WARN', True)
+
+
+def add_checkins(users, days):
+    today = date.today()
+    db.session.add_all(
+        CheckIn(user_id=user.id, check_in_date=today - timedelta(days=day), mood_rating=(user.id + day) % 5 + 1,
+                project_id=project_id, work_load_rating=3, stress_level=day % 5 + 1)
+        for user, project_id in users for day in range(days)
+    )
+
+
+def grow(org, teams=4, users_per_team=4, days=8):
+    """Add teams, members, projects, assignments and check-ins, also to the org's first team and project"""
+    new_teams = [Team(name=f'Grown Team {n}') for n in range(teams)]
+    db.session.add_all(new_teams)
+    db.session.flush()
+    users, projects = [], []
+    for team in new_teams + [org.teams[0]]:
+        projects.append(Project(title=f'Grown Project {team.id}', team_id=team.id))
+        users.extend(
+            User(email=f'grown{team.id}.{n}@example.com', password='password123', first_name='Grown',
+                 last_name=str(n), team_id=team.id)
+            for n in range(users_per_team)
+        )
+    db.session.add_all(users + projects)
+    db.session.flush()
+    db.session.execute(project_assignments.insert(), [
+        {'project_id': project_id, 'user_id': user.id}
+        for user in users for project_id in (org.projects[0].id, projects[-1].id)
+    ])
+    add_checkins([(user, org.projects[0].id) for user in users], days)
+    existing_days = {checkin.check_in_date for checkin in CheckIn.query.filter_by(user_id=org.employees[0].id)}
+    today = date.today()
+    db.session.add_all(
+        CheckIn(user_id=org.employees[0].id, check_in_date=today - timedelta(days=day), mood_rating=3)
+        for day in range(days) if today - timedelta(days=day) not in existing_days
+    )
+    db.session.commit()
+
+
+@pytest.fixture
+def measure(app, client, org, auth_headers):
+    """Send a GET as a role and return how many SQL statements it ran"""
+    # Cached answers run no SQL, and the first request of a worker syncs revocations
+    app.extensions['response_cache'] = None
+    revocations = app.extensions['token_revocations']
+    revocations.sync_interval = 3600
+    revocations.is_revoked(0, 0)
+
+    add_checkins([(employee, org.projects[n // 2].id) for n, employee in enumerate(org.employees)], 2)
+    db.session.execute(project_assignments.insert(), [
+        {'project_id': org.projects[0].id, 'user_id': employee.id} for employee in org.employees[:2]
+    ])
+    db.session.commit()
+    headers = {'admin': auth_headers(org.admin), 'employee': auth_headers(org.employees[0])}
+
+    def run(path, role):
+        url = path.format(team=org.teams[0].id, project=org.projects[0].id)
+        statements = []
+        # Start each request from an empty identity map, like a fresh request would
+        db.session.expire_all()
+
+        def count(*args):
+            statements.append(args[2])
+
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            response = client.get(url, headers=headers[role])
+            response.get_data()
+            response.close()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        assert response.status_code == 200, response.get_data(as_text=True)[:200]
+        return len(statements)
+    return run
+
+
+def endpoint_of(app, path):
+    return app.url_map.bind('localhost').match(path.split('?')[0].format(team=1, project=1), method='GET')[0]
+
+
+@pytest.mark.parametrize('path, role', ROUTES)
+def test_route_stays_within_its_budget(app, org, measure, caplog, monkeypatch, path, role):
+    endpoint = endpoint_of(app, path)
+    budget = get_query_budget(app, endpoint)
+
+    small = measure(path, role)
+    grow(org)
+    large = measure(path, role)
+
+    assert large <= budget
+    assert large == small, f'{path} ran {small} statements on the small database and {large} on the larger one'
+    assert 'Query budget exceeded' not in caplog.text
+
+    # The same request against a budget it does not fit is reported
+    monkeypatch.setattr(app.view_functions[endpoint], 'query_budget', large - 1)
+    measure(path, role)
+    assert f'(budget {large - 1})' in caplog.text
+
+
+def test_every_route_declares_a_budget(app):
+    missing = [
+        rule.rule for rule in app.url_map.iter_rules()
+        if rule.endpoint != 'static' and get_query_budget(app, rule.endpoint) is None
+    ]
+    assert missing == []
@@ -0,0 +1,173 @@
+"""Read replica routing, read-your-writes and the analytics cache around it
+
+Two SQLite files stand in for the primary and a lagging replica: both start as
+copies of one database, then two teams are added to the replica only, and writes go
+to the primary only. Every answer therefore shows which database served it.
+"""
+import shutil
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from config import TestingConfig
+from models.user import User, db
+from models.team import Team
+from services.replica import REPLICA_BIND, check_replica_workers
+
+STICKY_SECONDS = 5
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    paths = SimpleNamespace(primary=tmp_path / 'primary.db', replica=tmp_path / 'replica.db')
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{paths.primary}')
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_REPLICA_URI', f'sqlite:///{paths.replica}')
+    monkeypatch.setattr(TestingConfig, 'REPLICA_STICKY_SECONDS', STICKY_SECONDS, raising=False)
+    return paths
+
+
+def create_worker():
+    """A separate app instance on the same databases, like another gunicorn worker"""
+    from app import create_app
+
+    return create_app('testing')
+
+
+@pytest.fixture
+def replica_app(databases):
+    app = create_worker()
+    with app.app_context():
+        db.create_all()
+        admin = User(email='admin@example.com', password='password123', first_name='Admin', last_name='User',
+                     role='admin')
+        reader = User(email='reader@example.com', password='password123', first_name='Other', last_name='Admin',
+                      role='admin')
+        db.session.add_all([admin, reader, Team(name='Shared Team')])
+        db.session.commit()
+        app.users = SimpleNamespace(**{
+            name: SimpleNamespace(id=user.id, email=user.email, role=user.role)
+            for name, user in (('admin', admin), ('reader', reader))
+        })
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+        shutil.copy(databases.primary, databases.replica)
+        with db.engines['replica'].begin() as connection:
+            connection.execute(Team.__table__.insert(), [{'name': 'Replica Only'}, {'name': 'Replica Extra'}])
+
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    # init_app registers an empty metadata per bind key on the shared db object;
+    # later apps without a replica would try to create_all on it
+    db.metadatas.pop(REPLICA_BIND, None)
+
+
+def team_names(client, headers):
+    response = client.get('/api/teams', headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return {team['name'] for team in response.get_json()['teams']}
+
+
+def primary_team_count():
+    return db.session.execute(text('SELECT COUNT(*) FROM teams')).scalar()
+
+
+def test_reads_use_the_replica(replica_app, auth_headers):
+    client = replica_app.test_client()
+    headers = auth_headers(replica_app.users.admin)
+
+    assert 'Replica Only' in team_names(client, headers)
+    assert client.get('/api/analytics/dashboard', headers=headers).get_json()['overview']['total_teams'] == 3
+
+
+def test_writer_reads_the_primary_within_the_sticky_window(replica_app, auth_headers, clock):
+    client = replica_app.test_client()
+    writer, reader = auth_headers(replica_app.users.admin), auth_headers(replica_app.users.reader)
+
+    assert client.post('/api/teams', headers=writer, json={'name': 'Written Team'}).status_code == 201
+    with db.engines['replica'].connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM teams WHERE name = 'Written Team'")).scalar() == 0
+
+    clock.advance(STICKY_SECONDS - 1)
+    assert team_names(client, writer) == {'Shared Team', 'Written Team'}
+    assert 'Replica Only' in team_names(client, reader)
+
+
+def test_writer_reads_the_replica_after_the_window(replica_app, auth_headers, clock):
+    client = replica_app.test_client()
+    writer = auth_headers(replica_app.users.admin)
+
+    assert client.post('/api/teams', headers=writer, json={'name': 'Written Team'}).status_code == 201
+    clock.advance(STICKY_SECONDS + 1)
+    assert 'Replica Only' in team_names(client, writer)
+
+
+def test_failed_write_does_not_stick(replica_app, auth_headers):
+    client = replica_app.test_client()
+    writer = auth_headers(replica_app.users.admin)
+
+    assert client.post('/api/teams', headers=writer, json={}).status_code == 400
+    assert 'Replica Only' in team_names(client, writer)
+
+
+def test_batch_reads_after_its_write_use_the_primary(replica_app, auth_headers):
+    client = replica_app.test_client()
+    response = client.post('/api/batch', headers=auth_headers(replica_app.users.admin), json={'requests': [
+        {'method': 'GET', 'path': '/api/teams'},
+        {'method': 'POST', 'path': '/api/teams', 'body': {'name': 'Batch Team'}},
+        {'method': 'GET', 'path': '/api/teams'},
+    ]})
+    assert response.status_code == 200, response.get_json()
+    before, _, after = (item['body'] for item in response.get_json()['responses'])
+    assert 'Replica Only' in {team['name'] for team in before['teams']}
+    assert {team['name'] for team in after['teams']} == {'Shared Team', 'Batch Team'}
+
+
+def test_cache_is_bypassed_while_sticky(replica_app, auth_headers, clock):
+    client = replica_app.test_client()
+    writer, reader = auth_headers(replica_app.users.admin), auth_headers(replica_app.users.reader)
+
+    def dashboard(headers):
+        response = client.get('/api/analytics/dashboard', headers=headers)
+        return response.get_json()['overview']['total_teams'], response.headers.get('X-Cache')
+
+    assert client.post('/api/teams', headers=writer, json={'name': 'Written Team'}).status_code == 201
+
+    # The writer skips the cache and reads the primary
+    assert dashboard(writer) == (primary_team_count(), None)
+    # Other users read the replica, whose answer may predate the write: not stored yet
+    assert dashboard(reader) == (3, 'MISS')
+    assert dashboard(reader) == (3, 'MISS')
+
+    clock.advance(STICKY_SECONDS + 1)
+    assert dashboard(reader) == (3, 'MISS')
+    assert dashboard(reader) == (3, 'HIT')
+    assert dashboard(writer) == (3, 'HIT')
+
+
+def test_write_on_one_worker_is_read_back_on_another(replica_app, auth_headers, fake_redis, monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'CACHE_BACKEND', 'shared')
+    monkeypatch.setattr('services.cache.shared_cache_client', lambda app: fake_redis)
+    first, second = create_worker(), create_worker()
+    writer = auth_headers(replica_app.users.admin)
+
+    assert first.test_client().post('/api/teams', headers=writer, json={'name': 'Written Team'}).status_code == 201
+    assert team_names(second.test_client(), writer) == {'Shared Team', 'Written Team'}
+    assert 'Replica Only' in team_names(second.test_client(), auth_headers(replica_app.users.reader))
+
+    for app in (first, second):
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+def test_several_workers_without_a_shared_backend_read_the_primary(replica_app, auth_headers, caplog):
+    assert not check_replica_workers(replica_app, 1)
+    assert check_replica_workers(replica_app, 2)
+    assert 'CACHE_BACKEND=shared' in caplog.text
+
+    client = replica_app.test_client()
+    assert team_names(client, auth_headers(replica_app.users.reader)) == {'Shared Team'}
@@ -0,0 +1,60 @@
+"""Refresh token revocation on password change, and pruning"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.user import User, db
+from models.refresh_token import RefreshToken
+
+
+@pytest.fixture
+def user(app):
+    user = User(email='user@example.com', password='password123', first_name='Some', last_name='User')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _login(client):
+    response = client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'password123'})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_password_change_ends_other_sessions(client, user):
+    stolen = _login(client)
+
+    response = client.put('/api/auth/change-password', headers=_bearer(stolen['access_token']),
+                          json={'current_password': 'password123', 'new_password': 'password456'})
+    assert response.status_code == 200
+    fresh = response.get_json()
+
+    assert client.get('/api/auth/me', headers=_bearer(stolen['access_token'])).status_code == 401
+    assert client.post('/api/auth/refresh', headers=_bearer(stolen['refresh_token'])).status_code == 401
+    assert RefreshToken.query.filter_by(user_id=user.id, revoked=False).count() == 1
+
+    assert client.get('/api/auth/me', headers=_bearer(fresh['access_token'])).status_code == 200
+    assert client.post('/api/auth/refresh', headers=_bearer(fresh['refresh_token'])).status_code == 200
+
+
+def test_prune_refresh_tokens(app, user):
+    now = datetime.utcnow()
+    rows = {
+        'live': dict(expires_at=now + timedelta(days=1)),
+        'recently_used': dict(expires_at=now + timedelta(days=1), used_at=now - timedelta(days=1)),
+        'long_used': dict(expires_at=now + timedelta(days=20), used_at=now - timedelta(days=10)),
+        'revoked': dict(expires_at=now + timedelta(days=1), revoked=True),
+        'expired': dict(expires_at=now - timedelta(seconds=1))
+    }
+    for jti, values in rows.items():
+        db.session.add(RefreshToken(jti=jti, user_id=user.id, family_id='family', **values))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['tokens', 'prune'])
+    assert result.exit_code == 0, result.output
+    assert 'Deleted 3 refresh tokens' in result.output
+    assert {token.jti for token in RefreshToken.query.all()} == {'live', 'recently_used'}
@@ -0,0 +1,90 @@
+"""Team and project counts come from SQL and stay current as memberships change"""
+import pytest
+from sqlalchemy import inspect
+
+from models.user import db
+from models.team import Team
+from models.project import Project
+
+
+@pytest.fixture
+def assigned(client, org, auth_headers):
+    """All four employees on the first project, user0 also on the second"""
+    headers = auth_headers(org.admin)
+    for project, employees in ((org.projects[0], org.employees), (org.projects[1], org.employees[:1])):
+        for employee in employees:
+            response = client.post(f'/api/projects/{project.id}/assign/{employee.id}', headers=headers)
+            assert response.status_code == 200
+    return org
+
+
+def teams_by_id(client, headers):
+    return {team['id']: team for team in client.get('/api/teams/', headers=headers).get_json()['teams']}
+
+
+def projects_by_id(client, headers):
+    return {project['id']: project for project in client.get('/api/projects/', headers=headers).get_json()['projects']}
+
+
+def test_team_listing_counts(client, org, auth_headers):
+    teams = teams_by_id(client, auth_headers(org.admin))
+    for team in org.teams:
+        assert teams[team.id]['member_count'] == len(team.members) == 2
+        assert teams[team.id]['project_count'] == len(team.projects) == 1
+
+
+def test_team_counts_follow_membership_changes(client, org, auth_headers):
+    headers = auth_headers(org.admin)
+    moved = org.employees[0]
+    response = client.post(f'/api/teams/{org.teams[1].id}/members/{moved.id}', headers=headers)
+    assert response.status_code == 200
+
+    teams = teams_by_id(client, headers)
+    assert teams[org.teams[0].id]['member_count'] == 1
+    assert teams[org.teams[1].id]['member_count'] == 3
+
+
+def test_project_listing_counts(client, assigned, auth_headers):
+    projects = projects_by_id(client, auth_headers(assigned.admin))
+    assert projects[assigned.projects[0].id]['assigned_users_count'] == 4
+    assert projects[assigned.projects[1].id]['assigned_users_count'] == 1
+    assert projects[assigned.projects[0].id]['team_name'] == 'Team 0'
+
+    # An employee sees only their projects, but the counts still cover every assignee
+    projects = projects_by_id(client, auth_headers(assigned.employees[1]))
+    assert list(projects) == [assigned.projects[0].id]
+    assert projects[assigned.projects[0].id]['assigned_users_count'] == 4
+
+
+def test_project_count_follows_unassign(client, assigned, auth_headers):
+    headers = auth_headers(assigned.admin)
+    project = assigned.projects[0]
+    response = client.delete(f'/api/projects/{project.id}/unassign/{assigned.employees[3].id}', headers=headers)
+    assert response.status_code == 200
+    assert projects_by_id(client, headers)[project.id]['assigned_users_count'] == 3
+
+
+def test_counts_do_not_load_the_collections(org):
+    db.session.expire_all()
+    team = db.session.get(Team, org.teams[0].id, options=Team.to_dict_options())
+    project = db.session.get(Project, org.projects[0].id, options=Project.to_dict_options())
+
+    assert team.to_dict()['member_count'] == 2
+    assert project.to_dict()['assigned_users_count'] == 0
+    assert {'members', 'projects'} <= inspect(team).unloaded
+    assert 'assigned_users' in inspect(project).unloaded
+
+
+def test_delete_team_checks_the_counts(client, org, auth_headers):
+    headers = auth_headers(org.admin)
+    team = org.teams[0]
+    assert client.delete(f'/api/teams/{team.id}', headers=headers).status_code == 400
+
+    for employee in org.employees[:2]:
+        client.delete(f'/api/teams/{team.id}/members/{employee.id}', headers=headers)
+    response = client.delete(f'/api/teams/{team.id}', headers=headers)
+    assert response.status_code == 400
+    assert 'projects' in response.get_json()['message']
+
+    client.delete(f'/api/projects/{org.projects[0].id}', headers=headers)
+    assert client.delete(f'/api/teams/{team.id}', headers=headers).status_code == 200
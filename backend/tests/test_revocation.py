@@ -0,0 +1,89 @@
+"""Token revocation on role changes and deactivation"""
+import pytest
+
+from auth.revocation import RevocationList, now_ms, token_issued_ms
+from models.user import User, db
+from models.token_revocation import TokenRevocation
+
+
+@pytest.fixture
+def users(app):
+    admin = User(email='admin@example.com', password='password123', first_name='Admin', last_name='User', role='admin')
+    employee = User(email='employee@example.com', password='password123', first_name='Em', last_name='Ployee')
+    db.session.add_all([admin, employee])
+    db.session.commit()
+    return admin, employee
+
+
+def _me(client, headers):
+    return client.get('/api/auth/me', headers=headers).status_code
+
+
+def test_unchanged_role_keeps_tokens(client, users, auth_headers):
+    admin, employee = users
+    headers = auth_headers(employee)
+
+    response = client.put(f'/api/users/{employee.id}', headers=auth_headers(admin),
+                          json={'first_name': 'Renamed', 'role': 'employee', 'is_active': True})
+    assert response.status_code == 200
+    assert _me(client, headers) == 200
+
+
+def test_role_change_revokes_earlier_tokens(client, users, auth_headers):
+    admin, employee = users
+    # Usually issued within the same second as the revocation below
+    headers = auth_headers(employee)
+
+    response = client.put(f'/api/users/{employee.id}', headers=auth_headers(admin), json={'role': 'admin'})
+    assert response.status_code == 200
+    assert _me(client, headers) == 401
+
+
+def test_login_right_after_role_change(client, users, auth_headers):
+    admin, employee = users
+
+    response = client.put(f'/api/users/{employee.id}', headers=auth_headers(admin), json={'role': 'admin'})
+    assert response.status_code == 200
+    response = client.post('/api/auth/login', json={'email': 'employee@example.com', 'password': 'password123'})
+    assert response.status_code == 200
+    assert _me(client, {'Authorization': f"Bearer {response.get_json()['access_token']}"}) == 200
+
+
+def test_deactivation_revokes_tokens(client, users, auth_headers):
+    admin, employee = users
+    headers = auth_headers(employee)
+
+    assert client.delete(f'/api/users/{employee.id}', headers=auth_headers(admin)).status_code == 200
+    assert _me(client, headers) == 401
+
+
+def test_token_without_iat_ms_from_the_revoking_second_is_revoked(app, users):
+    admin, employee = users
+    revocations = app.extensions['token_revocations']
+    revocations.revoke(employee.id)
+    revoked_at = revocations._revoked_at[employee.id]
+
+    assert revocations.is_revoked(employee.id, token_issued_ms({'iat': revoked_at // 1000}))
+    assert not revocations.is_revoked(employee.id, token_issued_ms({'iat': revoked_at // 1000 + 1}))
+    assert not revocations.is_revoked(employee.id, token_issued_ms({'iat': 0, 'iat_ms': revoked_at + 1}))
+
+
+def test_sync_picks_up_revocations_committed_late(app, users):
+    admin, employee = users
+    worker = RevocationList(sync_interval=0, max_token_age=3600)
+    stamped = now_ms()
+
+    # Another worker commits a newer revocation first and this worker syncs it
+    db.session.add(TokenRevocation(user_id=admin.id, revoked_at=stamped + 1000))
+    db.session.commit()
+    assert worker.is_revoked(admin.id, stamped)
+
+    # A revocation stamped earlier is only committed afterwards
+    db.session.add(TokenRevocation(user_id=employee.id, revoked_at=stamped))
+    db.session.commit()
+    assert worker.is_revoked(employee.id, stamped - 1)
+
+
+def test_now_ms_is_strictly_increasing():
+    stamps = [now_ms() for _ in range(1000)]
+    assert stamps == sorted(set(stamps))
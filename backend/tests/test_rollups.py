@@ -0,0 +1,127 @@
+"""checkin_daily_rollups stays equal to an aggregate over the raw check-ins"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func
+
+from models.user import User, db
+from models.checkin import CheckIn
+from models.checkin_rollup import CheckInDailyRollup
+
+
+def direct_aggregates():
+    """Rollup rows computed straight from checkins, keyed by (date, team, project)"""
+    team_id = func.coalesce(User.team_id, 0)
+    project_id = func.coalesce(CheckIn.project_id, 0)
+    rows = db.session.query(
+        CheckIn.check_in_date, team_id, project_id,
+        func.count(CheckIn.id),
+        func.sum(CheckIn.mood_rating),
+        func.coalesce(func.sum(CheckIn.work_load_rating), 0),
+        func.count(CheckIn.work_load_rating),
+        func.coalesce(func.sum(CheckIn.stress_level), 0),
+        func.count(CheckIn.stress_level),
+    ).join(User, CheckIn.user_id == User.id).group_by(CheckIn.check_in_date, team_id, project_id)
+    return {tuple(row[:3]): tuple(row[3:]) for row in rows}
+
+
+def stored_rollups():
+    db.session.expire_all()
+    return {
+        (row.rollup_date, row.team_id, row.project_id): (
+            row.checkin_count, row.mood_sum, row.workload_sum, row.workload_count, row.stress_sum, row.stress_count
+        )
+        for row in CheckInDailyRollup.query
+    }
+
+
+def assert_rollups_match():
+    assert stored_rollups() == direct_aggregates()
+
+
+@pytest.fixture
+def history(org):
+    """A few days of check-ins for every employee, some without project or optional ratings"""
+    today = date.today()
+    for n, employee in enumerate(org.employees):
+        project = org.projects[n // 2]
+        for day in range(1, 4):
+            db.session.add(CheckIn(
+                user_id=employee.id, check_in_date=today - timedelta(days=day), mood_rating=(n + day) % 5 + 1,
+                project_id=project.id if day != 2 else None,
+                work_load_rating=day if n % 2 else None, stress_level=(n + 1) if day != 3 else None,
+            ))
+    db.session.commit()
+    return org
+
+
+def test_create(client, history, auth_headers):
+    assert_rollups_match()
+
+    for n, employee in enumerate(history.employees):
+        body = {'mood_rating': n + 1, 'stress_level': 3}
+        if n % 2:
+            body['project_id'] = history.projects[n // 2].id
+        response = client.post('/api/checkins/', headers=auth_headers(employee), json=body)
+        assert response.status_code == 201, response.get_json()
+
+    assert_rollups_match()
+    assert stored_rollups()[(date.today(), history.teams[0].id, 0)][0] == 1
+
+
+def test_update(client, history, auth_headers):
+    checkins = CheckIn.query.filter_by(user_id=history.employees[1].id).order_by(CheckIn.id).all()
+    changes = [
+        {'mood_rating': 1, 'work_load_rating': 5},
+        {'stress_level': None, 'project_id': history.projects[1].id},
+        {'project_id': None, 'work_load_rating': None},
+    ]
+    for checkin, change in zip(checkins, changes):
+        response = client.put(f'/api/checkins/{checkin.id}', headers=auth_headers(history.admin), json=change)
+        assert response.status_code == 200, response.get_json()
+
+    assert_rollups_match()
+
+
+def test_delete_removes_emptied_rows(client, history, auth_headers):
+    day = date.today() - timedelta(days=1)
+    for checkin in CheckIn.query.filter_by(check_in_date=day).all():
+        response = client.delete(f'/api/checkins/{checkin.id}', headers=auth_headers(history.admin))
+        assert response.status_code == 200, response.get_json()
+
+    assert_rollups_match()
+    assert not any(key[0] == day for key in stored_rollups())
+
+
+def test_team_moves(client, history, auth_headers):
+    admin = auth_headers(history.admin)
+    first, second, third, fourth = (employee.id for employee in history.employees)
+    team_a, team_b = (team.id for team in history.teams)
+
+    response = client.post(f'/api/teams/{team_b}/members/{first}', headers=admin)
+    assert response.status_code == 200, response.get_json()
+    assert_rollups_match()
+
+    response = client.delete(f'/api/teams/{team_b}/members/{third}', headers=admin)
+    assert response.status_code == 200, response.get_json()
+    assert_rollups_match()
+
+    response = client.post('/api/teams/memberships', headers=admin,
+                           json={'team_id': team_a, 'user_ids': [first, third, fourth]})
+    assert response.status_code == 200, response.get_json()
+    assert_rollups_match()
+
+    response = client.post('/api/teams/memberships', headers=admin, json={'team_id': None, 'user_ids': [second]})
+    assert response.status_code == 200, response.get_json()
+    assert_rollups_match()
+    assert all(key[1] in (team_a, 0) for key in stored_rollups())
+
+
+def test_project_delete_cascades(client, history, auth_headers):
+    project = history.projects[0]
+    response = client.delete(f'/api/projects/{project.id}', headers=auth_headers(history.admin))
+    assert response.status_code == 200, response.get_json()
+
+    assert CheckIn.query.filter_by(project_id=project.id).count() == 0
+    assert_rollups_match()
+    assert not any(key[2] == project.id for key in stored_rollups())
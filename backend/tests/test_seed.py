@@ -0,0 +1,65 @@
+"""Building the app touches no database; schema and sample data come from CLI commands"""
+import pytest
+
+from config import TestingConfig
+from models.user import User, db
+from models.team import Team
+from models.project import Project
+
+
+@pytest.fixture
+def database_file(tmp_path, monkeypatch):
+    path = tmp_path / 'fresh.db'
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{path}')
+    return path
+
+
+@pytest.fixture
+def fresh_app(database_file):
+    """App on a database file that does not exist yet"""
+    from app import create_app
+
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def sample_counts():
+    return User.query.count(), Team.query.count(), Project.query.count()
+
+
+def test_creating_the_app_does_no_database_io(fresh_app, database_file):
+    assert not database_file.exists()
+
+
+def test_init_db_seeds_once(fresh_app):
+    runner = fresh_app.test_cli_runner()
+
+    result = runner.invoke(args=['init-db', '--seed'])
+    assert result.exit_code == 0, result.output
+    assert 'Admin user created' in result.output
+    assert sample_counts() == (2, 1, 1)
+
+    employee = User.query.filter_by(role='employee').one()
+    assert employee.team_id == Team.query.one().id
+    assert Project.query.one().team_id == employee.team_id
+
+    result = runner.invoke(args=['seed'])
+    assert result.exit_code == 0, result.output
+    assert 'Sample data already present' in result.output
+    assert sample_counts() == (2, 1, 1)
+
+
+def test_seed_fills_in_what_is_missing(app):
+    team = Team(name='Existing Team')
+    db.session.add(team)
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['seed'])
+    assert result.exit_code == 0, result.output
+    assert 'Sample team created' not in result.output
+    assert sample_counts() == (2, 1, 1)
+    assert Project.query.one().team_id == team.id
@@ -0,0 +1,79 @@
+"""POST /api/teams/memberships moves many users between teams in one UPDATE"""
+import pytest
+
+from models.user import User, db
+
+
+def move(client, headers, **body):
+    return client.post('/api/teams/memberships', headers=headers, json=body)
+
+
+def team_ids(users):
+    db.session.expire_all()
+    return [db.session.get(User, user.id).team_id for user in users]
+
+
+def test_moves_report_each_user(client, org, auth_headers, count_statements):
+    team_b = org.teams[1].id
+    first, second, third, _ = org.employees
+    ids = [first.id, third.id, 9999, second.id]
+
+    with count_statements() as statements:
+        response = move(client, auth_headers(org.admin), team_id=team_b, user_ids=ids)
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+
+    assert body['moved'] == 2
+    assert body['results'] == [
+        {'user_id': first.id, 'status': 'moved', 'previous_team_id': org.teams[0].id},
+        {'user_id': third.id, 'status': 'unchanged'},
+        {'user_id': 9999, 'status': 'not_found'},
+        {'user_id': second.id, 'status': 'moved', 'previous_team_id': org.teams[0].id},
+    ]
+    assert team_ids(org.employees) == [team_b] * 4
+    assert len([statement for statement in statements if statement.startswith('UPDATE users')]) == 1
+
+
+def test_null_team_clears_membership(client, org, auth_headers):
+    response = move(client, auth_headers(org.admin), team_id=None, user_ids=[org.employees[2].id])
+    assert response.status_code == 200
+    assert response.get_json()['results'][0]['previous_team_id'] == org.teams[1].id
+    assert team_ids(org.employees) == [org.teams[0].id, org.teams[0].id, None, org.teams[1].id]
+
+
+def test_nothing_to_move_writes_nothing(client, org, auth_headers, count_statements):
+    with count_statements() as statements:
+        response = move(client, auth_headers(org.admin), team_id=org.teams[0].id, user_ids=[org.employees[0].id])
+    assert response.get_json()['moved'] == 0
+    assert not [statement for statement in statements if statement.startswith('UPDATE users')]
+
+
+def test_move_invalidates_cached_responses(client, org, auth_headers):
+    headers = auth_headers(org.admin)
+
+    def member_counts():
+        teams = client.get('/api/analytics/teams', headers=headers).get_json()['teams']
+        return {row['team']['id']: row['member_count'] for row in teams}
+
+    assert member_counts() == {org.teams[0].id: 2, org.teams[1].id: 2}
+    move(client, headers, team_id=org.teams[1].id, user_ids=[org.employees[0].id])
+    assert member_counts() == {org.teams[0].id: 1, org.teams[1].id: 3}
+
+
+@pytest.mark.parametrize('body, status', [
+    ({'user_ids': [1]}, 400),
+    ({'team_id': True, 'user_ids': [1]}, 400),
+    ({'team_id': '1', 'user_ids': [1]}, 400),
+    ({'team_id': 1, 'user_ids': []}, 400),
+    ({'team_id': 1, 'user_ids': ['x']}, 400),
+    ({'team_id': 9999, 'user_ids': [1]}, 404),
+])
+def test_invalid_requests(client, org, auth_headers, body, status):
+    response = move(client, auth_headers(org.admin), **body)
+    assert response.status_code == status, response.get_json()
+    assert team_ids(org.employees) == [org.teams[0].id] * 2 + [org.teams[1].id] * 2
+
+
+def test_admin_only(client, org, auth_headers):
+    response = move(client, auth_headers(org.employees[0]), team_id=org.teams[1].id, user_ids=[org.employees[0].id])
+    assert response.status_code == 403
@@ -0,0 +1,34 @@
+"""Bulk user import and its password hashing pool"""
+import os
+
+import bcrypt
+
+from models.user import User, db
+from services import hash_pool
+
+
+def test_pool_is_reused_across_imports():
+    first = hash_pool.hash_passwords(['one', 'two', 'three'], 4, 2)
+    pool = hash_pool._pool
+    second = hash_pool.hash_passwords(['four', 'five'], 4, 2)
+
+    assert hash_pool._pool is pool
+    assert hash_pool._pool_key == (os.getpid(), 2)
+    assert bcrypt.checkpw(b'three', first[2].encode('utf-8'))
+    assert bcrypt.checkpw(b'five', second[1].encode('utf-8'))
+
+
+def test_import_users(client, app, auth_headers):
+    admin = User(email='admin@example.com', password='password123', first_name='Admin', last_name='User', role='admin')
+    db.session.add(admin)
+    db.session.commit()
+    app.config['BULK_IMPORT_HASH_PROCESSES'] = 2
+
+    rows = [
+        {'email': f'new{n}@example.com', 'password': f'password{n}', 'first_name': 'New', 'last_name': str(n)}
+        for n in range(4)
+    ]
+    response = client.post('/api/users/import', headers=auth_headers(admin), json={'users': rows})
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['imported'] == 4
+    assert User.query.filter_by(email='new3@example.com').one().check_password('password3')
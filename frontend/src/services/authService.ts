@@ -12,6 +12,7 @@ const getApiUrl = (endpoint: string) => {
 
 export interface LoginResponse {
   access_token: string;
+  refresh_token: string;
   user: {
     id: number;
     email: string;
@@ -63,6 +64,7 @@ class AuthService {
 
       const data = await response.json();
       localStorage.setItem('token', data.access_token);
+      localStorage.setItem('refreshToken', data.refresh_token);
       localStorage.setItem('user', JSON.stringify(data.user));
       return data;
     } catch (error) {
@@ -94,18 +96,55 @@ class AuthService {
     }
   }
 
+  // Swap the stored refresh token for a new access token, without re-entering the password
+  async refresh(): Promise<boolean> {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (!refreshToken) return false;
+
+    try {
+      const response = await fetch(getApiUrl('/api/auth/refresh'), {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          Authorization: `Bearer ${refreshToken}`,
+        },
+      });
+
+      if (!response.ok) {
+        localStorage.removeItem('refreshToken');
+        return false;
+      }
+
+      const data = await response.json();
+      localStorage.setItem('token', data.access_token);
+      localStorage.setItem('refreshToken', data.refresh_token);
+      return true;
+    } catch (error) {
+      console.error('Token refresh error:', error);
+      return false;
+    }
+  }
+
   async getCurrentUser(): Promise<User | null> {
     try {
       const token = localStorage.getItem('token');
       if (!token) return null;
 
-      const response = await fetch(getApiUrl('/api/auth/me'), {
+      let response = await fetch(getApiUrl('/api/auth/me'), {
         method: 'GET',
         headers: this.getAuthHeaders(),
       });
 
+      if (response.status === 401 && await this.refresh()) {
+        response = await fetch(getApiUrl('/api/auth/me'), {
+          method: 'GET',
+          headers: this.getAuthHeaders(),
+        });
+      }
+
       if (!response.ok) {
         localStorage.removeItem('token');
+        localStorage.removeItem('refreshToken');
         localStorage.removeItem('user');
         return null;
       }
@@ -122,6 +161,7 @@ class AuthService {
 
   logout(): void {
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('user');
   }
 